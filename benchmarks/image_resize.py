@@ -0,0 +1,96 @@
+# benchmarks/image_resize.py
+"""Image downscaling: reduced-resolution JPEG decoding (core.tasks.convert_image) against a full decode.
+
+For each resize setting the photo is converted both ways to BMP (lossless, so only the decode
+and resize differ) and the results are compared. Exits non-zero if any output is further
+from the full-resolution LANCZOS result than --min-psnr, so it doubles as the quality check.
+Without --inputs a photo-like JPEG is generated. Run from the project folder:
+
+    python benchmarks/image_resize.py --megapixels 50
+    python benchmarks/image_resize.py --inputs "D:\\Photos\\*.jpg"
+"""
+
+import argparse
+import glob
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops, ImageStat
+
+from core.tasks import convert_image, resize_target
+
+SETTINGS = ["25%", "50%", "1280px (HD)", "1920px (Full HD)"]
+
+
+def convert_full_decode(input_path, output_path, settings):
+    """convert_image before reduced decoding: decode every pixel, then one LANCZOS resize."""
+    with Image.open(input_path) as img:
+        img = img.resize(resize_target(img.size, settings['resize']), Image.Resampling.LANCZOS)
+        img.save(output_path)
+
+ENGINES = {"full decode": convert_full_decode, "reduced decode": convert_image}
+
+
+def generate_photo(path, megapixels):
+    """Smooth gradients, fine detail and sensor-like noise, saved the way a camera would (quality 92)."""
+    w = int((megapixels * 1e6 * 4 / 3) ** 0.5); h = int(w * 3 / 4)
+    # The gradients are smooth, so they are computed on a coarse grid and upscaled.
+    step = 16; cw, ch = w // step + 1, h // step + 1
+    base = Image.merge("RGB", [Image.new("L", (cw, ch)) for _ in range(3)])
+    base.putdata([tuple(int(128 + 100 * math.sin(x * step / 700 + c) * math.cos(y * step / 500 - c)) for c in (0.0, 1.1, 2.2))
+                  for y in range(ch) for x in range(cw)])
+    base = base.resize((w, h), Image.Resampling.BICUBIC)
+    # Fine detail: one period of a sine pattern, tiled across the picture (around 128, so it can be added with an offset).
+    tile = Image.new("L", (19, 30))
+    tile.putdata([int(128 + 20 * math.sin(2 * math.pi * x / 19) * math.sin(2 * math.pi * y / 30)) for y in range(30) for x in range(19)])
+    row = Image.new("L", (w, 30))
+    for x in range(0, w, 19): row.paste(tile, (x, 0))
+    detail = Image.new("L", (w, h))
+    for y in range(0, h, 30): detail.paste(row, (0, y))
+    photo = ImageChops.add(base, Image.merge("RGB", [detail] * 3), offset=-128)
+    photo = ImageChops.add(photo, Image.effect_noise((w, h), 6).convert("RGB"), offset=-128)
+    photo.save(path, quality=92)
+
+def psnr(path_a, path_b):
+    with Image.open(path_a) as a, Image.open(path_b) as b:
+        diff = ImageChops.difference(a.convert("RGB"), b.convert("RGB"))
+    mse = sum(ImageStat.Stat(diff).sum2) / (diff.width * diff.height * 3)
+    return float("inf") if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inputs", help="Glob pattern of JPEGs to use instead of a generated one.")
+    parser.add_argument("--megapixels", type=float, default=24, help="Size of the generated JPEG.")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per engine and setting (median is shown).")
+    parser.add_argument("--min-psnr", type=float, default=40.0, help="Fail if the reduced decode is further from the full decode than this (dB).")
+    args = parser.parse_args(argv)
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="fileconverter-bench-") as work:
+        if args.inputs: inputs = sorted(glob.glob(args.inputs))
+        else: inputs = [os.path.join(work, "photo.jpg")]; generate_photo(inputs[0], args.megapixels)
+        if not inputs: parser.error("no input images found")
+        for input_path in inputs:
+            with Image.open(input_path) as img: print(f"{os.path.basename(input_path)}: {img.size[0]}x{img.size[1]}")
+            for setting in SETTINGS:
+                settings, times = {'resize': setting}, {}
+                for engine, convert in ENGINES.items():
+                    output_path = os.path.join(work, f"{engine}.bmp")
+                    runs = []
+                    for _ in range(args.runs):
+                        start = time.perf_counter(); convert(input_path, output_path, settings); runs.append(time.perf_counter() - start)
+                    times[engine] = statistics.median(runs)
+                quality = psnr(os.path.join(work, "full decode.bmp"), os.path.join(work, "reduced decode.bmp"))
+                failed |= quality < args.min_psnr
+                print(f"  {setting:<17} full {times['full decode']:6.3f}s  reduced {times['reduced decode']:6.3f}s  "
+                      f"x{times['full decode'] / times['reduced decode']:4.1f}  PSNR {quality:5.1f} dB{'  FAIL' if quality < args.min_psnr else ''}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
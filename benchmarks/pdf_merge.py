@@ -0,0 +1,96 @@
+# benchmarks/pdf_merge.py
+"""PDF merge: PyMuPDF engine (core.tasks.merge_pdfs) against the former pypdf path.
+
+Each engine runs in a fresh interpreter so peak memory is measured per engine. Without
+--inputs a set of scan-like PDFs is generated that share one font and one image, which is
+where the deduplication pays off. Run from the project folder:
+
+    python benchmarks/pdf_merge.py --files 200 --pages 5
+    python benchmarks/pdf_merge.py --inputs "D:\\Scans\\*.pdf"
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def merge_with_pypdf(input_paths, output_path):
+    """MergeWorker's previous PDF branch: every input appended to one PdfWriter, written at the end."""
+    from pypdf import PdfWriter
+    merger = PdfWriter()
+    for path in input_paths: merger.append(path)
+    merger.write(output_path); merger.close()
+
+def merge_with_fitz(input_paths, output_path):
+    from core.tasks import merge_pdfs
+    merge_pdfs(input_paths, output_path)
+
+ENGINES = {"pypdf": merge_with_pypdf, "fitz": merge_with_fitz}
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None # not available on Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_engine(engine, input_paths, output_path):
+    """Child-process side: merge and print the measurements as JSON."""
+    sys.path.insert(0, PROJECT_DIR)
+    start = time.perf_counter()
+    ENGINES[engine](input_paths, output_path)
+    print(json.dumps({"seconds": time.perf_counter() - start, "peak_mb": peak_rss_mb(), "output_mb": os.path.getsize(output_path) / 1e6}))
+
+def generate_inputs(directory, files, pages):
+    import fitz
+    image = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 600, 800), False)
+    image.set_rect(image.irect, (235, 230, 220))
+    image_bytes = image.tobytes("png")
+    paths = []
+    for n in range(files):
+        with fitz.open() as doc:
+            for p in range(pages):
+                page = doc.new_page()
+                page.insert_image(page.rect, stream=image_bytes)
+                page.insert_text((72, 72), f"Scanned report {n}, page {p + 1}", fontname="helv", fontsize=14)
+            path = os.path.join(directory, f"scan_{n:04d}.pdf")
+            doc.save(path); paths.append(path)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inputs", help="Glob pattern of PDFs to merge instead of generated ones.")
+    parser.add_argument("--files", type=int, default=100, help="Number of generated PDFs.")
+    parser.add_argument("--pages", type=int, default=5, help="Pages per generated PDF.")
+    parser.add_argument("--engine", choices=ENGINES, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("input_paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.engine: # child process
+        run_engine(args.engine, args.input_paths, args.output)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="fileconverter-bench-") as work:
+        input_paths = sorted(glob.glob(args.inputs)) if args.inputs else generate_inputs(work, args.files, args.pages)
+        if not input_paths: parser.error("no input PDFs found")
+        print(f"Merging {len(input_paths)} PDFs")
+        for engine in ENGINES:
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--engine", engine, "--output", os.path.join(work, f"{engine}.pdf")] + input_paths,
+                                 cwd=PROJECT_DIR, capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            peak = f"{result['peak_mb']:.0f} MB" if result["peak_mb"] is not None else "n/a"
+            print(f"{engine:<6} {result['seconds']:7.2f}s  peak {peak:>8}  output {result['output_mb']:.1f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+# benchmarks/startup_budget.py
+"""Import-time budget for the desktop app and the CLI.
+
+Imports main.py and cli.py in fresh interpreters, takes the best of several runs and fails
+(exit code 1) if startup goes over the budget or if one of the lazily loaded format
+backends was pulled in at import time. Run from the project folder:
+
+    python benchmarks/startup_budget.py --budget 0.4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ["rawpy", "pillow_heif", "pillow_avif", "pypdf", "pdf2docx", "fitz", "pymupdf", "qt_material", "PIL.Image"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+def measure(module, runs):
+    best, loaded = None, []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, lazy=LAZY_MODULES)],
+                             cwd=PROJECT_DIR, capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        best = result["seconds"] if best is None else min(best, result["seconds"])
+        loaded = result["loaded"]
+    return best, loaded
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.4, help="Maximum import time in seconds (best of --runs).")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in ("main", "cli"):
+        seconds, loaded = measure(module, args.runs)
+        status = "OK"
+        if seconds > args.budget: status = f"OVER BUDGET ({args.budget:.3f}s)"; failed = True
+        if loaded: status = f"EAGER IMPORTS: {', '.join(loaded)}"; failed = True
+        print(f"import {module:<5} {seconds:.3f}s  {status}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+# benchmarks/suite.py
+"""Throughput of every worker class on generated fixtures, compared against a saved baseline.
+
+The fixtures are generated locally on first use and come out the same on every run:
+- ffmpeg lavfi test sources for video and audio;
+- a Pillow-drawn picture in every image format of FLEXIBLE_CONVERSION_MAP that Pillow can write
+  and read back;
+- DNG files with an embedded preview for the RAW path;
+- PyMuPDF-generated multi-page PDFs;
+- ZIP and TAR archives.
+
+Each case drives its workers headlessly in a fresh interpreter, on the calling thread rather
+than the process pool, so peak RSS belongs to that case alone. Peak RSS is the larger of the
+Python process and the ffmpeg/7-Zip children it started. Cases whose tools or libraries are
+missing are skipped.
+
+Baselines are per machine: save one before upgrading Pillow, ffmpeg or pdf2docx and compare
+against it afterwards. The run fails (exit code 1) if a case errors, or if it is slower or
+uses more memory than the baseline by more than --tolerance. Run from the project folder:
+
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --tolerance 0.15
+    python benchmarks/suite.py --only "image *" --only "pdf *" --fixtures D:\\bench-fixtures
+"""
+
+import argparse
+import fnmatch
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from core.formats import FLEXIBLE_CONVERSION_MAP, RAW_EXTENSIONS, get_file_category
+
+IMAGE_SIZE = (2400, 1600)
+VIDEO_SIZE = "1280x720"
+RAW_SIZE, RAW_PREVIEW_SIZE = (4000, 3000), (1600, 1200)
+IMAGE_EXTENSIONS = sorted(ext for ext, cats in FLEXIBLE_CONVERSION_MAP.items() if "image" in cats and get_file_category(ext) == "image" and ext not in RAW_EXTENSIONS)
+
+# name -> (fixture set, target format / tuple of formats for a fan-out job / None to merge the set, settings)
+CASES = {
+    "video mp4 -> mkv (stream copy)": ("video", "mkv", {}),
+    "video mp4 -> mov 480p (encode)": ("video", "mov", {'resize': "480p (640x480)"}),
+    "video mp4 -> mp3": ("video", "mp3", {}),
+    "video mp4 -> jpg (frame)": ("video", "jpg", {}),
+    "video mp4 -> gif": ("video", "gif", {}),
+    "video mp4 -> mkv + mp3 + jpg": ("video", ("mkv", "mp3", "jpg"), {}),
+    "video merge": ("video", None, {}),
+    "audio wav -> mp3": ("audio", "mp3", {}),
+    "audio wav -> flac": ("audio", "flac", {}),
+    **{f"image {ext[1:]} -> {FLEXIBLE_CONVERSION_MAP[ext]['image'][0]}": (f"image{ext}", FLEXIBLE_CONVERSION_MAP[ext]['image'][0], {})
+       for ext in IMAGE_EXTENSIONS},
+    "image jpg -> webp 50%": ("image.jpg", "webp", {'resize': "50%"}),
+    "image jpg -> png + webp + tiff": ("image.jpg", ("png", "webp", "tiff"), {}),
+    "raw dng -> jpg (full quality)": ("raw", "jpg", {'raw_mode': "Full quality"}),
+    "raw dng -> jpg 25% (auto)": ("raw", "jpg", {'resize': "25%"}),
+    "pdf -> txt": ("pdf", "txt", {}),
+    "pdf -> docx": ("pdf", "docx", {}),
+    "pdf merge": ("pdf", None, {}),
+    "archive zip -> tar": ("zip", "tar", {}),
+    "archive tar -> zip": ("tar", "zip", {}),
+    "archive zip -> 7z": ("zip", "7z", {}),
+}
+CASE_TOOLS = {"archive zip -> 7z": ("7z", "7za", "7zz")}     # cases that need an external program besides their fixtures'
+
+
+# =============================================================================
+# FIXTURES: every generator skips files that already exist, so a --fixtures folder is reused.
+# =============================================================================
+
+def synthetic_picture(size):
+    """Deterministic RGB test picture: fractal detail over smooth gradients."""
+    from PIL import Image
+    detail = Image.effect_mandelbrot(size, (-2.2, -1.2, 0.8, 1.2), 120)
+    return Image.merge("RGB", (detail, Image.linear_gradient("L").resize(size), Image.radial_gradient("L").resize(size)))
+
+def ffmpeg_fixture(path, args):
+    if not os.path.exists(path):
+        subprocess.run(['ffmpeg', '-v', 'error', '-y'] + args + [path], check=True, capture_output=True)
+    return path
+
+def make_video(directory, count, seconds):
+    return [ffmpeg_fixture(os.path.join(directory, f"clip_{VIDEO_SIZE}_{seconds}s_{n}.mp4"), [
+        '-f', 'lavfi', '-i', f'testsrc2=size={VIDEO_SIZE}:rate=25:duration={seconds}',
+        '-f', 'lavfi', '-i', f'sine=frequency={440 + 110 * n}:duration={seconds}',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest']) for n in range(count)]
+
+def make_audio(directory, count, seconds):
+    return [ffmpeg_fixture(os.path.join(directory, f"tone_{seconds * 4}s_{n}.wav"), [
+        '-f', 'lavfi', '-i', f'sine=frequency={220 + 110 * n}:duration={seconds * 4}', '-ac', '2']) for n in range(count)]
+
+def make_images(directory, count, ext):
+    from core.backends import require_image_plugins
+    from PIL import Image
+    require_image_plugins(f"x{ext}")
+    picture = synthetic_picture(IMAGE_SIZE)
+    if ext == ".gif": picture = picture.convert("P", palette=Image.Palette.ADAPTIVE)
+    paths = []
+    for n in range(count):
+        path = os.path.join(directory, f"picture_{IMAGE_SIZE[0]}x{IMAGE_SIZE[1]}_{n}{ext}")
+        if not os.path.exists(path):
+            try: picture.save(path)
+            except Exception as e:
+                if os.path.exists(path): os.remove(path)
+                raise RuntimeError(f"Pillow cannot write {ext} files") from e
+        paths.append(path)
+    # Some formats can be written but not read back here (EPS needs Ghostscript).
+    with Image.open(paths[0]) as img: img.load()
+    return paths
+
+def make_dng(path):
+    """A minimal uncompressed DNG: an RGGB mosaic of the test picture, with a JPEG preview in IFD0.
+
+    Only called once make_raw has found rawpy, so numpy (a dependency of rawpy) is available.
+    """
+    import numpy as np
+    (w, h), picture = RAW_SIZE, synthetic_picture(RAW_SIZE)
+    rgb = np.asarray(picture, dtype=np.uint16) * 16
+    cfa = np.empty((h, w), np.uint16)
+    cfa[0::2, 0::2], cfa[0::2, 1::2] = rgb[0::2, 0::2, 0], rgb[0::2, 1::2, 1]
+    cfa[1::2, 0::2], cfa[1::2, 1::2] = rgb[1::2, 0::2, 1], rgb[1::2, 1::2, 2]
+    preview = io.BytesIO(); picture.resize(RAW_PREVIEW_SIZE).save(preview, "JPEG", quality=90)
+    preview = preview.getvalue()
+
+    def ifd(entries, offset):
+        """One TIFF IFD at `offset`; entries are (tag, type, count, packed value), values over 4 bytes follow the IFD."""
+        head, extra = struct.pack('<H', len(entries)), b''
+        data_offset = offset + 2 + 12 * len(entries) + 4
+        for tag, kind, count, value in sorted(entries):
+            if len(value) <= 4: head += struct.pack('<HHI', tag, kind, count) + value.ljust(4, b'\0')
+            else: head += struct.pack('<HHII', tag, kind, count, data_offset + len(extra)); extra += value + b'\0' * (len(value) % 2)
+        return head + struct.pack('<I', 0) + extra
+    short, long = (lambda *v: struct.pack(f'<{len(v)}H', *v)), (lambda *v: struct.pack(f'<{len(v)}I', *v))
+    raw_ifd_at, preview_at = 1024, 2048
+    raw_at = preview_at + len(preview) + len(preview) % 2
+    identity = struct.pack('<18i', *(v for i in range(9) for v in ((1 if i % 4 == 0 else 0), 1)))
+    ifd0 = ifd([(254, 4, 1, long(1)), (256, 4, 1, long(RAW_PREVIEW_SIZE[0])), (257, 4, 1, long(RAW_PREVIEW_SIZE[1])),
+                (258, 3, 3, short(8, 8, 8)), (259, 3, 1, short(7)), (262, 3, 1, short(6)), (273, 4, 1, long(preview_at)),
+                (277, 3, 1, short(3)), (278, 4, 1, long(RAW_PREVIEW_SIZE[1])), (279, 4, 1, long(len(preview))),
+                (271, 2, 6, b'Bench\0'), (272, 2, 4, b'DNG\0'), (330, 4, 1, long(raw_ifd_at)),
+                (50706, 1, 4, bytes([1, 4, 0, 0])), (50708, 2, 10, b'Bench DNG\0'), (50721, 10, 9, identity),
+                (50728, 5, 3, struct.pack('<6I', 1, 1, 1, 1, 1, 1)), (50778, 3, 1, short(21))], 8)
+    raw_ifd = ifd([(254, 4, 1, long(0)), (256, 4, 1, long(w)), (257, 4, 1, long(h)), (258, 3, 1, short(16)),
+                   (259, 3, 1, short(1)), (262, 3, 1, short(32803)), (273, 4, 1, long(raw_at)), (277, 3, 1, short(1)),
+                   (278, 4, 1, long(h)), (279, 4, 1, long(cfa.nbytes)), (33421, 3, 2, short(2, 2)),
+                   (33422, 1, 4, bytes([0, 1, 1, 2])), (50717, 4, 1, long(4095))], raw_ifd_at)
+    with open(path, 'wb') as f:
+        f.write(b'II*\0' + long(8) + ifd0); f.write(b'\0' * (raw_ifd_at - f.tell())); f.write(raw_ifd)
+        f.write(b'\0' * (preview_at - f.tell())); f.write(preview); f.write(b'\0' * (raw_at - f.tell())); f.write(cfa.astype('<u2').tobytes())
+
+def make_raw(directory, count):
+    from core.backends import require
+    require("rawpy")  # rawpy depends on numpy, which make_dng uses; without rawpy the RAW cases are skipped
+    paths = [os.path.join(directory, f"raw_{RAW_SIZE[0]}x{RAW_SIZE[1]}_{n}.dng") for n in range(count)]
+    for path in paths:
+        if not os.path.exists(path): make_dng(path)
+    return paths
+
+def make_pdfs(directory, count, pages):
+    from core.backends import require
+    fitz = require("fitz")
+    words = "throughput latency decoder encoder sample frame buffer page archive stream codec palette".split()
+    paths = []
+    for n in range(count):
+        path = os.path.join(directory, f"report_{pages}p_{n}.pdf")
+        if not os.path.exists(path):
+            rng = random.Random(n)
+            with fitz.open() as doc:
+                for p in range(pages):
+                    page = doc.new_page()
+                    page.insert_text((72, 72), f"Report {n}, page {p + 1}", fontname="helv", fontsize=16)
+                    body = "\n\n".join(" ".join(rng.choice(words) for _ in range(60)).capitalize() + "." for _ in range(5))
+                    page.insert_textbox(fitz.Rect(72, 100, 523, 620), body, fontname="helv", fontsize=10)
+                    for row in range(6): page.draw_rect(fitz.Rect(72, 650 + row * 22, 523, 672 + row * 22), color=(0, 0, 0), width=0.5)
+                doc.save(path)
+        paths.append(path)
+    return paths
+
+def archive_members(n):
+    """Deterministic (name, bytes) pairs: compressible text and incompressible binary entries."""
+    rng = random.Random(n)
+    for i in range(40):
+        if i % 2: yield f"data/blob_{i}.bin", rng.randbytes(rng.randint(64, 256) * 1024)
+        else: yield f"docs/note_{i}.txt", ("line of text %d\n" % i).encode() * rng.randint(2000, 8000)
+
+def make_archives(directory, count, kind):
+    paths = []
+    for n in range(count):
+        path = os.path.join(directory, f"bundle_{n}.{kind}")
+        if not os.path.exists(path):
+            if kind == "zip":
+                with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+                    for name, data in archive_members(n): z.writestr(name, data)
+            else:
+                with tarfile.open(path, 'w') as t:
+                    for name, data in archive_members(n):
+                        info = tarfile.TarInfo(name); info.size, info.mtime = len(data), 1700000000
+                        t.addfile(info, io.BytesIO(data))
+        paths.append(path)
+    return paths
+
+def generate_fixtures(directory, files, seconds, pages):
+    """Builds the fixture sets and returns the manifest: {'sets': {name: [paths]}, 'skipped': {name: reason}}."""
+    os.makedirs(directory, exist_ok=True)
+    makers = {"video": lambda: make_video(directory, files, seconds), "audio": lambda: make_audio(directory, files, seconds),
+              **{f"image{ext}": (lambda ext=ext: make_images(directory, files, ext)) for ext in IMAGE_EXTENSIONS},
+              "raw": lambda: make_raw(directory, files), "pdf": lambda: make_pdfs(directory, files, pages),
+              "zip": lambda: make_archives(directory, files, "zip"), "tar": lambda: make_archives(directory, files, "tar")}
+    manifest = {'sets': {}, 'skipped': {}}
+    for name, make in makers.items():
+        if name in ("video", "audio") and not shutil.which("ffmpeg"):
+            manifest['skipped'][name] = "ffmpeg not found"; continue
+        try: manifest['sets'][name] = make()
+        except Exception as e: manifest['skipped'][name] = (str(e).strip().splitlines() or [type(e).__name__])[-1]
+    return manifest
+
+
+# =============================================================================
+# CASES: the child process side.
+# =============================================================================
+
+def peak_rss_mb():
+    """Peak resident memory of this process and of the largest child it waited for, or None on Windows."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    try:
+        # Linux keeps ru_maxrss across fork and exec, so it would start at the driver's peak; VmHWM is reset by exec.
+        with open("/proc/self/status") as f: own = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+    except (OSError, StopIteration):
+        pass
+    return max(own, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+def run_worker(worker):
+    from PyQt6.QtCore import Qt
+    outcome = {}
+    worker.finished.connect(lambda row, path: outcome.update(output=path), Qt.ConnectionType.DirectConnection)
+    worker.error.connect(lambda row, message: outcome.update(error=message), Qt.ConnectionType.DirectConnection)
+    worker.run()
+    if 'error' in outcome or 'output' not in outcome: raise RuntimeError(outcome.get('error', "the worker finished without an output"))
+
+def run_case(name, manifest_path, output_dir):
+    """Runs one case and prints its measurements as JSON."""
+    from core.dispatch import create_fan_out_worker, create_merge_worker, create_worker, default_job_settings, find_output_category
+    from core.process_host import configure_process_host
+    configure_process_host(False)
+    fixture_set, target, overrides = CASES[name]
+    with open(manifest_path, encoding='utf-8') as f: inputs = json.load(f)['sets'][fixture_set]
+    settings = {**default_job_settings(), **overrides}
+    start = time.perf_counter()
+    if target is None:
+        ext = os.path.splitext(inputs[0])[1]
+        worker = create_merge_worker(0, inputs, os.path.join(output_dir, f"merged{ext}"), get_file_category(ext))
+        run_worker(worker)
+    else:
+        for row, path in enumerate(inputs):
+            i_ext = os.path.splitext(path)[1].lower()
+            if isinstance(target, tuple):
+                worker = create_fan_out_worker(row, path, [(find_output_category(i_ext, t), t) for t in target], output_dir, settings)
+            else:
+                worker = create_worker(row, path, find_output_category(i_ext, target), target, output_dir, settings)
+            run_worker(worker)
+    seconds = time.perf_counter() - start
+    # Every job is wrapped in a StagedWorker; the report names the worker doing the conversion.
+    print(json.dumps({"worker": type(getattr(worker, 'worker', worker)).__name__, "files": len(inputs), "input_mb": sum(os.path.getsize(p) for p in inputs) / 1e6,
+                      "seconds": seconds, "peak_mb": peak_rss_mb()}))
+
+
+# =============================================================================
+# DRIVER
+# =============================================================================
+
+def measure(name, manifest_path, runs):
+    """Best of `runs` fresh-interpreter runs: {'worker', 'files_per_s', 'mb_per_s', 'peak_mb'}; raises with the child's error."""
+    best = None
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory(prefix="fileconverter-bench-out-") as out:
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", name, "--manifest", manifest_path, "--output-dir", out],
+                                   cwd=PROJECT_DIR, capture_output=True, text=True)
+        if child.returncode != 0:
+            raise RuntimeError((child.stderr.strip().splitlines() or [f"exit code {child.returncode}"])[-1])
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']: best = result
+    return {"worker": best['worker'], "files_per_s": best['files'] / best['seconds'], "mb_per_s": best['input_mb'] / best['seconds'], "peak_mb": best['peak_mb']}
+
+def compare(result, base, tolerance):
+    """The baseline column and whether the case regressed."""
+    if not base: return "", False
+    speed = result['files_per_s'] / base['files_per_s'] - 1
+    memory = result['peak_mb'] / base['peak_mb'] - 1 if result['peak_mb'] and base.get('peak_mb') else 0
+    slower, bigger = speed < -tolerance, memory > tolerance
+    return f"{speed:+6.0%} speed {memory:+6.0%} memory{'  SLOWER' if slower else ''}{'  MORE MEMORY' if bigger else ''}", slower or bigger
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", action="append", help="Run only the cases matching this pattern (repeatable), e.g. \"image *\".")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit.")
+    parser.add_argument("--fixtures", help="Folder to generate the fixtures in and reuse them from (default: a temporary folder).")
+    parser.add_argument("--files", type=int, default=3, help="Fixture files per case.")
+    parser.add_argument("--seconds", type=int, default=10, help="Length of the generated video clips (audio is 4x as long).")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per generated PDF.")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per case; the fastest counts.")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", help="Write the results as a baseline JSON.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown or memory growth against the baseline (0.25 = 25%%).")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--manifest", help=argparse.SUPPRESS)
+    parser.add_argument("--output-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case: # child process
+        run_case(args.case, args.manifest, args.output_dir)
+        return 0
+    names = [name for name in CASES if not args.only or any(fnmatch.fnmatch(name, pattern) for pattern in args.only)]
+    if args.list:
+        print("\n".join(names)); return 0
+    if not names: parser.error("no case matches --only")
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f: baseline = json.load(f)['cases']
+
+    with tempfile.TemporaryDirectory(prefix="fileconverter-bench-") as work:
+        fixtures = os.path.abspath(args.fixtures) if args.fixtures else os.path.join(work, "fixtures")
+        print(f"Generating fixtures in {fixtures} ...", flush=True)
+        needed = {CASES[name][0] for name in names}
+        manifest = generate_fixtures(fixtures, args.files, args.seconds, args.pages)
+        manifest['sets'] = {k: v for k, v in manifest['sets'].items() if k in needed}
+        manifest_path = os.path.join(work, "manifest.json")
+        with open(manifest_path, 'w', encoding='utf-8') as f: json.dump(manifest, f)
+
+        results, failed = {}, False
+        print(f"{'case':<34} {'worker':<20} {'files/s':>8} {'MB/s':>8} {'peak MB':>8}  vs baseline")
+        for name in names:
+            fixture_set = CASES[name][0]
+            tools = CASE_TOOLS.get(name)
+            if fixture_set not in manifest['sets']:
+                print(f"{name:<34} skipped: {manifest['skipped'].get(fixture_set, 'no fixtures')}"); continue
+            if tools and not any(shutil.which(tool) for tool in tools):
+                print(f"{name:<34} skipped: {tools[0]} not found"); continue
+            try: result = measure(name, manifest_path, args.runs)
+            except RuntimeError as e:
+                failed = True; print(f"{name:<34} FAILED: {e}"); continue
+            results[name] = result
+            column, regressed = compare(result, baseline.get(name), args.tolerance)
+            failed |= regressed
+            peak = f"{result['peak_mb']:.0f}" if result['peak_mb'] is not None else "n/a"
+            print(f"{name:<34} {result['worker']:<20} {result['files_per_s']:8.2f} {result['mb_per_s']:8.1f} {peak:>8}  {column}", flush=True)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], "platform": platform.platform(), "cases": results}, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
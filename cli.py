@@ -0,0 +1,222 @@
+# cli.py
+"""Headless batch converter sharing the desktop app's conversion core.
+
+Runs without a display or a Qt event loop and reports progress as JSON lines on stdout:
+
+    python -m cli "C:\\Footage\\*.mov" D:\\Scans --to mp4 --preset "Web 720p" --jobs 4
+    python -m cli D:\\Shoot --to jpg,webp,tiff
+
+With several targets, those an input can write from a single decode (images, video, audio)
+run as one job; the others get a job each. Finished and failed jobs carry their core.metrics
+record (phase timings, CPU time, peak RSS, bytes in and out), which also goes to the app's
+metrics log unless that is turned off in the preferences.
+"""
+
+import argparse
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from PyQt6.QtCore import Qt
+
+from core.cache import DEFAULT_MAX_MB as DEFAULT_CACHE_MAX_MB, ConversionCache
+from core.dispatch import build_output_path, create_fan_out_worker, create_worker, default_job_settings, find_output_category
+from core.formats import can_fan_out, get_file_category
+from core.process_host import DEFAULT_RECYCLE_AFTER, configure_process_host, shutdown_process_host
+from core.metrics import JobMetrics, configure_metrics, summarize
+from core.libreoffice import DEFAULT_INSTANCES as DEFAULT_LIBREOFFICE_INSTANCES, configure_libreoffice_service, shutdown_libreoffice_service
+from core.scan import scan_directory
+from core.scheduler import JobScheduler
+from core.segmented import DEFAULT_SEGMENTS, configure_segmented_encoding
+from core.pdf_docx import DEFAULT_PAGE_CAP as DEFAULT_PDF_PAGE_CAP, DEFAULT_PARALLEL as DEFAULT_PDF_PARALLEL, configure_pdf_to_docx
+
+
+def expand_inputs(patterns, recursive=False):
+    """Expands files, directories and glob patterns into a de-duplicated list of files.
+
+    Files found by walking a directory are kept only if their extension is supported;
+    files named explicitly are always returned so that they can be reported as skipped.
+    """
+    seen, files = set(), []
+    def add(path):
+        path = os.path.abspath(path)
+        if path not in seen: seen.add(path); files.append(path)
+
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for match in sorted(matches):
+            if os.path.isdir(match):
+                for path in scan_directory(match, recursive): add(path)
+            elif os.path.isfile(match):
+                add(match)
+    return files
+
+def load_settings(settings_file):
+    if not os.path.exists(settings_file): return {}
+    with open(settings_file, 'r') as f: return json.load(f)
+
+def resolve_job_settings(presets, category, preset_names):
+    """Starts from the defaults and layers every named preset that exists for this category."""
+    settings = default_job_settings()
+    for name in preset_names:
+        if name in presets.get(category, {}): settings.update(presets[category][name])
+    return settings
+
+
+class BatchRunner:
+    """Drives workers on plain threads. Only the calling thread touches the scheduler or stdout."""
+    def __init__(self, max_workers, engine_limits, out=sys.stdout):
+        self.out = out
+        self.events = queue.Queue()
+        self.scheduler = JobScheduler(self.start_job, max_workers, engine_limits)
+        self.jobs, self.running = {}, {}
+        self.last_progress, self.last_stats = {}, {}
+        self.cached = set()
+        self.failed = 0; self.completed = 0
+        self.metrics, self.records = {}, []
+        self.started = time.monotonic()
+
+    def emit(self, event, job_id=None, **fields):
+        record = {'event': event}
+        if job_id is not None: record.update(job=job_id, input=self.jobs[job_id]['input'])
+        record.update(fields)
+        self.out.write(json.dumps(record) + "\n"); self.out.flush()
+
+    def submit(self, job_id, input_path, output_path, worker, extra_outputs=()):
+        self.jobs[job_id] = {'input': input_path, 'output': output_path, 'extra_outputs': list(extra_outputs)}
+        self.metrics[job_id] = JobMetrics(worker.engine, [input_path])
+        self.emit('queued', job_id, output=output_path, engine=worker.engine, **({'extra_outputs': list(extra_outputs)} if extra_outputs else {}))
+        self.scheduler.submit(job_id, worker.engine, worker)
+
+    def start_job(self, job_id, worker):
+        # No event loop runs here, so the signals must be delivered on the worker's own thread.
+        direct = Qt.ConnectionType.DirectConnection
+        # Connected first, so a job's record is complete before its outcome reaches the queue.
+        worker.finished.connect(self.metrics[job_id].stop, direct); worker.error.connect(self.metrics[job_id].stop, direct)
+        if hasattr(worker, 'progress_updated'):
+            worker.progress_updated.connect(lambda r, v: self.events.put(('progress', r, v)), direct)
+        if hasattr(worker, 'stats_updated'):
+            worker.stats_updated.connect(lambda r, fps, speed: self.events.put(('stats', r, (fps, speed))), direct)
+        if hasattr(worker, 'plan_chosen'):
+            worker.plan_chosen.connect(lambda r, label: self.events.put(('plan', r, label)), direct)
+        if hasattr(worker, 'cache_hit'):
+            worker.cache_hit.connect(lambda r: self.events.put(('cache_hit', r, None)), direct)
+        worker.finished.connect(lambda r, o: self.events.put(('finished', r, o)), direct)
+        worker.error.connect(lambda r, m: self.events.put(('error', r, m)), direct)
+        self.running[job_id] = worker
+        self.emit('started', job_id)
+        threading.Thread(target=self.run_worker, args=(job_id, worker), daemon=True).start()
+
+    def run_worker(self, job_id, worker):
+        try: self.metrics[job_id].run(worker.run)
+        except Exception as e: self.events.put(('error', job_id, str(e)))
+        finally: self.events.put(('done', job_id, None))
+
+    def run(self):
+        while self.scheduler.has_work():
+            kind, job_id, value = self.events.get()
+            if kind == 'progress':
+                if self.last_progress.get(job_id) != value:
+                    self.last_progress[job_id] = value
+                    fps, speed = self.last_stats.get(job_id, (None, None))
+                    self.emit('progress', job_id, percent=value, **({'fps': fps, 'speed': speed} if speed else {}))
+            elif kind == 'stats':
+                self.last_stats[job_id] = value
+            elif kind == 'plan':
+                if job_id in self.metrics: self.metrics[job_id].plan = value
+                self.emit('plan', job_id, path=value)
+            elif kind == 'cache_hit':
+                self.cached.add(job_id)
+            elif kind == 'finished':
+                self.completed += 1
+                record = self.finish_metrics(job_id, "completed", [value, *self.jobs[job_id]['extra_outputs']], job_id in self.cached)
+                self.emit('finished', job_id, output=value, cached=job_id in self.cached, metrics=record)
+            elif kind == 'error':
+                self.failed += 1; self.emit('error', job_id, message=value, metrics=self.finish_metrics(job_id, "failed", error=value))
+            elif kind == 'done':
+                self.running.pop(job_id, None); self.scheduler.job_done(job_id)
+
+    def finish_metrics(self, job_id, status, output_paths=(), cached=False, error=None):
+        if (metrics := self.metrics.pop(job_id, None)) is None: return None
+        self.records.append(metrics.finish(status, output_paths, cached, error))
+        return self.records[-1]
+
+    def throughput(self):
+        """The batch's aggregate figures for the summary event."""
+        summary = summarize(self.records, time.monotonic() - self.started)
+        return {key: round(summary[key], 2) for key in ('elapsed_s', 'files_per_min', 'input_mb_s', 'output_mb_s', 'cpu_s')}
+
+    def cancel(self):
+        self.scheduler.clear()
+        for worker in list(self.running.values()): worker.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Convert files in batch without the GUI.")
+    parser.add_argument('inputs', nargs='+', help="Files, directories or glob patterns to convert.")
+    parser.add_argument('--to', required=True, dest='target', help="Target format, e.g. mp4, mp3, jpg, pdf, zip; several separated by commas.")
+    parser.add_argument('--preset', action='append', default=[], help="Preset name from settings.json (repeatable, one per category).")
+    parser.add_argument('--output-dir', help="Where to write results. Defaults to each file's own directory.")
+    parser.add_argument('--jobs', type=int, help="Maximum number of conversions running at once.")
+    parser.add_argument('--recursive', action='store_true', help="Descend into sub-directories of directory inputs.")
+    parser.add_argument('--in-process', action='store_true', help="Run image and PDF conversions on threads instead of worker processes.")
+    parser.add_argument('--segments', type=int, help="Encode long videos in this many parallel segments (1 disables; default: the app's preference).")
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, help="Reuse cached results for unchanged inputs (default: the app's preference).")
+    parser.add_argument('--profile', action='store_true', help="Save a cProfile .prof file per job next to the metrics log (in-process work only).")
+    parser.add_argument('--settings', default='settings.json', help="Settings file to read presets and engine limits from.")
+    args = parser.parse_args(argv)
+
+    try: settings = load_settings(args.settings)
+    except (OSError, ValueError) as e: parser.error(f"could not read {args.settings}: {e}")
+    presets = settings.get('presets', {})
+    for name in args.preset:
+        if not any(name in by_name for by_name in presets.values()): parser.error(f"unknown preset '{name}'")
+    if args.output_dir: args.output_dir = os.path.abspath(args.output_dir); os.makedirs(args.output_dir, exist_ok=True)
+
+    targets = list(dict.fromkeys(t.strip().lower().lstrip('.') for t in args.target.split(',') if t.strip()))
+    if not targets: parser.error("no target format given")
+    configure_process_host(settings.get('out_of_process_workers', True) and not args.in_process, settings.get('worker_recycle_after', DEFAULT_RECYCLE_AFTER))
+    configure_libreoffice_service(settings.get('libreoffice_instances', DEFAULT_LIBREOFFICE_INSTANCES))
+    configure_segmented_encoding(args.segments or settings.get('video_segments', DEFAULT_SEGMENTS))
+    configure_pdf_to_docx(settings.get('pdf_docx_parallel', DEFAULT_PDF_PARALLEL), settings.get('pdf_docx_page_cap', DEFAULT_PDF_PAGE_CAP))
+    configure_metrics(settings.get('record_metrics', True), args.profile or settings.get('profile_jobs', False))
+    use_cache = settings.get('cache_enabled', False) if args.cache is None else args.cache
+    cache = ConversionCache(max_mb=settings.get('cache_max_mb', DEFAULT_CACHE_MAX_MB)) if use_cache else None
+    runner = BatchRunner(args.jobs or settings.get('max_concurrent_jobs'), settings.get('engine_limits'))
+    inputs = expand_inputs(args.inputs, args.recursive)
+    skipped, job_id = 0, 0
+    for i_path in inputs:
+        i_ext = os.path.splitext(i_path)[1].lower()
+        supported = []
+        for target in targets:
+            if (o_cat := find_output_category(i_ext, target)) is not None: supported.append((o_cat, target)); continue
+            skipped += 1
+            runner.emit('skipped', input=i_path, message=f"Cannot convert '{i_ext}' to '{target}'.")
+        if not supported: continue
+        out_dir = args.output_dir or os.path.dirname(i_path)
+        job_settings = resolve_job_settings(presets, get_file_category(i_ext), args.preset)
+        fan_out = [t for t in supported if can_fan_out(i_ext, t[1])]
+        groups = ([fan_out] if len(fan_out) > 1 else []) + [[t] for t in supported if len(fan_out) < 2 or t not in fan_out]
+        for group in groups:
+            o_cat, target = group[0]
+            if len(group) > 1: worker = create_fan_out_worker(job_id, i_path, group, out_dir, job_settings)
+            else: worker = create_worker(job_id, i_path, o_cat, target, out_dir, job_settings, cache)
+            runner.submit(job_id, i_path, build_output_path(i_path, target, out_dir), worker,
+                          [build_output_path(i_path, t, out_dir) for _, t in group[1:]])
+            job_id += 1
+
+    try: runner.run()
+    except KeyboardInterrupt:
+        runner.cancel(); runner.emit('cancelled')
+        return 130
+    finally: shutdown_process_host(); shutdown_libreoffice_service()
+    runner.emit('summary', total=job_id + skipped, completed=runner.completed, cached=len(runner.cached), failed=runner.failed, skipped=skipped,
+                **runner.throughput())
+    return 1 if runner.failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
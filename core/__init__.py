@@ -0,0 +1,2 @@
+# core/__init__.py
+"""UI-free conversion core shared by the desktop app (main.py) and the command line (cli.py)."""
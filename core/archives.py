@@ -0,0 +1,377 @@
+# core/archives.py
+"""Streaming archive conversion.
+
+Entries are moved one at a time from a reader to a writer, so converting an archive needs
+neither a full extraction on disk nor the whole archive in memory. ZIP/JAR, TAR (plain or
+gzip/bzip2/xz compressed) and single-file .gz/.bz2/.xz/.lzma are read with the standard
+library; every other format is read through one `7z x -so` stream, which 7-Zip writes in
+the order of its `7z l -slt` listing. ZIP and TAR are written natively. 7-Zip cannot take
+several files on stdin, so 7z output is the one case that still stages the entries on disk
+before `7z a`.
+"""
+
+import bz2
+import datetime
+import gzip
+import lzma
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+
+from core.metrics import MeasuredPopen, run_process
+
+CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_SIZE = 64 * 1024 * 1024   # unknown-size entries bound for a tar are buffered in memory up to this size
+SINGLE_FILE_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open, ".lzma": lzma.open}
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class ArchiveEntry:
+    """One member. `kind` is 'file', 'dir' or 'symlink'; `size` may be None when the format does not record it."""
+    def __init__(self, name, kind='file', size=None, mtime=None, mode=None, linkname=""):
+        # Normalised to a relative 'a/b/c' path: tar members often start with './'.
+        self.name = '/'.join(p for p in name.replace('\\', '/').split('/') if p not in ('', '.'))
+        self.kind, self.size, self.mtime, self.mode, self.linkname = kind, size, mtime, mode, linkname
+
+
+def _creationflags():
+    return subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+
+def _find_7z():
+    path = shutil.which('7z') or shutil.which('7za') or shutil.which('7zz')
+    if not path: raise ArchiveError("7-Zip (7z.exe) not found. Please use Help > Dependency Checker to verify it is in the system's PATH.")
+    return path
+
+
+# =============================================================================
+# READERS: iterate (entry, stream) pairs; a stream is only valid until the next entry.
+# =============================================================================
+
+class _PositionReader:
+    """Reports how far through the source file the underlying reads have got."""
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.total = os.path.getsize(path) or 1
+
+    def fraction(self):
+        try: return min(1.0, self.file.tell() / self.total)
+        except (OSError, ValueError): return 0.0
+
+    def close(self):
+        self.file.close()
+
+
+class ZipReader(_PositionReader):
+    def __iter__(self):
+        with zipfile.ZipFile(self.file) as zf:
+            for info in zf.infolist():
+                mode = info.external_attr >> 16
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                if info.is_dir():
+                    yield ArchiveEntry(info.filename, 'dir', 0, mtime, stat.S_IMODE(mode) or None), None
+                elif stat.S_ISLNK(mode):
+                    yield ArchiveEntry(info.filename, 'symlink', 0, mtime, stat.S_IMODE(mode), zf.read(info).decode('utf-8')), None
+                else:
+                    with zf.open(info) as stream:
+                        yield ArchiveEntry(info.filename, 'file', info.file_size, mtime, stat.S_IMODE(mode) or None), stream
+
+
+class TarReader(_PositionReader):
+    """Hard links become plain files holding their target's data; device and FIFO members raise ArchiveError."""
+    def __init__(self, path):
+        super().__init__(path)
+        self.links = None
+
+    def __iter__(self):
+        # Stream mode ('r|*') reads the members strictly in order, without seeking back.
+        with tarfile.open(fileobj=self.file, mode='r|*') as tf:
+            for member in tf:
+                if member.isdir():
+                    yield ArchiveEntry(member.name, 'dir', 0, member.mtime, member.mode), None
+                elif member.issym():
+                    yield ArchiveEntry(member.name, 'symlink', 0, member.mtime, member.mode, member.linkname), None
+                elif member.isfile():
+                    yield ArchiveEntry(member.name, 'file', member.size, member.mtime, member.mode), tf.extractfile(member)
+                elif member.islnk():
+                    target = self._link_target(member)
+                    yield ArchiveEntry(member.name, 'file', target.size, member.mtime, member.mode), self.links.extractfile(target)
+                else:
+                    raise ArchiveError(f"'{member.name}' is a device or FIFO entry, which cannot be converted.")
+
+    def _link_target(self, member):
+        # The data of a hard link is stored with the member it links to, which stream mode has
+        # already read past; a second, seekable handle reads it from there.
+        if self.links is None: self.links = tarfile.open(self.file.name, 'r:*')
+        try: target = self.links.getmember(member.linkname)
+        except KeyError: raise ArchiveError(f"'{member.name}' is a hard link to '{member.linkname}', which is not in the archive.") from None
+        return self._link_target(target) if target.islnk() else target
+
+    def close(self):
+        if self.links is not None: self.links.close()
+        super().close()
+
+
+class CompressedFileReader(_PositionReader):
+    """A single compressed file (.gz, .bz2, .xz, .lzma): one entry named after the archive."""
+    def __iter__(self):
+        name, ext = os.path.splitext(os.path.basename(self.file.name))
+        with SINGLE_FILE_OPENERS[ext.lower()](self.file) as stream:
+            yield ArchiveEntry(name, 'file', None, os.path.getmtime(self.file.name), 0o644), stream
+
+
+class SevenZipReader:
+    """Any format 7-Zip can read: the listing gives the entries, one `7z x -so` run gives their data back to back."""
+    def __init__(self, path):
+        self.path, self.seven_zip = path, _find_7z()
+        listing = run_process([self.seven_zip, 'l', '-slt', path], capture_output=True, text=True, encoding='utf-8', errors='replace',
+                              creationflags=_creationflags())
+        if listing.returncode != 0: raise ArchiveError(f"7-Zip could not list the archive (Code: {listing.returncode}).\n{listing.stderr}")
+        self.entries = parse_7z_listing(listing.stdout)
+        self.total = sum(e.size or 0 for e in self.entries if e.kind != 'dir') or 1
+        self.done, self.process, self.stderr = 0, None, []
+
+    def fraction(self):
+        return min(1.0, self.done / self.total)
+
+    def __iter__(self):
+        self.process = MeasuredPopen([self.seven_zip, 'x', '-so', '-y', self.path], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     stdin=subprocess.DEVNULL, creationflags=_creationflags())
+        drain = threading.Thread(target=lambda: self.stderr.extend(self.process.stderr), daemon=True); drain.start()
+        for entry in self.entries:
+            if entry.kind == 'dir':
+                yield entry, None
+            elif entry.kind == 'symlink':
+                # 7-Zip stores a link's target as its data.
+                entry.linkname = self._read_exactly(entry.size).decode('utf-8'); entry.size = 0
+                yield entry, None
+            else:
+                stream = _BoundedStream(self, entry.size)
+                yield entry, stream
+                stream.skip_rest()
+        trailing = self.process.stdout.read(1)
+        self.process.wait(); drain.join()
+        if self.process.returncode != 0 or trailing:
+            detail = b"".join(self.stderr).decode('utf-8', 'replace').strip()
+            raise ArchiveError(f"7-Zip extraction failed (Code: {self.process.returncode}).\n{detail}")
+
+    def _read_exactly(self, size):
+        data = self.process.stdout.read(size)
+        if len(data) != size: raise ArchiveError("7-Zip's output ended before the archive listing did; the archive may be damaged or encrypted.")
+        self.done += size
+        return data
+
+    def close(self):
+        if self.process and self.process.poll() is None: self.process.kill(); self.process.wait()
+
+
+class _BoundedStream:
+    """A read-only view of the next `size` bytes of the 7z output."""
+    def __init__(self, reader, size):
+        self.reader, self.remaining = reader, size
+
+    def read(self, n=-1):
+        n = self.remaining if n is None or n < 0 else min(n, self.remaining)
+        if n == 0: return b""
+        data = self.reader._read_exactly(n)
+        self.remaining -= n
+        return data
+
+    def skip_rest(self):
+        while self.remaining: self.read(CHUNK_SIZE)
+
+
+def parse_7z_listing(text):
+    """Turns `7z l -slt` output into ArchiveEntry objects, in archive order."""
+    _, sep, body = text.replace('\r\n', '\n').partition('\n----------\n')
+    entries = []
+    for block in (body if sep else "").split('\n\n'):
+        fields = dict(line.split(' = ', 1) for line in block.split('\n') if ' = ' in line)
+        if 'Path' not in fields: continue
+        attributes = fields.get('Attributes', '').split()
+        unix = next((a for a in attributes if len(a) == 10 and a[0] in '-dl'), "")
+        if fields.get('Folder') == '+' or (attributes and 'D' in attributes[0]) or unix.startswith('d'): kind = 'dir'
+        elif unix.startswith('l'): kind = 'symlink'
+        else: kind = 'file'
+        try: mtime = datetime.datetime.strptime(fields.get('Modified', '')[:19], "%Y-%m-%d %H:%M:%S").timestamp()
+        except ValueError: mtime = None
+        entries.append(ArchiveEntry(fields['Path'], kind, int(fields.get('Size') or 0), mtime, _parse_unix_mode(unix)))
+    return entries
+
+def _parse_unix_mode(text):
+    if len(text) != 10: return None
+    return sum(1 << (8 - i) for i, c in enumerate(text[1:]) if c != '-')
+
+def open_reader(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".zip", ".jar") and zipfile.is_zipfile(path): return ZipReader(path)
+    if tarfile.is_tarfile(path): return TarReader(path)
+    if ext in SINGLE_FILE_OPENERS: return CompressedFileReader(path)
+    return SevenZipReader(path)
+
+
+# =============================================================================
+# WRITERS
+# =============================================================================
+
+class ZipWriter:
+    def __init__(self, path):
+        self.zf = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+
+    def add(self, entry, stream, copy):
+        date_time = time.localtime(entry.mtime if entry.mtime and entry.mtime > 315532800 else 315532800)[:6]  # ZIP cannot store dates before 1980
+        info = zipfile.ZipInfo(entry.name + ('/' if entry.kind == 'dir' and not entry.name.endswith('/') else ''), date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        if entry.kind == 'dir':
+            info.external_attr = ((stat.S_IFDIR | (entry.mode or 0o755)) << 16) | 0x10
+            self.zf.writestr(info, b"")
+        elif entry.kind == 'symlink':
+            # Info-ZIP convention: a symlink is a member whose Unix mode says so and whose data is the target.
+            info.external_attr = (stat.S_IFLNK | (entry.mode or 0o777)) << 16
+            self.zf.writestr(info, entry.linkname.encode('utf-8'))
+        else:
+            info.external_attr = (stat.S_IFREG | (entry.mode or 0o644)) << 16
+            if entry.size is not None: info.file_size = entry.size
+            with self.zf.open(info, 'w', force_zip64=entry.size is None or entry.size > 0x7FFFFFFF) as out: copy(stream, out)
+
+    def close(self):
+        self.zf.close()
+
+    abort = close
+
+
+class TarWriter:
+    def __init__(self, path):
+        self.tf = tarfile.open(path, 'w', format=tarfile.PAX_FORMAT)
+
+    def add(self, entry, stream, copy):
+        info = tarfile.TarInfo(entry.name.rstrip('/'))
+        info.mtime = entry.mtime or time.time()
+        if entry.kind == 'dir':
+            info.type, info.mode = tarfile.DIRTYPE, entry.mode or 0o755
+            self.tf.addfile(info)
+        elif entry.kind == 'symlink':
+            info.type, info.mode, info.linkname = tarfile.SYMTYPE, entry.mode or 0o777, entry.linkname
+            self.tf.addfile(info)
+        else:
+            info.mode = entry.mode or 0o644
+            if entry.size is None:
+                # A tar header needs the size up front; spool the data to find it out.
+                spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+                copy(stream, spool); info.size = spool.tell(); spool.seek(0)
+                self.tf.addfile(info, spool); spool.close()
+            else:
+                info.size = entry.size
+                self.tf.addfile(info, _CopyingStream(stream, copy))
+
+    def close(self):
+        self.tf.close()
+
+    abort = close
+
+
+class _CopyingStream:
+    """Routes tarfile's reads through the conversion's copy loop, so progress and cancellation still apply."""
+    def __init__(self, stream, copy):
+        self.stream, self.copy = stream, copy
+
+    def read(self, n=-1):
+        return self.copy.read(self.stream, n)
+
+
+class SevenZipWriter:
+    """Stages the entries in a scratch directory, then packs them with one `7z a` call."""
+    def __init__(self, path):
+        self.path, self.seven_zip = path, _find_7z()
+        self.staging = tempfile.mkdtemp(prefix="fileconverter-7z-")
+        self.top_level = set()
+
+    def add(self, entry, stream, copy):
+        parts = [p for p in entry.name.split('/') if p]
+        if not parts or any(p == '..' for p in parts): return # never write outside the staging directory
+        target = os.path.join(self.staging, *parts)
+        self.top_level.add(parts[0])
+        if entry.kind == 'dir':
+            os.makedirs(target, exist_ok=True); return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if entry.kind == 'symlink':
+            try: os.symlink(entry.linkname, target); return
+            except OSError: pass # e.g. no symlink privilege on Windows; fall through and store nothing
+        else:
+            with open(target, 'wb') as out: copy(stream, out)
+            if entry.mode: os.chmod(target, entry.mode & 0o7777)
+        if entry.mtime: os.utime(target, (entry.mtime, entry.mtime), follow_symlinks=False)
+
+    def close(self):
+        try:
+            if self.top_level:
+                # Explicit names instead of a '*' wildcard, so dotfiles are packed too.
+                cmd = [self.seven_zip, 'a', '-t7z', '-snl', '-y', self.path] + sorted(self.top_level)
+                proc = run_process(cmd, cwd=self.staging, capture_output=True, text=True, creationflags=_creationflags())
+                if proc.returncode != 0: raise ArchiveError(f"7-Zip could not create the archive (Code: {proc.returncode}).\n{proc.stderr or proc.stdout}")
+        finally:
+            shutil.rmtree(self.staging, ignore_errors=True)
+
+    def abort(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+WRITERS = {"zip": ZipWriter, "tar": TarWriter, "7z": SevenZipWriter}
+
+
+# =============================================================================
+# CONVERSION
+# =============================================================================
+
+class _Copier:
+    """Copies entry data in chunks, reporting progress and checking for cancellation after each one."""
+    def __init__(self, reader, progress, should_stop):
+        self.reader, self.progress, self.should_stop = reader, progress, should_stop
+        self.last_percent = -1
+
+    def __call__(self, src, dst):
+        while (chunk := self.read(src, CHUNK_SIZE)): dst.write(chunk)
+
+    def read(self, src, n):
+        if self.should_stop and self.should_stop(): raise ArchiveError("Cancelled.")
+        data = src.read(n)
+        self.report()
+        return data
+
+    def report(self):
+        percent = int(self.reader.fraction() * 100)
+        if self.progress and percent != self.last_percent: self.last_percent = percent; self.progress(percent)
+
+
+def convert_archive(input_path, output_path, progress=None, should_stop=None):
+    """Re-packs `input_path` into the format of `output_path`'s extension. Raises ArchiveError on failure."""
+    target = os.path.splitext(output_path)[1][1:].lower()
+    if target not in WRITERS: raise ArchiveError(f"Cannot write '{target}' archives.")
+    reader = open_reader(input_path)
+    copier = _Copier(reader, progress, should_stop)
+    # 7z would add to an existing archive instead of replacing it.
+    if os.path.exists(output_path): os.remove(output_path)
+    writer = WRITERS[target](output_path)
+    try:
+        for entry, stream in reader:
+            if not entry.name: continue
+            writer.add(entry, stream, copier)
+            copier.report()
+        writer.close(); writer = None
+    except Exception:
+        if writer is not None:
+            try: writer.abort()
+            except Exception: pass
+        if os.path.exists(output_path): os.remove(output_path)
+        raise
+    finally:
+        reader.close()
+    return output_path
@@ -0,0 +1,56 @@
+# core/backends.py
+"""Lazy registry for the heavy format libraries.
+
+Nothing here is imported until a job needs it, so starting the app (or converting a single
+MP3) does not pay for rawpy, pdf2docx, PyMuPDF, pypdf or the HEIF/AVIF Pillow plugins.
+"""
+
+import importlib
+import os
+import threading
+
+# Backend name -> (module to import, pip package to suggest when it is missing)
+BACKENDS = {
+    "pillow": ("PIL.Image", "Pillow"),
+    "rawpy": ("rawpy", "rawpy"),
+    "pdf2docx": ("pdf2docx", "pdf2docx"),
+    "fitz": ("fitz", "PyMuPDF"),
+    "pypdf": ("pypdf", "pypdf"),
+    "pillow_heif": ("pillow_heif", "pillow-heif"),
+    "pillow_avif": ("pillow_avif", "pillow-avif-plugin"),
+    "qt_material": ("qt_material", "qt-material"),
+}
+
+# Pillow plugins that must be registered before Image.open() can read these extensions.
+IMAGE_PLUGINS = {".heic": "pillow_heif", ".heif": "pillow_heif", ".avif": "pillow_avif"}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+class BackendUnavailableError(ImportError):
+    pass
+
+
+def require(name):
+    """Imports and returns a backend module, loading it on first use."""
+    if name in _loaded: return _loaded[name]
+    module_name, package = BACKENDS[name]
+    with _lock:
+        if name not in _loaded:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                raise BackendUnavailableError(f"The '{package}' package is required for this conversion but could not be loaded ({e}). "
+                                              "Run install_requirements.bat to install it.") from e
+            if name == "pillow_heif": module.register_heif_opener()
+            _loaded[name] = module
+    return _loaded[name]
+
+def require_image_plugins(*paths):
+    """Registers the Pillow plugins needed to read or write the given files."""
+    for path in paths:
+        if (plugin := IMAGE_PLUGINS.get(os.path.splitext(path)[1].lower())): require(plugin)
+
+def is_loaded(name):
+    return name in _loaded
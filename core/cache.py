@@ -0,0 +1,156 @@
+# core/cache.py
+"""Content-addressed cache of conversion outputs.
+
+An entry is keyed by a hash of the input file's bytes, the target format, the job's settings
+dict and a fingerprint of the engine that produced it. Re-running a batch copies earlier
+outputs (as reflinks where the filesystem supports them) instead of converting again; they
+are never hard-linked, so editing a converted file in place cannot change the cached entry
+it came from. Entries are plain files; their mtime
+is bumped on every hit and the least recently used ones are deleted once the cache grows
+past its size cap.
+"""
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_MB = 2048
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_MEMO_SIZE = 4096  # input files whose digest is remembered (least recently used ones are forgotten)
+FICLONE = 0x40049409  # Linux ioctl: the copy shares the source's blocks until either is written (Btrfs, XFS)
+
+# Engine -> Python packages and external programs whose versions change the output.
+ENGINE_COMPONENTS = {
+    "ffmpeg": ([], ["ffmpeg"]),
+    "image": (["Pillow", "rawpy", "pillow-heif", "pillow-avif-plugin"], []),
+    "pdf": (["pdf2docx", "PyMuPDF", "pypdf"], []),
+    "libreoffice": ([], ["soffice"]),
+    "archive": ([], ["7z"]),
+}
+
+
+def default_cache_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "FileConverter", "cache")
+
+def _package_version(name):
+    try: return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError: return None
+
+def _program_fingerprint(name):
+    # Running `soffice --version` costs a full start-up, so identify programs by their binary instead.
+    path = shutil.which(name)
+    if not path: return None
+    st = os.stat(path)
+    return f"{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+def _copy(src, dst):
+    """Copies `src` to a new, independent file at `dst`: a reflink where possible, otherwise byte by byte."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst: fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError: pass
+    shutil.copy2(src, dst)
+
+
+class ConversionCache:
+    def __init__(self, directory=None, max_mb=DEFAULT_MAX_MB):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_mb * 1024 * 1024
+        self.lock = threading.Lock()
+        self.total_bytes = None
+        self.file_hashes = OrderedDict()  # path -> (size, mtime_ns, digest)
+        self.hashes_lock = threading.Lock()
+        self.engine_versions = {}
+
+    def hash_file(self, path):
+        """Streams the file through BLAKE2b; the digest is remembered while the path's size and mtime stay the same."""
+        st = os.stat(path)
+        path = os.path.abspath(path)
+        with self.hashes_lock:
+            size, mtime, digest = self.file_hashes.get(path, (None, None, None))
+            if (size, mtime) == (st.st_size, st.st_mtime_ns):
+                self.file_hashes.move_to_end(path)
+                return digest
+        with open(path, 'rb') as f:
+            digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=32)).hexdigest()
+        with self.hashes_lock:
+            self.file_hashes[path] = (st.st_size, st.st_mtime_ns, digest)
+            self.file_hashes.move_to_end(path)
+            while len(self.file_hashes) > HASH_MEMO_SIZE: self.file_hashes.popitem(last=False)
+        return digest
+
+    def engine_version(self, engine):
+        if engine not in self.engine_versions:
+            packages, programs = ENGINE_COMPONENTS.get(engine, ([], []))
+            self.engine_versions[engine] = {**{p: _package_version(p) for p in packages}, **{p: _program_fingerprint(p) for p in programs}}
+        return self.engine_versions[engine]
+
+    def make_key(self, input_path, target_format, settings, engine, variant=""):
+        """`variant` separates jobs that share an engine but produce different output (e.g. the worker mode)."""
+        material = json.dumps({
+            'version': CACHE_FORMAT_VERSION, 'input': self.hash_file(input_path), 'target': target_format,
+            'settings': settings or {}, 'engine': engine, 'engine_version': self.engine_version(engine), 'variant': variant,
+        }, sort_keys=True, default=str)
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=32).hexdigest()
+
+    def entry_path(self, key, target_format):
+        return os.path.join(self.directory, key[:2], f"{key}.{target_format}")
+
+    def fetch(self, key, target_format, output_path):
+        """Places a cached output at `output_path`. Returns False on a cache miss."""
+        entry = self.entry_path(key, target_format)
+        if not os.path.isfile(entry): return False
+        os.utime(entry)
+        if os.path.lexists(output_path): os.remove(output_path)
+        _copy(entry, output_path)
+        return True
+
+    def store(self, key, target_format, output_path):
+        entry = self.entry_path(key, target_format)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp = f"{entry}.{threading.get_ident()}.tmp"
+        _copy(output_path, tmp)
+        os.replace(tmp, entry)
+        with self.lock:
+            if self.total_bytes is not None: self.total_bytes += os.path.getsize(entry)
+        self.evict()
+
+    def _entries(self):
+        if not os.path.isdir(self.directory): return []
+        entries = []
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir(): continue
+            for e in os.scandir(sub.path):
+                if e.is_file() and not e.name.endswith('.tmp'):
+                    st = e.stat(); entries.append((st.st_mtime, st.st_size, e.path))
+        return entries
+
+    def evict(self):
+        with self.lock:
+            if self.total_bytes is None: self.total_bytes = sum(size for _, size, _ in self._entries())
+            if self.total_bytes <= self.max_bytes: return
+            # Trim to 90% of the cap so the next few stores do not trigger another scan.
+            entries = sorted(self._entries())
+            self.total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if self.total_bytes <= self.max_bytes * 0.9: break
+                try: os.remove(path); self.total_bytes -= size
+                except OSError: pass
+
+    def clear(self):
+        with self.lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.total_bytes = 0
@@ -0,0 +1,99 @@
+# core/dispatch.py
+
+import os
+import shutil
+import uuid
+
+from core.formats import FLEXIBLE_CONVERSION_MAP, RAW_EXTENSIONS, get_file_category
+from core.workers import (
+    FFmpegWorker, FFmpegFanOutWorker, FFmpegGifWorker, ImageWorker, RawImageWorker, PdfToDocxWorker,
+    PdfToTextWorker, LibreOfficeWorker, ArchiveWorker, PlaceholderWorker, CachedWorker, MergeWorker, StagedWorker
+)
+
+# Jobs write into a hidden folder of this name inside the output folder; see StagedWorker.
+STAGING_PREFIX = ".converting-"
+
+
+def default_job_settings():
+    """The per-job settings dict every new file starts with (the table's UserRole data)."""
+    return {'quality': 95, 'resize': "None", 'video_bitrate': "Default", 'remove_audio': False, 'audio_bitrate': "Default", 'raw_mode': "Auto"}
+
+def find_output_category(file_ext, target_format):
+    """Returns the output category offering `target_format` for this input, or None if unsupported."""
+    for cat, fmts in FLEXIBLE_CONVERSION_MAP.get(file_ext, {}).items():
+        if target_format in fmts: return cat
+    return None
+
+def build_output_path(input_path, target_format, output_dir):
+    base = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"{base}.{target_format}")
+
+def new_staging_dir(output_dir):
+    return os.path.join(output_dir, f"{STAGING_PREFIX}{uuid.uuid4().hex[:12]}")
+
+def remove_stale_staging(output_dir):
+    """Deletes staging folders that jobs interrupted by a crash left behind in `output_dir`."""
+    try: entries = [e for e in os.scandir(output_dir) if e.name.startswith(STAGING_PREFIX) and e.is_dir()]
+    except OSError: return
+    for entry in entries: shutil.rmtree(entry.path, ignore_errors=True)
+
+def create_worker(row, i_path, o_cat, t_fmt, output_dir, settings, cache=None):
+    """Picks the worker for one conversion job. Shared by the GUI and the command line.
+
+    With a ConversionCache the worker is wrapped so that unchanged inputs are not converted again.
+    Outputs are staged and only renamed into `output_dir` once the job succeeded.
+    """
+    staging_dir = new_staging_dir(output_dir)
+    worker = select_worker(row, i_path, o_cat, t_fmt, output_dir, settings, staging_dir)
+    if isinstance(worker, PlaceholderWorker): return worker
+    if cache is not None: worker = CachedWorker(worker, cache, i_path, build_output_path(i_path, t_fmt, staging_dir), settings)
+    return StagedWorker(worker, staging_dir, output_dir)
+
+def create_fan_out_worker(row, i_path, targets, output_dir, settings):
+    """One worker writing every (output category, format) of `targets` from a single decode of the input.
+
+    The first target is the row's own; its path is the one reported when the job finishes. Only
+    targets for which core.formats.can_fan_out holds can be combined. Fan-out jobs are not cached.
+    """
+    staging_dir = new_staging_dir(output_dir)
+    outputs = [(o_cat, build_output_path(i_path, t_fmt, staging_dir)) for o_cat, t_fmt in targets]
+    i_ext = os.path.splitext(i_path)[1].lower()
+    if get_file_category(i_ext) == "image":
+        worker_class = RawImageWorker if i_ext in RAW_EXTENSIONS else ImageWorker
+        worker = worker_class(row, i_path, outputs[0][1], settings, extra_outputs=[o_path for _, o_path in outputs[1:]])
+    else:
+        worker = FFmpegFanOutWorker(row, i_path, outputs, settings)
+    return StagedWorker(worker, staging_dir, output_dir)
+
+def create_merge_worker(row, inputs, output_path, category):
+    """Joins `inputs` (PDFs or videos of `category`) into `output_path`, staged like every other job."""
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    staging_dir = new_staging_dir(output_dir)
+    worker = MergeWorker(row, inputs, os.path.join(staging_dir, os.path.basename(output_path)), category)
+    return StagedWorker(worker, staging_dir, output_dir)
+
+def select_worker(row, i_path, o_cat, t_fmt, output_dir, settings, staging_dir=None):
+    """The worker for one job. With a `staging_dir` the output is written there instead of into `output_dir`."""
+    o_path = build_output_path(i_path, t_fmt, staging_dir or output_dir)
+    i_ext = os.path.splitext(i_path)[1].lower(); i_cat = get_file_category(i_ext)
+
+    if i_ext == ".pdf" and t_fmt == "docx":
+        return PdfToDocxWorker(row, i_path, o_path)
+    elif i_ext == ".pdf" and t_fmt == "txt":
+        return PdfToTextWorker(row, i_path, o_path)
+    elif i_cat == "video" and t_fmt == "gif":
+        return FFmpegGifWorker(row, i_path, o_path, settings)
+    elif i_cat=="video" and o_cat=="audio":
+        return FFmpegWorker(row,i_path,o_path,"video_to_audio",settings)
+    elif i_cat=="video" and o_cat=="image":
+        return FFmpegWorker(row,i_path,o_path,"video_to_image",settings)
+    elif i_cat==o_cat:
+        if i_cat in ["video","audio"]:
+            return FFmpegWorker(row,i_path,o_path,"default",settings)
+        elif i_cat=="image":
+            return RawImageWorker(row, i_path, o_path, settings) if i_ext in RAW_EXTENSIONS else ImageWorker(row, i_path, o_path, settings)
+        elif i_cat in ["document","presentation","spreadsheet"]:
+            return LibreOfficeWorker(row,i_path,o_path,output_dir)
+        elif i_cat=="archive":
+            return ArchiveWorker(row,i_path,o_path)
+    return PlaceholderWorker(row, f"{i_cat} to {o_cat}")
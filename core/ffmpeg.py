@@ -0,0 +1,76 @@
+# core/ffmpeg.py
+"""Runs ffmpeg with its machine-readable `-progress` stream.
+
+ffmpeg's human-readable status line is rewritten in place with '\r', so reading it line by
+line stalls until the end. With `-progress pipe:1 -nostats` ffmpeg instead writes blocks of
+key=value lines to stdout, each terminated by `progress=continue` (or `progress=end`).
+"""
+
+import collections
+import subprocess
+import sys
+import threading
+
+from core.metrics import MeasuredPopen
+
+PROGRESS_ARGS = ['-progress', 'pipe:1', '-nostats']
+
+
+class FFmpegProcess:
+    """One ffmpeg invocation. `run()` blocks and reports every progress block to `on_progress`.
+
+    `on_progress(stats)` receives a dict with 'out_time' (seconds, float), 'fps' and 'speed'
+    (floats, 0 when not yet known).
+    """
+    def __init__(self, cmd):
+        # Insert the progress options right after the program name so they apply globally.
+        self.cmd = cmd[:1] + PROGRESS_ARGS + cmd[1:]
+        self.process = None
+        self.stderr_tail = collections.deque(maxlen=20)
+        self.lock = threading.Lock()
+        self.stopped = False
+
+    def run(self, on_progress=None):
+        """Returns ffmpeg's exit code, or -1 without starting it if `stop()` was already called."""
+        with self.lock:
+            if self.stopped: return -1
+            self.process = MeasuredPopen(self.cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                                       universal_newlines=True, encoding='utf-8', errors='replace',
+                                       creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0)
+        # Drain stderr on the side so a chatty ffmpeg can never block on a full pipe.
+        drain = threading.Thread(target=self._drain_stderr, daemon=True); drain.start()
+        block = {}
+        for line in self.process.stdout:
+            key, _, value = line.strip().partition('=')
+            if key != 'progress':
+                block[key] = value
+                continue
+            if on_progress: on_progress(parse_progress_block(block))
+            block = {}
+        self.process.wait(); drain.join()
+        return self.process.returncode
+
+    def _drain_stderr(self):
+        for line in self.process.stderr:
+            if line.strip(): self.stderr_tail.append(line.rstrip())
+
+    def error_message(self, prefix="FFmpeg error"):
+        detail = self.stderr_tail[-1] if self.stderr_tail else ""
+        code = self.process.returncode if self.process else -1
+        return f"{prefix} (code {code}){': ' + detail if detail else ''}"
+
+    def stop(self):
+        # Recorded under the lock so a stop that comes before `run()` keeps ffmpeg from being started at all.
+        with self.lock:
+            self.stopped = True
+            process = self.process
+        if process and process.poll() is None: process.terminate(); process.wait()
+
+
+def parse_progress_block(block):
+    def number(value):
+        try: return float(value.rstrip('x'))
+        except (AttributeError, ValueError): return 0.0
+    # out_time_us is the documented key; older builds only emit out_time_ms (which is also microseconds).
+    out_time = block.get('out_time_us', block.get('out_time_ms'))
+    return {'out_time': max(0.0, number(out_time) / 1_000_000), 'fps': number(block.get('fps')), 'speed': number(block.get('speed'))}
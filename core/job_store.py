@@ -0,0 +1,115 @@
+# core/job_store.py
+"""A crash-safe record of the GUI's job queue.
+
+Every job the user starts is written to a small SQLite database together with its input,
+targets, settings and output folder, and its status is updated as it runs. A batch that
+ends normally (or is cancelled) clears the table, so anything still in it at start-up
+belongs to a batch the app did not get to finish. The database runs in WAL mode with
+`synchronous=NORMAL`: a power cut may lose the last status updates, which only means a
+finished job is converted again, never that a job is forgotten. The connection keeps the
+database locked, so a second copy of the app cannot open it and mistake the first one's
+running jobs for interrupted ones.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+STORE_NAME = "queue.sqlite3"
+
+StoredJob = namedtuple("StoredJob", "id spec status outputs")
+
+
+def default_store_path():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(base, "FileConverter", STORE_NAME)
+
+def output_signature(path):
+    """[path, size, mtime_ns] of a finished output, or None if it is not there."""
+    try: st = os.stat(path)
+    except OSError: return None
+    return [path, st.st_size, st.st_mtime_ns]
+
+def verified(outputs):
+    """Whether every recorded output is still on disk exactly as the job left it."""
+    return bool(outputs) and all(output_signature(path) == [path, size, mtime] for path, size, mtime in outputs)
+
+
+class JobStore:
+    """The queue table. Jobs are identified by the id `add` returns; specs are JSON-serializable dicts.
+
+    Statuses are "queued", "running", "completed" and "failed". Writes are committed at once
+    unless they happen inside `batch()`. Raises sqlite3.Error if the database is unusable or
+    already open in another copy of the app.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=0)
+        self.db.execute("PRAGMA locking_mode=EXCLUSIVE")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY, spec TEXT NOT NULL, status TEXT NOT NULL,"
+                        " outputs TEXT, error TEXT, updated REAL NOT NULL)")
+        self.db.commit()
+        self.deferred = 0
+
+    def _commit(self):
+        if not self.deferred and self.db is not None: self.db.commit()
+
+    @contextmanager
+    def batch(self):
+        """Commits the writes made inside the block together, e.g. when thousands of jobs are queued at once."""
+        self.deferred += 1
+        try: yield self
+        finally:
+            self.deferred -= 1
+            self._commit()
+
+    def add(self, spec):
+        cursor = self.db.execute("INSERT INTO jobs (spec, status, updated) VALUES (?, 'queued', ?)", (json.dumps(spec), time.time()))
+        self._commit()
+        return cursor.lastrowid
+
+    def set_status(self, job_id, status, output_paths=(), error=None):
+        """Records the job's new status; a completed job also records the size and mtime of its outputs."""
+        outputs = [sig for sig in map(output_signature, output_paths) if sig] if output_paths else None
+        self.db.execute("UPDATE jobs SET status = ?, outputs = ?, error = ?, updated = ? WHERE id = ?",
+                        (status, json.dumps(outputs) if outputs else None, error, time.time(), job_id))
+        self._commit()
+
+    def remove(self, job_id):
+        self.db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self._commit()
+
+    def jobs(self):
+        """Every stored job, in the order they were queued."""
+        rows = self.db.execute("SELECT id, spec, status, outputs FROM jobs ORDER BY id").fetchall()
+        return [StoredJob(job_id, json.loads(spec), status, json.loads(outputs) if outputs else []) for job_id, spec, status, outputs in rows]
+
+    def interrupted(self):
+        """The jobs of an unfinished batch that still need converting, and how many completed ones can be skipped.
+
+        Queued and running jobs are returned, and so are completed ones whose outputs were
+        since deleted or changed; failed jobs are left out.
+        """
+        pending, done = [], 0
+        for job in self.jobs():
+            if job.status == "completed" and verified(job.outputs): done += 1
+            elif job.status != "failed": pending.append(job)
+        return pending, done
+
+    def clear(self):
+        self.db.execute("DELETE FROM jobs")
+        self._commit()
+
+    def close(self):
+        self.db.close(); self.db = None
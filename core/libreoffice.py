@@ -0,0 +1,213 @@
+# core/libreoffice.py
+"""A long-lived LibreOffice conversion service.
+
+Instead of cold-starting soffice with a fresh profile for every document, LibreOfficeWorker
+threads feed their documents to one shared service. The service gathers requests for a
+short moment, groups those with the same target format and output folder, and converts
+each group with a single `soffice --convert-to` call into a scratch folder inside that
+output folder, from which every document is renamed to the output path it asked for
+(jobs are staged, so that path may be in a staging folder next to it). Cancelling a document
+soffice is already working on kills its batch and queues the other documents again. Every
+instance has its own user profile directory, which is kept for the life of the service so
+later batches start warm and parallel instances never fight over the profile lock.
+"""
+
+import os
+import pathlib
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from core.metrics import MeasuredPopen, current_job
+
+DEFAULT_INSTANCES = 1
+DEFAULT_BATCH_SIZE = 16
+BATCH_WINDOW = 0.3          # seconds to wait for more documents before starting a batch
+# Same prefix as core.dispatch.STAGING_PREFIX, so a scratch folder left by a crash is cleaned up with the staging folders.
+SCRATCH_PREFIX = ".converting-soffice-"
+SECONDS_PER_DOCUMENT = 60
+
+
+class LibreOfficeError(Exception):
+    pass
+
+
+class ConversionRequest:
+    def __init__(self, input_path, output_path, output_dir):
+        self.input_path, self.output_path, self.output_dir = input_path, output_path, output_dir
+        self.target = os.path.splitext(output_path)[1][1:].lower()
+        self.done = threading.Event()
+        self.error = None
+        self.cancelled = False
+        self.process = None         # the soffice call converting it, once its batch has started
+        self.job = current_job()    # the soffice call's CPU time is shared between the jobs of its batch
+
+
+class LibreOfficeService:
+    def __init__(self, instances=DEFAULT_INSTANCES, batch_size=DEFAULT_BATCH_SIZE):
+        self.instances = max(1, instances)
+        self.batch_size = max(1, batch_size)
+        self.condition = threading.Condition()
+        self.pending = []
+        self.free_profiles = [tempfile.mkdtemp(prefix="fileconverter-soffice-") for _ in range(self.instances)]
+        self.profiles = list(self.free_profiles)
+        self.dispatcher = None
+        self.closed = False
+
+    def submit(self, input_path, output_path, output_dir):
+        """Queues a document for conversion to `output_path` and returns its request, which `wait()`
+        and `cancel()` take. Documents with the same `output_dir` (the job's output folder) may share a batch."""
+        request = ConversionRequest(input_path, output_path, output_dir)
+        with self.condition:
+            if self.closed: raise LibreOfficeError("The LibreOffice service has been shut down.")
+            self.pending.append(request)
+            if self.dispatcher is None:
+                self.dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True); self.dispatcher.start()
+            self.condition.notify_all()
+        return request
+
+    def wait(self, request):
+        """Blocks until the request has been converted. Raises LibreOfficeError on failure."""
+        request.done.wait()
+        if request.error: raise LibreOfficeError(request.error)
+        return request.output_path
+
+    def convert(self, input_path, output_path, output_dir):
+        """submit() and wait() in one call."""
+        return self.wait(self.submit(input_path, output_path, output_dir))
+
+    def cancel(self, request):
+        """Withdraws a document. One that soffice is already converting is stopped by killing its
+        batch; the batch's other documents go back to the front of the queue."""
+        with self.condition:
+            if request.done.is_set(): return
+            request.cancelled = True
+            if request in self.pending:
+                self.pending.remove(request)
+                request.error = "Cancelled."; request.done.set()
+                return
+            process = request.process
+        if process: _kill(process)
+
+    def _next_batch(self):
+        first = self.pending[0]
+        batch, names = [], set()
+        for request in self.pending:
+            # soffice names outputs after the input's basename, so one call must not contain duplicates.
+            name = os.path.splitext(os.path.basename(request.input_path))[0].lower()
+            if (request.target, request.output_dir) == (first.target, first.output_dir) and name not in names:
+                batch.append(request); names.add(name)
+                if len(batch) == self.batch_size: break
+        for request in batch: self.pending.remove(request)
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            with self.condition:
+                while not self.closed and not self.pending: self.condition.wait()
+                if self.closed: return
+            time.sleep(BATCH_WINDOW)
+            with self.condition:
+                while not self.closed and not self.free_profiles: self.condition.wait()
+                if self.closed: return
+                if not self.pending: continue
+                batch, profile = self._next_batch(), self.free_profiles.pop()
+            threading.Thread(target=self._run_batch, args=(batch, profile), daemon=True).start()
+
+    def _run_batch(self, batch, profile):
+        requeue = []
+        try:
+            requeue = self._convert_batch(batch, profile)
+        except Exception as e:
+            for request in batch: request.error = request.error or str(e)
+        finally:
+            with self.condition:
+                for request in batch:
+                    request.process = None
+                    if request in requeue and not self.closed: continue
+                    if request.cancelled or request in requeue: request.error = "Cancelled."
+                    request.done.set()
+                if not self.closed: self.pending[:0] = requeue
+                self.free_profiles.append(profile); self.condition.notify_all()
+
+    def _convert_batch(self, batch, profile):
+        """Converts the batch with one soffice call. Returns the documents to queue again because
+        another document of the batch was cancelled before soffice was done with them."""
+        soffice_path = shutil.which('soffice')
+        if not soffice_path:
+            raise LibreOfficeError("LibreOffice (soffice.exe) not found. Please use Help > Dependency Checker to verify it is in the system's PATH.")
+        with tempfile.TemporaryDirectory(prefix=SCRATCH_PREFIX, dir=batch[0].output_dir) as outdir:
+            cmd = [soffice_path, f"-env:UserInstallation={pathlib.Path(profile).as_uri()}", '--headless', '--norestore',
+                   '--convert-to', batch[0].target, '--outdir', outdir] + [r.input_path for r in batch]
+            with self.condition:
+                # Started under the lock, so a cancel() either finds the process to kill or is seen here.
+                if any(r.cancelled for r in batch): return [r for r in batch if not r.cancelled]
+                proc = MeasuredPopen(cmd, jobs=[r.job for r in batch], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                     start_new_session=sys.platform != 'win32',
+                                     creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0)
+                for request in batch: request.process = proc
+            with proc:
+                try:
+                    stdout, stderr = proc.communicate(timeout=SECONDS_PER_DOCUMENT * len(batch))
+                except subprocess.TimeoutExpired:
+                    _kill(proc); proc.communicate()
+                    raise LibreOfficeError("LibreOffice took too long to respond and was terminated.")
+            if proc.returncode != 0 and any(r.cancelled for r in batch):
+                return [r for r in batch if not r.cancelled]
+
+            produced = {f.lower(): f for f in os.listdir(outdir)}
+            for request in batch:
+                name = f"{os.path.splitext(os.path.basename(request.input_path))[0]}.{request.target}".lower()
+                if proc.returncode != 0 or name not in produced:
+                    stderr_log = f"--- STDERR ---\n{stderr}\n" if stderr else "No error output."
+                    stdout_log = f"--- STDOUT ---\n{stdout}\n" if stdout else ""
+                    request.error = f"LibreOffice process failed (Code: {proc.returncode}).\n{stderr_log}{stdout_log}"
+                    continue
+                try: shutil.move(os.path.join(outdir, produced[name]), request.output_path)
+                except OSError as e: request.error = f"Could not save the converted document: {e}"
+        return []
+
+    def shutdown(self):
+        with self.condition:
+            self.closed = True
+            for request in self.pending: request.error = "Cancelled."; request.done.set()
+            self.pending.clear()
+            self.condition.notify_all()
+        for profile in self.profiles: shutil.rmtree(profile, ignore_errors=True)
+
+
+def _kill(process):
+    """Kills soffice together with the soffice.bin it starts, which would otherwise keep the batch's pipes open."""
+    if process.returncode is not None: return
+    if sys.platform == 'win32':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+    else:
+        try: os.killpg(process.pid, signal.SIGKILL) # started in its own session, so its group id is its pid
+        except ProcessLookupError: pass
+
+
+_service = None
+_service_lock = threading.Lock()
+_instances = DEFAULT_INSTANCES
+
+def configure_libreoffice_service(instances=DEFAULT_INSTANCES):
+    """Sets how many soffice instances run side by side. Takes effect when the service is next idle."""
+    global _instances
+    _instances = max(1, instances)
+
+def get_libreoffice_service():
+    global _service
+    with _service_lock:
+        if _service is not None and _service.instances != _instances and not _service.pending and len(_service.free_profiles) == _service.instances:
+            _service.shutdown(); _service = None
+        if _service is None: _service = LibreOfficeService(_instances)
+        return _service
+
+def shutdown_libreoffice_service():
+    global _service
+    with _service_lock:
+        if _service is not None: _service.shutdown(); _service = None
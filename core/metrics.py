@@ -0,0 +1,358 @@
+# core/metrics.py
+"""Per-job performance records.
+
+Every job gets a JobMetrics when it is queued. While the job runs, its record is the "current
+job" of the worker's thread, so code deep in the engines can attribute what it measures
+without being handed the record: core.probe adds its time to the probe phase, child processes
+started through `run_process`/`MeasuredPopen` (ffmpeg, soffice, 7z) add their CPU time and
+peak RSS, and process pool tasks add the CPU time and peak RSS of the process that ran them.
+The CPU time of the job's own thread is counted too, and work handed to other threads keeps
+its job (and its CPU time) with `bind_job`. Time that is neither queueing, probing nor
+writing counts as encoding.
+
+Finished records are appended to a rolling JSON-lines log (metrics.jsonl, rotated at
+LOG_MAX_BYTES). With profiling on, each job's thread also runs under cProfile and the stats
+are saved next to the log; only Python code running in this process is seen, so this is
+mostly useful with worker processes turned off and for the archive engine.
+"""
+
+import contextlib
+import cProfile
+import csv
+import datetime
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+LOG_NAME = "metrics.jsonl"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+SLOWEST_JOBS = 10
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024     # ru_maxrss is in bytes on macOS, KiB elsewhere
+PEAK_SAMPLE_SECONDS = 0.2
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_log_path = None
+_profile_dir = None
+
+
+def default_metrics_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(base, "FileConverter", "metrics")
+
+def configure_metrics(enabled=True, profile=False, directory=None):
+    """Turns the metrics log and the per-job cProfile hook on or off. Records are kept in memory either way."""
+    global _log_path, _profile_dir
+    directory = directory or default_metrics_dir()
+    _log_path = os.path.join(directory, LOG_NAME) if enabled else None
+    _profile_dir = os.path.join(directory, "profiles") if profile else None
+
+def log_path():
+    return _log_path
+
+
+# =============================================================================
+# CURRENT JOB
+# =============================================================================
+
+def current_job():
+    return getattr(_local, 'job', None)
+
+@contextlib.contextmanager
+def job_context(job):
+    previous, _local.job = current_job(), job
+    try: yield job
+    finally: _local.job = previous
+
+def bind_job(fn):
+    """`fn` wrapped to run with the caller's current job, for work handed to other threads."""
+    job = current_job()
+    if job is None: return fn
+    def bound(*args, **kwargs):
+        cpu = time.thread_time()
+        try:
+            with job_context(job): return fn(*args, **kwargs)
+        finally: job.add_usage(time.thread_time() - cpu, 0, processes=0)
+    return bound
+
+@contextlib.contextmanager
+def phase(name):
+    """Adds the time spent in the block to phase `name` ("probe" or "write") of the current job."""
+    job, start = current_job(), time.perf_counter()
+    try: yield
+    finally:
+        if job is not None: job.add_phase(name, time.perf_counter() - start)
+
+def record_usage(cpu_seconds, peak_rss, jobs=None, processes=1):
+    """Adds the CPU time and peak RSS (bytes) of a process to `jobs` (default: the current job).
+
+    A process that worked for several jobs at once (a soffice batch) has its CPU time shared
+    evenly between them.
+    """
+    jobs = [job for job in (jobs if jobs is not None else [current_job()]) if job is not None]
+    for job in jobs: job.add_usage(cpu_seconds / len(jobs), peak_rss, processes)
+
+
+class JobMetrics:
+    """Timings and resource use of one job, from the moment it is queued to its record in the log.
+
+    `run(target)` runs the worker's run method as this job on the calling thread;
+    `finish()` builds the record once the outcome is known and appends it to the log.
+    """
+    def __init__(self, engine, input_paths):
+        self.engine, self.input_paths = engine, list(input_paths)
+        self.lock = threading.Lock()
+        self.queued_at, self.started_at, self.stopped_at = time.monotonic(), None, None
+        self.phases = {'probe': 0.0, 'write': 0.0}
+        self.cpu_seconds, self.peak_rss, self.processes = 0.0, 0, 0
+        self.plan, self.profiler, self.profile_path = None, None, None
+        self.record = None
+
+    def add_phase(self, name, seconds):
+        with self.lock: self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_usage(self, cpu_seconds, peak_rss, processes=1):
+        with self.lock:
+            self.cpu_seconds += cpu_seconds; self.peak_rss = max(self.peak_rss, peak_rss); self.processes += processes
+
+    def run(self, target):
+        """Calls `target()` as this job. Starting, running and stopping must happen in one Python call:
+        PyQt drops a QThread's Python thread state between slot calls, and with it the current job."""
+        self.start()
+        try: target()
+        finally: self.stop()
+
+    def start(self):
+        self.started_at, self.thread, self.thread_cpu = time.monotonic(), threading.get_ident(), time.thread_time()
+        _local.job = self
+        if _profile_dir:
+            profiler = cProfile.Profile()
+            try: profiler.enable(); self.profiler = profiler
+            except ValueError: pass # another job is being profiled already
+
+    def stop(self, *_):
+        """Ends the job's run. Also connected directly to the worker's finished/error signals (so the record is
+        complete before their queued slots run), hence it may be called more than once."""
+        if self.stopped_at is not None or self.started_at is None: return
+        self.stopped_at = time.monotonic()
+        # No child or pool process reported its memory, so the work was done in this process.
+        thread_cpu = time.thread_time() - self.thread_cpu if threading.get_ident() == self.thread else 0.0
+        self.add_usage(thread_cpu, 0 if self.peak_rss else process_peak_rss(), processes=0)
+        if current_job() is self: _local.job = None
+        if self.profiler is not None:
+            self.profiler.disable()
+            name = os.path.splitext(os.path.basename(self.input_paths[0] if self.input_paths else "job"))[0]
+            path = os.path.join(_profile_dir, f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{name}.prof")
+            try: os.makedirs(_profile_dir, exist_ok=True); self.profiler.dump_stats(path); self.profile_path = path
+            except OSError: pass
+            self.profiler = None
+
+    def finish(self, status, output_paths=(), cached=False, error=None):
+        """Builds the job's record (a flat dict, see the log) and appends it to the metrics log if one is configured."""
+        self.stop()
+        now = time.monotonic()
+        started = self.started_at if self.started_at is not None else now
+        run = (self.stopped_at or now) - started
+        probe, write = self.phases['probe'], self.phases['write']
+        self.record = {
+            'time': datetime.datetime.now().isoformat(timespec='seconds'), 'engine': self.engine, 'status': status,
+            'inputs': self.input_paths, 'outputs': [path for path in output_paths if path], 'plan': self.plan, 'cached': cached,
+            'queue_s': round(started - self.queued_at, 3), 'probe_s': round(probe, 3), 'encode_s': round(max(0.0, run - probe - write), 3),
+            'write_s': round(write, 3), 'run_s': round(run, 3), 'cpu_s': round(self.cpu_seconds, 3),
+            'peak_rss_mb': round(self.peak_rss / 2**20, 1), 'processes': self.processes,
+            'input_bytes': _total_size(self.input_paths), 'output_bytes': _total_size(output_paths),
+        }
+        if error: self.record['error'] = error
+        if self.profile_path: self.record['profile'] = self.profile_path
+        if _log_path: append_to_log(self.record)
+        return self.record
+
+def _total_size(paths):
+    total = 0
+    for path in paths:
+        try: total += os.path.getsize(path) if path else 0
+        except OSError: pass
+    return total
+
+
+# =============================================================================
+# LOG AND SUMMARIES
+# =============================================================================
+
+def append_to_log(record, path=None):
+    """Appends one record to the JSON-lines log, rotating metrics.jsonl -> .1 -> ... -> .LOG_BACKUPS when it is full."""
+    path = path or _log_path
+    line = json.dumps(record) + "\n"
+    with _log_lock:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) + len(line) > LOG_MAX_BYTES:
+                for i in range(LOG_BACKUPS - 1, 0, -1):
+                    if os.path.exists(f"{path}.{i}"): os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+                os.replace(path, f"{path}.1")
+            with open(path, 'a', encoding='utf-8') as f: f.write(line)
+        except OSError:
+            pass # The metrics log must never fail a conversion.
+
+def export_records(records, path):
+    """Writes records to `path`: CSV if it ends in .csv, JSON lines otherwise."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if not path.lower().endswith('.csv'):
+            for record in records: f.write(json.dumps(record) + "\n")
+            return
+        columns = list(dict.fromkeys(key for record in records for key in record))
+        writer = csv.DictWriter(f, columns)
+        writer.writeheader()
+        for record in records:
+            writer.writerow({k: "; ".join(v) if isinstance(v, list) else v for k, v in record.items()})
+
+def summarize(records, elapsed=None):
+    """Aggregates a batch of records: counts, throughput over `elapsed` wall seconds (default: the
+    summed run time), per-engine totals and the SLOWEST_JOBS slowest jobs by run time."""
+    completed = [r for r in records if r['status'] == "completed"]
+    elapsed = max(elapsed or sum(r['run_s'] for r in records), 1e-6)
+    engines = {}
+    for r in records:
+        count, run, cpu = engines.get(r['engine'], (0, 0.0, 0.0))
+        engines[r['engine']] = (count + 1, run + r['run_s'], cpu + r['cpu_s'])
+    return {
+        'jobs': len(records), 'completed': len(completed), 'failed': sum(r['status'] == "failed" for r in records),
+        'elapsed_s': elapsed, 'files_per_min': len(completed) * 60 / elapsed,
+        'input_mb_s': sum(r['input_bytes'] for r in completed) / 1e6 / elapsed,
+        'output_mb_s': sum(r['output_bytes'] for r in completed) / 1e6 / elapsed,
+        'cpu_s': sum(r['cpu_s'] for r in records), 'engines': engines,
+        'slowest': sorted(records, key=lambda r: r['run_s'], reverse=True)[:SLOWEST_JOBS],
+    }
+
+
+# =============================================================================
+# CHILD PROCESSES
+# =============================================================================
+
+class MeasuredPopen(subprocess.Popen):
+    """subprocess.Popen that adds the child's CPU time and peak RSS to the current job (or `jobs`) once it is waited for.
+
+    Both `wait()` and `poll()` record it, so a child that is stopped and polled still counts. On
+    POSIX they reap the child themselves with wait4(), which returns its resource use (including
+    that of its own reaped children); on Windows the counters are read from the process.
+    Linux carries the parent's peak RSS over into a spawned child's ru_maxrss, so a child that
+    stays below it has its own high-water mark sampled from /proc while it runs instead.
+    """
+    def __init__(self, *args, jobs=None, **kwargs):
+        self.jobs = jobs if jobs is not None else [current_job()]
+        self.measured, self.sampled_peak, self.rss_floor = False, 0, _proc_peak_rss("self")
+        self.reap_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+        if self.rss_floor: threading.Thread(target=self._sample_peak, daemon=True).start()
+
+    def _sample_peak(self):
+        interval = 0.01 # short-lived children (ffprobe, a 7z listing) are gone before the first long sleep is over
+        while self.returncode is None:
+            if not (peak := _proc_peak_rss(self.pid)): return # exited: a zombie has no memory left to report
+            self.sampled_peak = max(self.sampled_peak, peak)
+            time.sleep(interval); interval = min(interval * 2, PEAK_SAMPLE_SECONDS)
+
+    def poll(self):
+        if sys.platform == "win32":
+            if (returncode := super().poll()) is not None and not self.measured: self._record(*_windows_usage_of(self.pid))
+            return returncode
+        self._reap(os.WNOHANG)
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if sys.platform == "win32":
+            returncode = super().wait(timeout)
+            if not self.measured: self._record(*_windows_usage_of(self.pid))
+            return returncode
+        if timeout is None:
+            self._reap(0)
+            return self.returncode
+        deadline, delay = time.monotonic() + timeout, 0.0005
+        while not self._reap(os.WNOHANG):
+            if (remaining := deadline - time.monotonic()) <= 0: raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(min(delay, remaining)); delay = min(delay * 2, 0.05)
+        return self.returncode
+
+    def _reap(self, flags):
+        """Reaps the child with wait4() (POSIX) and records its usage. Returns whether it has exited."""
+        # A poll() must not wait behind a blocking wait() in another thread; that wait() will reap it.
+        if not self.reap_lock.acquire(blocking=not flags & os.WNOHANG): return self.returncode is not None
+        try:
+            if self.returncode is not None: return True
+            try: pid, status, usage = os.wait4(self.pid, flags)
+            except ChildProcessError: self.returncode = 0; return True # as Popen does: the status is lost, e.g. SIGCHLD ignored
+            if pid != self.pid: return False
+            self.returncode = os.waitstatus_to_exitcode(status)
+            peak = usage.ru_maxrss * RSS_UNIT
+            self._record(usage.ru_utime + usage.ru_stime, peak if peak > self.rss_floor else self.sampled_peak or peak)
+            return True
+        finally:
+            self.reap_lock.release()
+
+    def _record(self, cpu_seconds, peak_rss):
+        if not self.measured: self.measured = True; record_usage(cpu_seconds, peak_rss, self.jobs)
+
+def run_process(cmd, jobs=None, timeout=None, check=False, capture_output=False, **kwargs):
+    """subprocess.run() for a child whose resource use counts towards the current job (or `jobs`)."""
+    if capture_output: kwargs['stdout'] = kwargs['stderr'] = subprocess.PIPE
+    with MeasuredPopen(cmd, jobs=jobs, **kwargs) as process:
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill(); process.communicate()
+            raise
+    if check and process.returncode: raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+def process_peak_rss():
+    """Peak resident memory of this process so far, in bytes."""
+    if sys.platform == "win32": return _windows_usage(-1)[1] # -1 is GetCurrentProcess()'s pseudo handle
+    if (peak := _proc_peak_rss("self")): return peak
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+def _proc_peak_rss(pid):
+    """VmHWM of a process from Linux's /proc in bytes, or 0 if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"): return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+def _windows_usage_of(pid):
+    """_windows_usage() of a child process by pid; the Popen's own handle keeps the exited process readable."""
+    import ctypes
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.OpenProcess.restype = ctypes.c_void_p
+    handle = kernel32.OpenProcess(0x1000 | 0x0010, False, pid) # PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ
+    if not handle: return 0.0, 0
+    try: return _windows_usage(handle)
+    finally: kernel32.CloseHandle(ctypes.c_void_p(handle))
+
+def _windows_usage(handle):
+    """(CPU seconds, peak working set in bytes) of a process handle, or zeros if they cannot be read."""
+    import ctypes
+    from ctypes import wintypes
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in ('PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                                                 'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(wintypes.FILETIME)] * 4
+    kernel32.K32GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+    created, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+    cpu = 0.0
+    if kernel32.GetProcessTimes(handle, created, exited, kernel, user):
+        cpu = sum((t.dwHighDateTime << 32 | t.dwLowDateTime) for t in (kernel, user)) / 1e7 # 100 ns units
+    counters = ProcessMemoryCounters(); counters.cb = ctypes.sizeof(counters)
+    peak = counters.PeakWorkingSetSize if kernel32.K32GetProcessMemoryInfo(handle, counters, counters.cb) else 0
+    return cpu, peak
@@ -0,0 +1,36 @@
+# core/pdf_docx.py
+"""How PDF to DOCX jobs are split up.
+
+pdf2docx parses one page at a time on one core. With the parallel mode on, PdfToDocxWorker
+parses page ranges of a single document side by side in the process pool and assembles the
+DOCX from their results. A page cap splits very large PDFs into several DOCX files of at
+most that many pages, which keeps pdf2docx's memory use and Word's load times bounded.
+"""
+
+import os
+
+DEFAULT_PARALLEL = True
+DEFAULT_PAGE_CAP = 0            # 0 = one DOCX per PDF, however long
+MIN_PAGES_PER_RANGE = 10
+
+_parallel, _page_cap = DEFAULT_PARALLEL, DEFAULT_PAGE_CAP
+
+
+def configure_pdf_to_docx(parallel=DEFAULT_PARALLEL, page_cap=DEFAULT_PAGE_CAP):
+    global _parallel, _page_cap
+    _parallel, _page_cap = parallel, max(0, page_cap)
+
+def split_documents(output_path, pages):
+    """(first_page, last_page, output_path) for each DOCX the PDF becomes."""
+    cap = _page_cap or pages
+    if pages <= cap: return [(0, pages, output_path)]
+    base, ext = os.path.splitext(output_path)
+    return [(start, min(start + cap, pages), f"{base} (pages {start + 1}-{min(start + cap, pages)}){ext}") for start in range(0, pages, cap)]
+
+def split_ranges(first_page, last_page, workers):
+    """Page ranges to parse in parallel for one document; a single range when it is not worth splitting."""
+    pages = last_page - first_page
+    ranges = min(workers, pages // MIN_PAGES_PER_RANGE) if _parallel else 1
+    if ranges < 2: return [(first_page, last_page)]
+    bounds = [first_page + pages * i // ranges for i in range(ranges + 1)]
+    return list(zip(bounds, bounds[1:]))
@@ -0,0 +1,72 @@
+# core/probe.py
+"""Shared ffprobe service.
+
+Each input is probed once with a single JSON query (format, streams and codecs); the result
+is cached per (path, size, mtime) and reused by every worker that needs it. The cache keeps
+the PROBE_MEMO_SIZE most recently used files, so a long session (or a watch folder) does not
+grow it without bound.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+
+from core.metrics import phase, run_process
+
+PROBE_MEMO_SIZE = 1024
+
+_cache = OrderedDict()  # absolute path -> (size, mtime_ns, ffprobe's JSON or None)
+_cache_lock = threading.Lock()
+_locks = {}             # absolute path -> lock held while that file is being probed
+_locks_guard = threading.Lock()
+
+
+def _cached(path, st):
+    with _cache_lock:
+        size, mtime, info = _cache.get(path, (None, None, None))
+        if (size, mtime) != (st.st_size, st.st_mtime_ns): return False, None
+        _cache.move_to_end(path)
+        return True, info
+
+def probe(path):
+    """Returns ffprobe's JSON description of `path` (keys 'format' and 'streams'), or None if it cannot be probed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    path = os.path.abspath(path)
+    if (hit := _cached(path, st))[0]: return hit[1]
+    with _locks_guard: lock = _locks.setdefault(path, threading.Lock())
+    with phase("probe"), lock:
+        # Another thread may have probed the same file while we waited for the lock.
+        if (hit := _cached(path, st))[0]: return hit[1]
+        try:
+            out = run_process(['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+                              capture_output=True, text=True, encoding='utf-8', check=True,
+                              creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0).stdout
+            info = json.loads(out)
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            info = None
+        with _cache_lock:
+            _cache[path] = (st.st_size, st.st_mtime_ns, info)
+            _cache.move_to_end(path)
+            while len(_cache) > PROBE_MEMO_SIZE: _cache.popitem(last=False)
+        # Threads still waiting on this lock find the result in the cache; later ones never need the lock.
+        with _locks_guard: _locks.pop(path, None)
+    return info
+
+def get_duration(path):
+    """Duration in seconds, or None when unknown."""
+    info = probe(path)
+    try:
+        return float(info['format']['duration']) if info else None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def get_streams(path, codec_type=None):
+    """The input's streams, optionally only those of one type ('video', 'audio', 'subtitle')."""
+    info = probe(path) or {}
+    return [s for s in info.get('streams', []) if codec_type is None or s.get('codec_type') == codec_type]
@@ -0,0 +1,117 @@
+# core/process_host.py
+"""Out-of-process execution for the CPU-bound workers (Pillow, rawpy, pdf2docx, PyMuPDF).
+
+Workers call `run_task`, which either runs the task inline or hands it to a pool of
+spawned processes. Pool processes are replaced after `recycle_after` tasks so that leaks
+in the native libraries cannot accumulate, and progress from the children is relayed
+back to the caller's callback on a listener thread.
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from core.metrics import process_peak_rss, record_usage
+
+DEFAULT_RECYCLE_AFTER = 25
+
+_progress_queue = None
+
+def _init_pool_process(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+def _run_task(token, fn, args):
+    # The pool process reports what the task cost along with its result, for the caller's job metrics.
+    cpu = time.process_time()
+    result = fn(*args, progress=lambda value: _progress_queue.put((token, value)))
+    return result, time.process_time() - cpu, process_peak_rss()
+
+
+class ProcessHost:
+    def __init__(self, max_workers=None, recycle_after=DEFAULT_RECYCLE_AFTER):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.recycle_after = recycle_after
+        self.context = multiprocessing.get_context('spawn')
+        self.lock = threading.Lock()
+        self.pool = None
+        self.progress_queue = None
+        self.callbacks = {}
+        self.tokens = itertools.count()
+
+    def _ensure_pool(self):
+        if self.progress_queue is None:
+            self.progress_queue = self.context.Queue()
+            threading.Thread(target=self._relay_progress, args=(self.progress_queue,), daemon=True).start()
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.max_workers, mp_context=self.context, initializer=_init_pool_process,
+                                            initargs=(self.progress_queue,), max_tasks_per_child=self.recycle_after)
+        return self.pool
+
+    def _relay_progress(self, progress_queue):
+        while (item := progress_queue.get()) is not None:
+            token, value = item
+            if (callback := self.callbacks.get(token)): callback(value)
+
+    def submit(self, fn, args, progress=None):
+        with self.lock:
+            token = next(self.tokens)
+            if progress: self.callbacks[token] = progress
+            pool = self._ensure_pool()
+            future = pool.submit(_run_task, token, fn, args)
+        future.pool = pool
+        future.add_done_callback(lambda _: self.callbacks.pop(token, None))
+        return future
+
+    def result(self, future):
+        try:
+            result, cpu_seconds, peak_rss = future.result()
+        except BrokenProcessPool:
+            # A child died (e.g. a native crash in a decoder); start a fresh pool for the next job.
+            with self.lock:
+                if self.pool is future.pool:
+                    self.pool.shutdown(wait=False); self.pool = None
+            raise RuntimeError("The conversion process terminated unexpectedly.")
+        record_usage(cpu_seconds, peak_rss, processes=0)
+        return result
+
+    def shutdown(self, cancel_pending=True):
+        with self.lock:
+            if self.pool is not None: self.pool.shutdown(wait=False, cancel_futures=cancel_pending); self.pool = None
+            if self.progress_queue is not None: self.progress_queue.put(None); self.progress_queue = None
+
+
+_host = None
+
+def configure_process_host(enabled, recycle_after=DEFAULT_RECYCLE_AFTER, max_workers=None):
+    """Turns the shared process pool on or off. Jobs already submitted to an old pool still finish."""
+    global _host
+    if _host is not None and enabled and (_host.recycle_after, _host.max_workers) == (recycle_after, max_workers or os.cpu_count() or 1):
+        return
+    if _host is not None: _host.shutdown(cancel_pending=False)
+    _host = ProcessHost(max_workers, recycle_after) if enabled else None
+
+def shutdown_process_host():
+    global _host
+    if _host is not None: _host.shutdown(); _host = None
+
+def pool_size():
+    """How many tasks can run side by side in the process pool; 0 when conversions run inline."""
+    host = _host
+    return host.max_workers if host is not None else 0
+
+def run_task(fn, args, progress=None, on_submit=None):
+    """Runs `fn(*args, progress=progress)` in the process pool if one is configured, otherwise inline.
+
+    `on_submit(future)` is called once the task is queued in the pool so the caller can cancel it.
+    A pooled task's CPU time and peak RSS count towards the calling thread's job (see core.metrics).
+    """
+    host = _host
+    if host is None: return fn(*args, progress=progress)
+    future = host.submit(fn, args, progress)
+    if on_submit: on_submit(future)
+    return host.result(future)
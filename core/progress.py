@@ -0,0 +1,69 @@
+# core/progress.py
+"""Coalesced job progress for the GUI.
+
+Workers report progress as often as their engine does (ffmpeg several times a second per
+job). Rather than turning every report into a queued signal and a repaint, reports are
+connected directly to a ProgressBus, which only keeps the latest value per job; the window
+takes the changes on a timer and repaints those rows once per tick. The bus also keeps the
+running totals of the current batch for the status bar.
+"""
+
+import threading
+import time
+
+REFRESH_MS = 100    # 10 Hz
+
+
+class ProgressBus:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.progress, self.stats = {}, {}
+        self.changed_progress, self.changed_stats = set(), set()
+        self.reset_batch()
+
+    # --- Worker side (any thread) ---
+    def report(self, job_id, percent):
+        with self.lock:
+            if self.progress.get(job_id) != percent:
+                self.progress[job_id] = percent; self.changed_progress.add(job_id)
+
+    def report_stats(self, job_id, fps, speed):
+        with self.lock:
+            self.stats[job_id] = (fps, speed); self.changed_stats.add(job_id)
+
+    # --- GUI side ---
+    def take_changes(self):
+        """Returns ({job_id: percent}, {job_id: (fps, speed)}) of everything reported since the last call."""
+        with self.lock:
+            progress = {job_id: self.progress[job_id] for job_id in self.changed_progress if job_id in self.progress}
+            stats = {job_id: self.stats[job_id] for job_id in self.changed_stats if job_id in self.stats}
+            self.changed_progress.clear(); self.changed_stats.clear()
+        return progress, stats
+
+    def reset_batch(self):
+        with self.lock:
+            self.batch_jobs, self.batch_done = set(), set()
+            self.batch_completed, self.batch_bytes, self.batch_started = 0, 0, None
+
+    def job_queued(self, job_id):
+        with self.lock:
+            if self.batch_started is None: self.batch_started = time.monotonic()
+            self.batch_jobs.add(job_id); self.batch_done.discard(job_id)
+            self.progress.pop(job_id, None); self.stats.pop(job_id, None)
+
+    def job_done(self, job_id, input_bytes=0, completed=True):
+        """Marks a job of the batch as over. Only completed jobs count towards the throughput, with `input_bytes` for MB/s."""
+        with self.lock:
+            if job_id in self.batch_jobs and job_id not in self.batch_done:
+                self.batch_done.add(job_id)
+                if completed: self.batch_completed += 1; self.batch_bytes += input_bytes
+            self.stats.pop(job_id, None)
+
+    def batch_summary(self):
+        """(jobs over, jobs in batch, overall percent, files per minute, MB per second, seconds elapsed), or None between batches."""
+        with self.lock:
+            if self.batch_started is None or not self.batch_jobs: return None
+            total, done = len(self.batch_jobs), len(self.batch_done)
+            running = sum(self.progress.get(job_id, 0) for job_id in self.batch_jobs - self.batch_done)
+            elapsed = max(time.monotonic() - self.batch_started, 1e-6)
+            return done, total, (done * 100 + running) / total, self.batch_completed * 60 / elapsed, self.batch_bytes / 1e6 / elapsed, elapsed
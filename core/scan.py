@@ -0,0 +1,47 @@
+# core/scan.py
+"""Finds the convertible files under dropped or listed folders.
+
+Directories are read with os.scandir, whose entries already know whether they are files or
+folders, so a walk costs one directory listing per folder rather than a stat per file (which
+is what makes os.walk + os.path.isfile crawl on network shares). Files whose extension has no
+conversion are dropped during the walk.
+"""
+
+import os
+
+from core.formats import FLEXIBLE_CONVERSION_MAP
+
+
+def is_supported(path):
+    return os.path.splitext(path)[1].lower() in FLEXIBLE_CONVERSION_MAP
+
+def scan_directory(path, recursive=True, should_stop=None):
+    """Yields the supported files under `path`, sorted by name within each folder, folders depth-first.
+
+    Unreadable folders are skipped, as os.walk does; symlinked folders are not followed.
+    """
+    stack = [path]
+    while stack:
+        if should_stop and should_stop(): return
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as it: entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subfolders = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive: subfolders.append(entry.path)
+                elif is_supported(entry.name) and entry.is_file():
+                    yield entry.path
+            except OSError:
+                continue
+        stack.extend(reversed(subfolders))
+
+def scan_paths(paths, recursive=True, should_stop=None):
+    """Files named directly are yielded as they are (so they can be reported as unsupported); folders are scanned."""
+    for path in paths:
+        if should_stop and should_stop(): return
+        if os.path.isdir(path): yield from scan_directory(path, recursive, should_stop)
+        elif os.path.isfile(path): yield path
@@ -0,0 +1,95 @@
+# core/scheduler.py
+
+import os
+from collections import deque
+
+from core.libreoffice import DEFAULT_BATCH_SIZE
+
+# Engines that share a concurrency limit. Each worker class declares the engine it runs on.
+ENGINE_LABELS = {
+    "ffmpeg": "FFmpeg (Video/Audio)",
+    "image": "Pillow/rawpy (Images)",
+    "pdf": "pdf2docx/PyMuPDF (PDF)",
+    "libreoffice": "LibreOffice (Documents)",
+    "archive": "7-Zip (Archives)",
+}
+
+# Jobs on these engines are fed to one shared service (see core.libreoffice), so however many
+# of them are in flight they only take up a single global slot.
+SHARED_ENGINES = {"libreoffice"}
+
+def default_engine_limits():
+    cores = os.cpu_count() or 1
+    return {"ffmpeg": max(1, cores // 2), "image": cores, "pdf": max(1, cores // 2), "libreoffice": DEFAULT_BATCH_SIZE, "archive": 2}
+
+def default_max_workers():
+    return os.cpu_count() or 1
+
+class JobScheduler:
+    """Queues jobs and starts them only while a global and a per-engine worker slot is free.
+
+    `start_job(job_id, payload)` is called when a job is given a slot; the owner must call
+    `job_done(job_id)` once it has finished so that queued jobs can move up.
+    """
+    def __init__(self, start_job, max_workers=None, engine_limits=None):
+        self.start_job = start_job
+        self.pending = deque()
+        self.active = {}
+        self.set_limits(max_workers, engine_limits)
+
+    def set_limits(self, max_workers=None, engine_limits=None):
+        self.max_workers = max(1, max_workers or default_max_workers())
+        self.engine_limits = default_engine_limits()
+        self.engine_limits.update({k: max(1, v) for k, v in (engine_limits or {}).items()})
+
+    def submit(self, job_id, engine, payload=None):
+        self.pending.append((job_id, engine, payload))
+        self.dispatch()
+
+    def is_queued(self, job_id):
+        return any(queued_id == job_id for queued_id, _, _ in self.pending)
+
+    def cancel(self, job_id):
+        """Removes a job that has not started yet. Returns True if it was still queued."""
+        for entry in self.pending:
+            if entry[0] == job_id:
+                self.pending.remove(entry)
+                return True
+        return False
+
+    def clear(self):
+        """Drops every queued job and returns their ids. Running jobs are left alone."""
+        cancelled = [job_id for job_id, _, _ in self.pending]
+        self.pending.clear()
+        return cancelled
+
+    def job_done(self, job_id):
+        self.active.pop(job_id, None)
+        self.dispatch()
+
+    def has_work(self):
+        return bool(self.pending or self.active)
+
+    def engine_load(self, engine):
+        return sum(1 for e in self.active.values() if e == engine)
+
+    def global_load(self):
+        shared = {e for e in self.active.values() if e in SHARED_ENGINES}
+        return sum(1 for e in self.active.values() if e not in SHARED_ENGINES) + len(shared)
+
+    def dispatch(self):
+        # Walk the queue in order, skipping jobs whose engine is saturated so that e.g. a
+        # long LibreOffice backlog does not hold up image jobs queued behind it.
+        skipped = deque()
+        while self.pending:
+            job_id, engine, payload = self.pending.popleft()
+            takes_slot = engine not in SHARED_ENGINES or self.engine_load(engine) == 0
+            global_full = self.global_load() >= self.max_workers
+            if (takes_slot and global_full) or (engine is not None and self.engine_load(engine) >= self.engine_limits.get(engine, self.max_workers)):
+                skipped.append((job_id, engine, payload))
+                if global_full and not SHARED_ENGINES.intersection(self.active.values()): break
+                continue
+            self.active[job_id] = engine
+            self.start_job(job_id, payload)
+        skipped.extend(self.pending)
+        self.pending = skipped
@@ -0,0 +1,112 @@
+# core/segmented.py
+"""Segment-parallel video encoding for long inputs.
+
+A single libx264 process stops scaling after a few cores. For long videos the input's video
+stream is cut at keyframes into segments (a stream copy, so this is fast), the segments are
+encoded by parallel ffmpeg processes, and the results are joined with the concat demuxer
+(`-c copy`, as MergeWorker does) while the audio is taken from the original input in the
+same final pass.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.ffmpeg import FFmpegProcess
+from core.metrics import bind_job
+
+DEFAULT_SEGMENTS = 1            # 1 disables segmenting
+MIN_SEGMENT_SECONDS = 30        # shorter segments cost more in process start-up than they save
+
+_segments = DEFAULT_SEGMENTS
+
+
+def configure_segmented_encoding(segments=DEFAULT_SEGMENTS):
+    """Sets how many parallel segments a long video is encoded in. 1 turns the mode off."""
+    global _segments
+    _segments = max(1, segments)
+
+def segment_count(duration):
+    """The number of segments to use for an input of `duration` seconds; 1 means encode it in one piece."""
+    if not duration or _segments < 2: return 1
+    return max(1, min(_segments, int(duration // MIN_SEGMENT_SECONDS)))
+
+
+class SegmentedEncode:
+    """Drop-in for FFmpegProcess: `run(on_progress)`, `error_message(prefix)` and `stop()`.
+
+    `video_args` and `audio_args` are the codec options for each stream type (see
+    core.stream_plan); `audio_args=None` leaves the audio out. Progress blocks report the
+    summed out_time of all segments, so they map onto the input's duration as usual.
+    """
+    def __init__(self, input_path, output_path, video_args, audio_args, segments, duration):
+        self.input_path, self.output_path = input_path, output_path
+        self.video_args, self.audio_args = video_args, audio_args
+        self.segments, self.duration = segments, duration
+        self.lock = threading.Lock()
+        self.processes, self.failed, self.stopped = [], None, False
+        self.returncode = None
+
+    def run(self, on_progress=None):
+        work_dir = tempfile.mkdtemp(prefix="fileconverter-segments-")
+        try:
+            self.returncode = self._run(work_dir, on_progress)
+            return self.returncode
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _run(self, work_dir, on_progress):
+        target = os.path.splitext(self.output_path)[1].lower()
+        split_cmd = ['ffmpeg', '-i', self.input_path, '-map', '0:v:0', '-c', 'copy', '-f', 'segment',
+                     '-segment_time', f"{self.duration / self.segments:.3f}", '-reset_timestamps', '1',
+                     '-y', os.path.join(work_dir, 'part%04d.mkv')]
+        if (code := self._run_process(split_cmd)) != 0: return code
+
+        parts = sorted(f for f in os.listdir(work_dir) if f.startswith('part'))
+        encoded = [os.path.join(work_dir, f"enc{i:04d}{target}") for i in range(len(parts))]
+        done, stats = {}, {}
+        def encode(i):
+            def report(block):
+                with self.lock:
+                    done[i], stats[i] = block['out_time'], block
+                    total = {'out_time': sum(done.values()), 'fps': sum(s['fps'] for s in stats.values()),
+                             'speed': sum(s['speed'] for s in stats.values())}
+                if on_progress: on_progress(total)
+            # Each part keeps the target's extension so ffmpeg picks the same default encoder as a whole-file job.
+            cmd = ['ffmpeg', '-i', os.path.join(work_dir, parts[i])] + self.video_args + ['-an', '-y', encoded[i]]
+            code = self._run_process(cmd, report)
+            with self.lock: stats.pop(i, None)
+            return code
+        with ThreadPoolExecutor(max_workers=self.segments) as pool:
+            codes = list(pool.map(bind_job(encode), range(len(parts))))
+        if (code := next((c for c in codes if c != 0), 0)) != 0: return code
+
+        list_file = os.path.join(work_dir, 'parts.txt')
+        with open(list_file, 'w', encoding='utf-8') as f:
+            for path in encoded: f.write(f"file '{path}'\n")
+        join_cmd = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', list_file, '-i', self.input_path, '-map', '0:v']
+        join_cmd += ['-map', '1:a:0?'] + self.audio_args if self.audio_args is not None else ['-an']
+        return self._run_process(join_cmd + ['-c:v', 'copy', '-y', self.output_path])
+
+    def _run_process(self, cmd, on_progress=None):
+        process = FFmpegProcess(cmd)
+        with self.lock:
+            if self.stopped: return -1
+            self.processes.append(process)
+        code = process.run(on_progress)
+        with self.lock:
+            self.processes.remove(process)
+            if code != 0 and self.failed is None: self.failed = process
+        return code
+
+    def error_message(self, prefix="FFmpeg error"):
+        if self.failed: return self.failed.error_message(prefix)
+        return f"{prefix} (code {self.returncode})"
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            processes = list(self.processes)
+        for process in processes: process.stop()
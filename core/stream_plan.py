@@ -0,0 +1,100 @@
+# core/stream_plan.py
+"""Chooses, per stream, between copying and encoding for an ffmpeg job.
+
+Changing only the container (MKV -> MP4 with H.264/AAC inside, AAC audio -> M4A, PCM audio
+-> WAV) does not need a re-encode: `-c copy` finishes in the time it takes to read the file.
+A stream is encoded only when the target container cannot hold its codec or a job setting
+(bitrate, resize) changes it. The plan is built from the shared ffprobe result.
+"""
+
+import os
+
+from core.probe import get_streams
+
+# Target container -> codecs (ffprobe codec_name) it can store unchanged. None accepts any codec.
+COPYABLE_CODECS = {
+    # MP4 jobs used to be re-encoded to H.264/AAC/yuv420p for universal playback; only copy what already is that.
+    "mp4": {"video": {"h264"}, "audio": {"aac", "mp3"}},
+    "mov": {"video": {"h264", "hevc", "mpeg4", "prores", "mjpeg"}, "audio": {"aac", "mp3", "alac", "pcm_s16le", "pcm_s24le"}},
+    "mkv": {"video": None, "audio": None},
+    "avi": {"video": {"mpeg4", "h264", "mjpeg", "msmpeg4v3"}, "audio": {"mp3", "ac3", "pcm_s16le"}},
+    "mp3": {"audio": {"mp3"}},
+    "wav": {"audio": {"pcm_s16le", "pcm_s24le", "pcm_s32le", "pcm_f32le", "pcm_u8"}},
+    "flac": {"audio": {"flac"}},
+    "ogg": {"audio": {"vorbis", "opus", "flac"}},
+    "m4a": {"audio": {"aac", "alac"}},
+}
+COPYABLE_PIX_FMTS = {"mp4": {"yuv420p", "yuvj420p"}}
+
+# Encoder options per target when a stream has to be encoded. Targets not listed use ffmpeg's defaults.
+ENCODER_ARGS = {
+    "mp4": {"video": ['-c:v', 'libx264', '-pix_fmt', 'yuv420p'], "audio": ['-c:a', 'aac']},
+}
+
+VIDEO_HEIGHTS = {'1080p': 1080, '720p': 720, '480p': 480}
+
+
+class StreamPlan:
+    """The codec options for one job. `actions` maps 'video'/'audio' to 'copy' or 'encode'."""
+    def __init__(self, args, actions):
+        self.args, self.actions = args, actions
+
+    @property
+    def copies(self):
+        return 'copy' in self.actions.values()
+
+    @property
+    def label(self):
+        """A short description of the path taken, shown next to the job's status."""
+        if not self.actions: return "re-encode"
+        if all(a == 'copy' for a in self.actions.values()): return "stream copy"
+        if all(a == 'encode' for a in self.actions.values()): return "re-encode"
+        return " + ".join(f"{kind} {action}" for kind, action in self.actions.items())
+
+
+def video_height(settings):
+    """The target height picked in the video panel's resize box, or None."""
+    return VIDEO_HEIGHTS.get(((settings or {}).get('resize') or "None").split()[0])
+
+def plan_streams(input_path, output_path, settings=None, kinds=("video", "audio"), allow_copy=True):
+    """Builds the StreamPlan for converting `input_path` to `output_path`.
+
+    `kinds` lists the stream types kept in the output. With `allow_copy=False` every stream
+    is encoded, which is the fallback when a copy attempt is rejected by the muxer.
+    """
+    settings = settings or {}
+    target = os.path.splitext(output_path)[1][1:].lower()
+    streams = get_streams(input_path)
+    args, actions = [], {}
+    for kind in kinds:
+        # "Remove audio" belongs to the video panel; it cannot apply to a job that only keeps audio.
+        if kind == "audio" and "video" in kinds and settings.get('remove_audio', False):
+            args.append('-an'); continue
+        present = [s for s in streams if s.get('codec_type') == kind]
+        # An unprobed input keeps the old behaviour: encode with the target's usual options.
+        if streams and not present: continue
+        if allow_copy and present and _can_copy(kind, present, target, settings):
+            args.extend([f'-c:{kind[0]}', 'copy']); actions[kind] = 'copy'
+        else:
+            args.extend(_encode_args(kind, target, settings)); actions[kind] = 'encode'
+    return StreamPlan(args, actions)
+
+def _can_copy(kind, streams, target, settings):
+    codecs = COPYABLE_CODECS.get(target, {}).get(kind, set())
+    if codecs is not None and any(s.get('codec_name') not in codecs for s in streams): return False
+    if kind == "video":
+        if settings.get('video_bitrate', "Default") != "Default" or video_height(settings): return False
+        pix_fmts = COPYABLE_PIX_FMTS.get(target)
+        if pix_fmts and any(s.get('pix_fmt') not in pix_fmts for s in streams): return False
+    elif settings.get('audio_bitrate', "Default") != "Default":
+        return False
+    return True
+
+def _encode_args(kind, target, settings):
+    args = list(ENCODER_ARGS.get(target, {}).get(kind, []))
+    if kind == "video":
+        if (br := settings.get('video_bitrate', "Default")) != "Default": args.extend(['-b:v', br])
+        if (h := video_height(settings)): args.extend(['-vf', f'scale=-2:{h}'])
+    elif (abr := settings.get('audio_bitrate', "Default")) != "Default":
+        args.extend(['-b:a', abr])
+    return args
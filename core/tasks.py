@@ -0,0 +1,211 @@
+# core/tasks.py
+"""Conversion bodies for the CPU-bound Python workers.
+
+These are plain module-level functions so that they can run either on the worker's QThread
+or in a process of the ProcessHost pool. They raise on failure and report progress through
+the optional `progress(percent)` callback. Libraries are loaded through core.backends on
+first use.
+"""
+
+import io
+
+from core.backends import require, require_image_plugins
+
+
+# Downscaling: the JPEG decoder is asked for at least DRAFT_REDUCING_GAP times the target size
+# (it decodes at 1/2, 1/4 or 1/8 scale straight from the DCT), then resize() box-reduces by an
+# integer factor down to RESIZE_REDUCING_GAP times the target before the final LANCZOS pass.
+# These are the gaps Pillow's own thumbnail() uses; the result matches a full-resolution LANCZOS
+# resize to within JPEG noise (see benchmarks/image_resize.py).
+DRAFT_REDUCING_GAP = 2.0
+RESIZE_REDUCING_GAP = 3.0
+
+def resize_target(size, resize_setting):
+    """The output size for a "25%" or "1280px (HD)" style setting (longest side for px), None for "None"."""
+    if not resize_setting or resize_setting == "None": return None
+    w, h = size
+    if '%' in resize_setting: s = int(resize_setting.strip('%')) / 100; return max(1, int(w * s)), max(1, int(h * s))
+    p = int(resize_setting.split('px')[0])
+    return (p, max(1, int(h * p / w))) if w > h else (max(1, int(w * p / h)), p)
+
+def convert_image(input_path, output_path, settings, extra_outputs=(), progress=None):
+    """Converts an image to `output_path` and to every path in `extra_outputs`, decoding it only once. Returns `output_path`."""
+    Image = require("pillow"); require_image_plugins(input_path, output_path, *extra_outputs)
+    save_opts={'quality':settings.get('quality',95)} if settings else {}
+    with Image.open(input_path) as img:
+        target = resize_target(img.size, settings.get('resize', "None") if settings else None)
+        if target and img.format == "JPEG":
+            img.draft(None, (int(target[0] * DRAFT_REDUCING_GAP), int(target[1] * DRAFT_REDUCING_GAP)))
+        prepared = {}   # flattened to RGB? -> resized image, shared by the outputs that need the same one
+        for path in (output_path, *extra_outputs):
+            flatten = path.lower().endswith(('.jpg','.jpeg','.bmp')) and img.mode in ('RGBA','LA','P')
+            if flatten not in prepared:
+                out = img.convert('RGB') if flatten else img
+                prepared[flatten] = out.resize(target,Image.Resampling.LANCZOS,reducing_gap=RESIZE_REDUCING_GAP) if target else out
+            prepared[flatten].save(path,**save_opts)
+    return output_path
+
+# RAW development. "Auto" takes the cheapest mode that still covers the output size: the camera's
+# embedded JPEG preview, a half-size development (each 2x2 Bayer block becomes one pixel, so there
+# is no demosaicing), or the full demosaic. Without a resize Auto always develops at full quality.
+RAW_MODES = ["Auto", "Embedded preview", "Half size", "Full quality"]
+PREVIEW_ASPECT_TOLERANCE = 0.02     # Auto skips previews cropped to another aspect ratio than the sensor
+LIBRAW_ROTATIONS = {3: 180, 5: 90, 6: 270}  # LibRaw sizes.flip -> counter-clockwise degrees
+EXIF_ROTATIONS = {3: 180, 6: 270, 8: 90}    # EXIF Orientation -> counter-clockwise degrees
+
+def raw_developed_size(raw):
+    s = raw.sizes
+    return (s.height, s.width) if s.flip in (5, 6) else (s.width, s.height)
+
+def open_raw_preview(raw):
+    """The embedded preview, opened but not decoded yet, and the rotation that makes it upright; (None, 0) if there is none."""
+    rawpy, Image = require("rawpy"), require("pillow")
+    try: thumb = raw.extract_thumb()
+    except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError): return None, 0
+    if thumb.format != rawpy.ThumbFormat.JPEG: return Image.fromarray(thumb.data), LIBRAW_ROTATIONS.get(raw.sizes.flip, 0)
+    img = Image.open(io.BytesIO(thumb.data))
+    # Most cameras store the preview as shot and leave the orientation to the RAW's own flag.
+    orientation = img.getexif().get(0x0112, 1)
+    return img, EXIF_ROTATIONS.get(orientation, 0) if orientation != 1 else LIBRAW_ROTATIONS.get(raw.sizes.flip, 0)
+
+def choose_raw_mode(raw, settings, preview_size=None):
+    """Resolves settings['raw_mode'] to the RAW_MODES entry to develop with (never "Auto"). `preview_size` is upright."""
+    mode = settings.get('raw_mode', "Auto")
+    if mode == "Full quality": return mode
+    size = raw_developed_size(raw)
+    target = resize_target(size, settings.get('resize'))
+    if mode == "Auto" and target is None: return "Full quality"
+    if mode in ("Auto", "Embedded preview") and preview_size:
+        if mode == "Embedded preview": return mode
+        pw, ph = preview_size
+        if abs(pw / ph - size[0] / size[1]) <= PREVIEW_ASPECT_TOLERANCE and pw >= target[0] and ph >= target[1]: return "Embedded preview"
+    if mode != "Auto" or (size[0] // 2 >= target[0] and size[1] // 2 >= target[1]): return "Half size"
+    return "Full quality"
+
+def upright_size(img, rotation):
+    return (img.height, img.width) if rotation in (90, 270) else img.size
+
+def plan_raw_development(input_path, settings, progress=None):
+    """The mode convert_raw_image will develop `input_path` with; only the headers are read."""
+    rawpy = require("rawpy")
+    with rawpy.imread(input_path) as raw:
+        preview, rotation = open_raw_preview(raw) if settings.get('raw_mode', "Auto") in ("Auto", "Embedded preview") else (None, 0)
+        return choose_raw_mode(raw, settings, preview and upright_size(preview, rotation))
+
+def convert_raw_image(input_path, output_path, settings, mode=None, extra_outputs=(), progress=None):
+    """Develops a RAW file in `mode` (a RAW_MODES entry, resolved from the settings if None or "Auto") and applies the image settings.
+
+    The developed image is saved to `output_path` and to every path in `extra_outputs`.
+    """
+    rawpy, Image = require("rawpy"), require("pillow")
+    settings = settings or {}
+    with rawpy.imread(input_path) as raw:
+        size = raw_developed_size(raw)
+        target = resize_target(size, settings.get('resize'))
+        preview, rotation = open_raw_preview(raw) if mode in (None, "Auto", "Embedded preview") else (None, 0)
+        if mode in (None, "Auto"): mode = choose_raw_mode(raw, settings, preview and upright_size(preview, rotation))
+        if mode == "Embedded preview" and preview is not None:
+            if target and preview.format == "JPEG":
+                tw, th = (target[1], target[0]) if rotation in (90, 270) else target
+                preview.draft('RGB', (int(tw * DRAFT_REDUCING_GAP), int(th * DRAFT_REDUCING_GAP)))
+            img = preview.convert('RGB').rotate(rotation, expand=True) if rotation else preview.convert('RGB')
+        else:
+            img = Image.fromarray(raw.postprocess(half_size=mode != "Full quality"))
+    if target and img.size != target: img = img.resize(target, Image.Resampling.LANCZOS, reducing_gap=RESIZE_REDUCING_GAP)
+    for path in (output_path, *extra_outputs): img.save(path, quality=settings.get('quality', 95))
+    return output_path
+
+def convert_pdf_to_docx(input_path, output_path, first_page=0, last_page=None, progress=None):
+    """Converts pages [first_page, last_page) to one DOCX. Parsing the pages is 0-90% of the progress."""
+    cv = require("pdf2docx").Converter(input_path)
+    try:
+        settings = cv.default_settings
+        cv.load_pages(first_page, last_page).parse_document(**settings)
+        _parse_pdf_pages(cv, settings, lambda done, total: progress and progress(done * 90 // total))
+        cv.make_docx(output_path, **settings)
+    finally:
+        cv.close()
+    if progress: progress(100)
+    return output_path
+
+def parse_pdf_pages(input_path, data_path, first_page, last_page, progress=None):
+    """Parses one page range of a parallel PDF to DOCX conversion and stores pdf2docx's page data as JSON."""
+    cv = require("pdf2docx").Converter(input_path)
+    try:
+        settings = cv.default_settings
+        cv.load_pages(first_page, last_page).parse_document(**settings)
+        _parse_pdf_pages(cv, settings, lambda done, total: progress and progress(done * 100 // total))
+        cv.serialize(data_path)
+    finally:
+        cv.close()
+    return data_path
+
+def assemble_docx(input_path, data_paths, output_path, progress=None):
+    """Builds the DOCX from the page data written by parse_pdf_pages, in the order given."""
+    cv = require("pdf2docx").Converter(input_path)
+    try:
+        for data_path in data_paths: cv.deserialize(data_path)
+        cv.make_docx(output_path, **cv.default_settings)
+    finally:
+        cv.close()
+    return output_path
+
+def _parse_pdf_pages(cv, settings, report):
+    # pdf2docx's own parse_pages() without per-page feedback; same error handling.
+    pages = [page for page in cv.pages if not page.skip_parsing]
+    for done, page in enumerate(pages, start=1):
+        try:
+            page.parse(**settings)
+        except Exception as e:
+            if settings['raw_exceptions'] or settings['debug'] or not settings['ignore_page_error']:
+                raise RuntimeError(f"Error when parsing page {page.id + 1}: {e}") from e
+        report(done, len(pages))
+
+def count_pdf_pages(input_path, progress=None):
+    with require("fitz").open(input_path) as doc: return doc.page_count
+
+def convert_pdf_to_text(input_path, output_path, first_page=0, last_page=None, progress=None):
+    """Writes the text of pages [first_page, last_page) to `output_path`, one page at a time."""
+    fitz = require("fitz")
+    with fitz.open(input_path) as doc, open(output_path, 'w', encoding='utf-8') as f:
+        last_page = doc.page_count if last_page is None else min(last_page, doc.page_count)
+        total, reported = max(1, last_page - first_page), -1
+        for number in range(first_page, last_page):
+            f.write(doc[number].get_text())
+            if progress and (percent := (number - first_page + 1) * 100 // total) != reported:
+                reported = percent; progress(percent)
+    return output_path
+
+MERGE_CHUNK_PAGES = 100
+
+def merge_pdfs(input_paths, output_path, progress=None):
+    """Merges PDFs with PyMuPDF, one input open at a time.
+
+    Inputs are copied into the output with insert_pdf and closed right away. Saving with
+    garbage=4 drops unused objects and merges identical ones, including identical streams,
+    so fonts and images shared by the inputs are stored once. Bookmarks are kept, shifted to
+    the pages' new positions.
+    """
+    fitz = require("fitz")
+    total = 0
+    for path in input_paths:
+        with fitz.open(path) as doc: total += doc.page_count
+    done, reported, toc = 0, -1, []
+    with fitz.open() as merged:
+        for path in input_paths:
+            with fitz.open(path) as doc:
+                offset = merged.page_count
+                toc.extend([level, title, page + offset if page > 0 else page] for level, title, page in doc.get_toc())
+                # Short documents go in whole so their internal links survive; long ones in chunks for finer progress.
+                step = doc.page_count if doc.page_count <= MERGE_CHUNK_PAGES else MERGE_CHUNK_PAGES
+                for first in range(0, doc.page_count, max(1, step)):
+                    last = min(first + step, doc.page_count) - 1
+                    merged.insert_pdf(doc, from_page=first, to_page=last)
+                    done += last - first + 1
+                    if progress and (percent := done * 95 // max(1, total)) != reported:
+                        reported = percent; progress(percent)
+        if toc: merged.set_toc(toc)
+        merged.save(output_path, garbage=4, deflate=True)
+    if progress: progress(100)
+    return output_path
+
@@ -0,0 +1,92 @@
+# core/video_merge.py
+"""Preflight for video merges.
+
+The concat demuxer with `-c copy` only produces a valid file when every input has the same
+stream layout. Every input is probed; the layout covering the most playing time wins, the
+inputs that already have it are copied as they are, and only the others are normalized to
+it before the lossless concat. An input that differs only in its MP4/MOV track time base is
+remuxed rather than re-encoded.
+"""
+
+import collections
+import os
+
+from core.probe import get_duration, get_streams
+
+# ffprobe codec_name -> encoder that produces it, for normalizing outliers to the dominant layout.
+VIDEO_ENCODERS = {"h264": "libx264", "hevc": "libx265", "mpeg4": "mpeg4", "vp8": "libvpx", "vp9": "libvpx-vp9",
+                  "mjpeg": "mjpeg", "prores": "prores_ks", "mpeg2video": "mpeg2video"}
+AUDIO_ENCODERS = {"aac": "aac", "mp3": "libmp3lame", "opus": "libopus", "vorbis": "libvorbis", "ac3": "ac3", "flac": "flac",
+                  "pcm_s16le": "pcm_s16le", "pcm_s24le": "pcm_s24le", "alac": "alac"}
+CHANNEL_LAYOUTS = {1: "mono", 2: "stereo", 6: "5.1", 8: "7.1"}
+TIMESCALE_CONTAINERS = {".mp4", ".mov", ".m4v"}
+
+
+class MergeInput:
+    def __init__(self, path, layout, duration):
+        self.path, self.layout, self.duration = path, layout, duration
+        self.action = 'copy'    # 'copy', 'remux' or 'encode'
+
+
+def stream_layout(path, output_ext):
+    """The properties that must match for a stream-copied concat, as a hashable tuple (None if unprobeable)."""
+    video = next((s for s in get_streams(path, 'video') if not s.get('disposition', {}).get('attached_pic')), None)
+    if video is None: return None
+    audio = next(iter(get_streams(path, 'audio')), None)
+    time_base = video.get('time_base') if output_ext in TIMESCALE_CONTAINERS else None
+    return (
+        (video.get('codec_name'), video.get('width'), video.get('height'), video.get('pix_fmt'), video.get('r_frame_rate'), time_base),
+        (audio.get('codec_name'), str(audio.get('sample_rate')), audio.get('channels')) if audio else None,
+    )
+
+def plan_video_merge(input_paths, output_path):
+    """Probes every input and decides which ones can be copied. Returns (dominant layout, [MergeInput]).
+
+    Raises ValueError if no input could be probed, as there is then no layout to normalize to.
+    """
+    output_ext = os.path.splitext(output_path)[1].lower()
+    inputs = [MergeInput(path, stream_layout(path, output_ext), get_duration(path) or 0) for path in input_paths]
+    weight = collections.Counter()
+    for item in inputs:
+        if item.layout: weight[item.layout] += item.duration or 1
+    if not weight:
+        raise ValueError("None of the videos could be read (ffprobe found no video stream in "
+                         f"{', '.join(os.path.basename(path) for path in input_paths)}). Check that they are videos and that ffprobe is installed.")
+    dominant = weight.most_common(1)[0][0]
+    if dominant[0][0] in VIDEO_ENCODERS and (dominant[1] is None or dominant[1][0] in AUDIO_ENCODERS):
+        for item in inputs:
+            if item.layout == dominant: item.action = 'copy'
+            elif item.layout and item.layout[0][:5] == dominant[0][:5] and item.layout[1] == dominant[1]: item.action = 'remux'
+            else: item.action = 'encode'
+        return dominant, inputs
+    # No encoder can reproduce the dominant codecs: encode everything to H.264/AAC at the dominant geometry.
+    has_audio = any(item.layout and item.layout[1] for item in inputs)
+    for item in inputs: item.action = 'encode'
+    return (('h264', *dominant[0][1:3], 'yuv420p', dominant[0][4], None), ('aac', '48000', 2) if has_audio else None), inputs
+
+def normalize_command(item, layout, output_path):
+    """The ffmpeg command that turns `item` into a segment with the given stream `layout`."""
+    v_codec, width, height, pix_fmt, frame_rate, time_base = layout[0]
+    a_codec, sample_rate, channels = layout[1] if layout[1] else (None, None, None)
+    timescale = ['-video_track_timescale', time_base.split('/')[1]] if time_base and '/' in time_base else []
+
+    if item.action == 'remux':
+        return ['ffmpeg', '-i', item.path, '-map', '0:v:0', '-map', '0:a:0?', '-c', 'copy'] + timescale + ['-y', output_path]
+
+    has_audio = item.layout is not None and item.layout[1] is not None
+    cmd = ['ffmpeg', '-i', item.path]
+    if a_codec and not has_audio:
+        # The other segments have sound; give this one silence of the same format.
+        cmd += ['-f', 'lavfi', '-i', f"anullsrc=r={sample_rate}:cl={CHANNEL_LAYOUTS.get(channels, 'stereo')}", '-shortest']
+    cmd += ['-map', '0:v:0']
+    if a_codec: cmd += ['-map', '0:a:0' if has_audio else '1:a:0']
+
+    filters = []
+    if width and height:
+        filters.append(f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+    if frame_rate: filters.append(f"fps={frame_rate}")
+    if filters: cmd += ['-vf', ','.join(filters)]
+    cmd += ['-c:v', VIDEO_ENCODERS[v_codec]] + (['-pix_fmt', pix_fmt] if pix_fmt else []) + timescale
+    if a_codec: cmd += ['-c:a', AUDIO_ENCODERS[a_codec], '-ar', str(sample_rate), '-ac', str(channels)]
+    else: cmd += ['-an']
+    return cmd + ['-y', output_path]
@@ -0,0 +1,113 @@
+# core/watch.py
+"""Hot folders: convert files as they arrive in watched directories.
+
+Each rule maps a folder to a target format, an optional preset and what happens to the
+source afterwards (keep, move to a "processed" folder, or delete). Folders are watched with
+QFileSystemWatcher, which sits on the platform's change notification (inotify,
+ReadDirectoryChangesW, FSEvents/kqueue), so an idle watcher does no work at all. A file is
+handed over only once its size and modification time have stopped changing, so that files
+still being copied or written by a scanner are not picked up half-way.
+"""
+
+import os
+import shutil
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+from core.dispatch import find_output_category
+from core.scan import is_supported
+
+SOURCE_ACTIONS = ["keep", "move", "delete"]
+SETTLE_MS = 2000            # a file must look the same twice this far apart to count as complete
+CONVERTED_DIR, PROCESSED_DIR = "converted", "processed"
+
+
+def normalize_rule(rule):
+    """Fills in the defaults of a rule from the settings file: outputs go to <folder>/converted
+    and moved sources to <folder>/processed unless the rule names other folders."""
+    folder = rule['folder']
+    return {
+        'folder': folder, 'target': rule['target'].lstrip('.').lower(), 'preset': rule.get('preset') or "",
+        'source_action': rule.get('source_action') if rule.get('source_action') in SOURCE_ACTIONS else "keep",
+        'output_dir': rule.get('output_dir') or os.path.join(folder, CONVERTED_DIR),
+        'processed_dir': rule.get('processed_dir') or os.path.join(folder, PROCESSED_DIR),
+    }
+
+def rule_accepts(rule, path):
+    name = os.path.basename(path)
+    if name.startswith('.') or not is_supported(name): return False
+    return find_output_category(os.path.splitext(name)[1].lower(), rule['target']) is not None
+
+def finish_source(path, rule):
+    """Applies the rule's source action once the conversion is done. Returns the source's new path (None if deleted)."""
+    if rule['source_action'] == "delete":
+        os.remove(path); return None
+    if rule['source_action'] == "move":
+        os.makedirs(rule['processed_dir'], exist_ok=True)
+        base, ext = os.path.splitext(os.path.basename(path))
+        target, n = os.path.join(rule['processed_dir'], base + ext), 1
+        while os.path.exists(target): target = os.path.join(rule['processed_dir'], f"{base} ({n}){ext}"); n += 1
+        return shutil.move(path, target)
+    return path
+
+
+class HotFolderWatcher(QObject):
+    """Emits `file_ready(path, rule)` once for every settled file that arrives in a rule's folder.
+
+    Files already in a folder when watching starts are picked up too. A file whose source is
+    kept is not handed over again unless it is modified.
+    """
+    file_ready = pyqtSignal(str, dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rules = {}     # folder -> rule
+        self.pending = {}   # path -> (size, mtime_ns, rule) seen on the last look
+        self.handled = {}   # path -> mtime_ns when it was handed over
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.scan_folder)
+        self.settle_timer = QTimer(self); self.settle_timer.setSingleShot(True); self.settle_timer.setInterval(SETTLE_MS)
+        self.settle_timer.timeout.connect(self.check_pending)
+
+    def start(self, rules):
+        """Watches the folders of `rules` (normalized), replacing any earlier rules. Returns the folders that could not be watched."""
+        self.stop()
+        missing = []
+        for rule in rules:
+            folder = os.path.abspath(rule['folder'])
+            if not os.path.isdir(folder) or not self.watcher.addPath(folder): missing.append(rule['folder']); continue
+            self.rules[folder] = rule
+        for folder in self.rules: self.scan_folder(folder)
+        return missing
+
+    def stop(self):
+        if self.watcher.directories(): self.watcher.removePaths(self.watcher.directories())
+        self.rules.clear(); self.pending.clear(); self.settle_timer.stop()
+
+    def is_active(self):
+        return bool(self.rules)
+
+    def scan_folder(self, folder):
+        if (rule := self.rules.get(folder)) is None: return
+        try:
+            with os.scandir(folder) as it: entries = [e for e in it if e.is_file() and rule_accepts(rule, e.name)]
+        except OSError:
+            return
+        for entry in entries:
+            if entry.path in self.pending: continue
+            try: stat = entry.stat()
+            except OSError: continue
+            if self.handled.get(entry.path) == stat.st_mtime_ns: continue
+            self.pending[entry.path] = (stat.st_size, stat.st_mtime_ns, rule)
+        if self.pending and not self.settle_timer.isActive(): self.settle_timer.start()
+
+    def check_pending(self):
+        for path, (size, mtime, rule) in list(self.pending.items()):
+            try: stat = os.stat(path)
+            except OSError: del self.pending[path]; continue  # gone (moved away or deleted)
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime) or stat.st_size == 0:
+                self.pending[path] = (stat.st_size, stat.st_mtime_ns, rule); continue
+            del self.pending[path]
+            self.handled[path] = stat.st_mtime_ns
+            self.file_ready.emit(path, rule)
+        if self.pending: self.settle_timer.start()
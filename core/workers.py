@@ -0,0 +1,607 @@
+# core/workers.py
+
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+from core.archives import convert_archive
+from core.ffmpeg import FFmpegProcess
+from core.probe import get_duration
+from core.segmented import SegmentedEncode, segment_count
+from core.stream_plan import plan_streams
+from core.video_merge import normalize_command, plan_video_merge
+from core.formats import get_file_category
+from core.scan import scan_paths
+from core.libreoffice import LibreOfficeError, get_libreoffice_service
+from core.process_host import pool_size, run_task
+from core.metrics import bind_job, phase
+from core.pdf_docx import split_documents, split_ranges
+from core.tasks import (
+    assemble_docx, convert_image, convert_raw_image, convert_pdf_to_docx, convert_pdf_to_text, count_pdf_pages, merge_pdfs, parse_pdf_pages,
+    plan_raw_development
+)
+
+
+class FFmpegWorker(QObject):
+    engine = "ffmpeg"
+    progress_updated=pyqtSignal(int,int); stats_updated=pyqtSignal(int,float,float); plan_chosen=pyqtSignal(int,str); finished=pyqtSignal(int,str); error=pyqtSignal(int,str)
+    def __init__(self,r,i,o,m,s,p=None): super().__init__(p); self.row,self.i,self.o,self.mode,self.settings,self.process=r,i,o,m,s,None; self.stopped=False
+    def run(self):
+        is_vid = get_file_category(os.path.splitext(self.i)[1].lower()) == "video"
+        if self.mode not in ("video_to_image", "video_to_audio", "default"):
+             self.error.emit(self.row, "Invalid conversion mode specified.")
+             return
+
+        try:
+            # Planning probes the input and reads the settings; whatever fails there must still end the job with `error`.
+            if self.mode == "video_to_image":
+                cmd, plan = ['ffmpeg', '-i', self.i, '-ss', '00:00:05', '-vframes', '1', '-y', self.o], None
+            else:
+                # Streams the target can hold as they are are copied; only the rest is encoded.
+                kinds = ("video", "audio") if is_vid and self.mode == "default" else ("audio",)
+                plan = plan_streams(self.i, self.o, self.settings, kinds)
+                cmd = self.build_command(plan)
+            dur=get_duration(self.i)
+            # Probing takes a while on slow drives; a row cancelled meanwhile must not start encoding.
+            if self.stopped: return
+            self.process=self.create_process(cmd, plan, dur)
+            if self.stopped: self.process.stop()
+            returncode=self.process.run(lambda stats: self.report_progress(stats, dur))
+            if returncode!=0 and plan and plan.copies and not self.stopped:
+                # Some inputs cannot be muxed as they are (odd timestamps, unsupported tags); encode them instead.
+                plan = plan_streams(self.i, self.o, self.settings, kinds, allow_copy=False)
+                self.plan_chosen.emit(self.row, plan.label)
+                self.process=FFmpegProcess(self.build_command(plan))
+                returncode=self.process.run(lambda stats: self.report_progress(stats, dur))
+            if returncode==0:self.progress_updated.emit(self.row,100);self.finished.emit(self.row,self.o)
+            elif not self.stopped:self.error.emit(self.row,self.process.error_message())
+        except Exception as e: self.error.emit(self.row,str(e))
+
+    def create_process(self, cmd, plan, duration):
+        """A single ffmpeg run, or a SegmentedEncode when a long video has to be encoded and segmenting is enabled."""
+        if plan is None: return FFmpegProcess(cmd)
+        segments = segment_count(duration) if self.mode == "default" and plan.actions.get('video') == 'encode' else 1
+        if segments < 2:
+            self.plan_chosen.emit(self.row, plan.label)
+            return FFmpegProcess(cmd)
+        video_args = plan_streams(self.i, self.o, self.settings, ("video",)).args
+        audio_args = plan_streams(self.i, self.o, self.settings, ("audio",)).args if 'audio' in plan.actions else None
+        self.plan_chosen.emit(self.row, f"{plan.label}, {segments} segments")
+        return SegmentedEncode(self.i, self.o, video_args, audio_args, segments, duration)
+
+    def build_command(self, plan):
+        cmd = ['ffmpeg', '-i', self.i]
+        if self.mode == "video_to_audio": cmd.append('-vn')
+        return cmd + plan.args + ['-y', self.o]
+
+    def report_progress(self, stats, duration, start=0, span=100):
+        """Maps ffmpeg's out_time onto [start, start+span] percent of this row's bar."""
+        self.stats_updated.emit(self.row, stats['fps'], stats['speed'])
+        if duration: self.progress_updated.emit(self.row, min(start + span, start + int(stats['out_time'] / duration * span)))
+
+    def stop(self):
+        self.stopped = True
+        if self.process: self.process.stop()
+
+class FFmpegFanOutWorker(FFmpegWorker):
+    """Writes several targets of one video or audio file from a single ffmpeg run, so the input is decoded once.
+
+    `outputs` lists (output category, output path) pairs, the row's own target first. Each
+    output gets the options a conversion to it alone would use: streams are copied where the
+    target can hold them, and image targets take the frame at 5 seconds.
+    """
+    def __init__(self, row, input_path, outputs, settings, parent=None):
+        super().__init__(row, input_path, outputs[0][1], "fan_out", settings, parent)
+        self.outputs, self.reported = outputs, 0
+        self.extra_outputs = [o_path for _, o_path in outputs[1:]]
+
+    def run(self):
+        try:
+            dur = get_duration(self.i)
+            cmd, plans = self.build_fan_out()
+            self.plan_chosen.emit(self.row, self.fan_out_label(plans))
+            if self.stopped: return
+            self.process = FFmpegProcess(cmd)
+            if self.stopped: self.process.stop()
+            returncode = self.process.run(lambda stats: self.report_progress(stats, dur))
+            if returncode != 0 and any(plan.copies for plan in plans.values()) and not self.stopped:
+                cmd, plans = self.build_fan_out(allow_copy=False)
+                self.plan_chosen.emit(self.row, self.fan_out_label(plans))
+                self.process = FFmpegProcess(cmd)
+                returncode = self.process.run(lambda stats: self.report_progress(stats, dur))
+            if returncode == 0: self.progress_updated.emit(self.row, 100); self.finished.emit(self.row, self.o)
+            elif not self.stopped: self.error.emit(self.row, self.process.error_message())
+        except Exception as e: self.error.emit(self.row, str(e))
+
+    def build_fan_out(self, allow_copy=True):
+        """The ffmpeg command with one block of output options per target, and the StreamPlan of each non-image output."""
+        is_vid = get_file_category(os.path.splitext(self.i)[1].lower()) == "video"
+        cmd, plans = ['ffmpeg', '-i', self.i], {}
+        for o_cat, o_path in self.outputs:
+            if is_vid and o_cat == "image":
+                cmd += ['-ss', '00:00:05', '-vframes', '1']
+            else:
+                kinds = ("video", "audio") if is_vid and o_cat == "video" else ("audio",)
+                plans[o_path] = plan_streams(self.i, o_path, self.settings, kinds, allow_copy)
+                cmd += (['-vn'] if is_vid and o_cat == "audio" else []) + plans[o_path].args
+            cmd += ['-y', o_path]
+        return cmd, plans
+
+    def report_progress(self, stats, duration, start=0, span=100):
+        # With several outputs ffmpeg's out_time can come from any of them (an image output stops at
+        # its single frame), so the bar only moves forward.
+        self.stats_updated.emit(self.row, stats['fps'], stats['speed'])
+        if duration and (percent := min(100, int(stats['out_time'] / duration * 100))) > self.reported:
+            self.reported = percent; self.progress_updated.emit(self.row, percent)
+
+    def fan_out_label(self, plans):
+        return ", ".join(f"{os.path.splitext(o_path)[1][1:]} {plans[o_path].label if o_path in plans else 'frame'}" for _, o_path in self.outputs)
+
+class ProcessHostedWorker(QObject):
+    """Base for workers whose job is a core.tasks function, run in the process pool when it is enabled."""
+    progress_updated=pyqtSignal(int,int); finished=pyqtSignal(int,str); error=pyqtSignal(int,str)
+    error_prefix = ""
+
+    def __init__(self, row, parent=None):
+        super().__init__(parent)
+        self.row, self.futures, self.cancelled = row, [], False
+
+    def task(self):
+        """Returns the (function, args) pair to execute."""
+        raise NotImplementedError
+
+    def run(self):
+        try:
+            output_path = self.execute()
+            if not self.cancelled: self.finished.emit(self.row, output_path)
+        except Exception as e:
+            if not self.cancelled: self.error.emit(self.row, f"{self.error_prefix}{str(e)}")
+
+    def execute(self):
+        """Runs the job and returns the output path. Subclasses may split it into several tasks."""
+        fn, args = self.task()
+        return run_task(fn, args, lambda v: self.progress_updated.emit(self.row, v), self.attach_future)
+
+    def attach_future(self, future):
+        self.futures.append(future)
+
+    def stop(self):
+        # A task already running in a pool process is left to finish; its result is discarded.
+        self.cancelled = True
+        for future in self.futures: future.cancel()
+
+class ImageWorker(ProcessHostedWorker):
+    """Converts an image; with `extra_outputs` every further target is saved from the same decoded image."""
+    engine = "image"
+    output_version = 2  # 2: JPEGs are decoded at reduced scale when downscaling
+    def __init__(self,r,i,o,s,p=None,extra_outputs=()): super().__init__(r,p); self.i,self.o,self.settings,self.extra_outputs=i,o,s,list(extra_outputs)
+    def task(self): return convert_image, (self.i, self.o, self.settings, self.extra_outputs)
+
+class MergeWorker(QObject):
+    progress_updated = pyqtSignal(int, int); plan_chosen = pyqtSignal(int, str); finished = pyqtSignal(int, str); error = pyqtSignal(int, str)
+    def __init__(self, row, inputs, output, cat, p=None):
+        super().__init__(p); self.row, self.inputs, self.output, self.category, self.process = row, inputs, output, cat, None
+        self.engine = "ffmpeg" if cat == "video" else "pdf"
+        self.future, self.cancelled, self.processes = None, False, []
+    def run(self):
+        try:
+            if self.category == "document": # PDF
+                run_task(merge_pdfs, (self.inputs, self.output), lambda v: self.progress_updated.emit(self.row, v), self.attach_future)
+                if not self.cancelled: self.finished.emit(self.row, self.output)
+            elif self.category == "video":
+                with tempfile.TemporaryDirectory(prefix="fileconverter-merge-") as scratch:
+                    segments = self.prepare_segments(scratch)
+                    if segments is None: return
+                    list_file = os.path.join(scratch, "inputs.txt")
+                    with open(list_file, 'w', encoding='utf-8') as f:
+                        for path in segments: f.write("file '{}'\n".format(os.path.normpath(path).replace("'", "'\\''")))
+                    total = sum(get_duration(path) or 0 for path in self.inputs)
+                    start = 50 if len(segments) != sum(p in self.inputs for p in segments) else 0
+                    cmd = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', list_file, '-c', 'copy', '-y', self.output]
+                    self.process = FFmpegProcess(cmd)
+                    returncode = self.process.run(lambda stats: total and self.progress_updated.emit(self.row, min(100, start + int(stats['out_time'] / total * (100 - start)))))
+                if returncode == 0:
+                    self.progress_updated.emit(self.row, 100); self.finished.emit(self.row, self.output)
+                elif not self.cancelled:
+                    self.error.emit(self.row, self.process.error_message("FFmpeg merge error"))
+        except Exception as e:
+            if not self.cancelled: self.error.emit(self.row, f"Merge failed: {str(e)}")
+
+    def prepare_segments(self, scratch):
+        """Preflight: copies inputs that match the dominant stream layout and normalizes the rest in parallel (0-50%).
+
+        Returns the concat list in input order, or None after reporting an error.
+        """
+        layout, items = plan_video_merge(self.inputs, self.output)
+        outliers = [item for item in items if item.action != 'copy']
+        encoded = sum(item.action == 'encode' for item in outliers)
+        self.plan_chosen.emit(self.row, f"{len(items) - encoded} copied, {encoded} re-encoded" if encoded else "stream copy")
+        if not outliers: return [item.path for item in items]
+
+        ext = os.path.splitext(self.output)[1]
+        segments = {item.path: os.path.join(scratch, f"segment{i:04d}{ext}") for i, item in enumerate(outliers)}
+        total = sum(item.duration for item in outliers) or 1
+        done = {}
+        def normalize(item):
+            process = FFmpegProcess(normalize_command(item, layout, segments[item.path]))
+            self.processes.append(process)
+            def report(stats):
+                done[item.path] = min(stats['out_time'], item.duration)
+                self.progress_updated.emit(self.row, int(sum(done.values()) / total * 50))
+            return process if process.run(report) != 0 else None
+        with ThreadPoolExecutor(max_workers=min(len(outliers), max(1, (os.cpu_count() or 1) // 2))) as pool:
+            failed = next((p for p in pool.map(bind_job(normalize), outliers) if p is not None), None)
+        if failed is not None or self.cancelled:
+            if not self.cancelled: self.error.emit(self.row, failed.error_message("FFmpeg merge preflight error"))
+            return None
+        return [segments.get(item.path, item.path) for item in items]
+
+    def attach_future(self, future):
+        self.future = future
+    def stop(self):
+        self.cancelled = True
+        if self.future: self.future.cancel()
+        for process in [self.process] + self.processes:
+            if process: process.stop()
+class PdfToDocxWorker(ProcessHostedWorker):
+    """A specialized worker to convert PDF to DOCX using the pdf2docx library.
+
+    Page ranges of one document are parsed side by side in the process pool, and very long
+    PDFs may become several DOCX files; see core.pdf_docx.
+    """
+    engine = "pdf"
+    error_prefix = "PDF to DOCX conversion failed: "
+
+    def __init__(self, row, input_path, output_path, parent=None):
+        super().__init__(row, parent)
+        self.input_path, self.output_path = input_path, output_path
+        self.pages, self.pages_done, self.reported = 0, 0, -1
+
+    def task(self):
+        return convert_pdf_to_docx, (self.input_path, self.output_path)
+
+    def execute(self):
+        self.pages = run_task(count_pdf_pages, (self.input_path,), None, self.attach_future)
+        documents = split_documents(self.output_path, self.pages)
+        for first_page, last_page, output_path in documents:
+            ranges = split_ranges(first_page, last_page, pool_size())
+            if len(ranges) == 1:
+                run_task(convert_pdf_to_docx, (self.input_path, output_path, first_page, last_page),
+                         partial(self.report, last_page - first_page), self.attach_future)
+            else:
+                self.convert_in_parallel(ranges, output_path)
+            self.pages_done += last_page - first_page
+        self.progress_updated.emit(self.row, 100)
+        # With a page cap the first part stands for the job (e.g. for "Open Folder").
+        return documents[0][2]
+
+    def convert_in_parallel(self, ranges, output_path):
+        document_pages = ranges[-1][1] - ranges[0][0]
+        parsed = [0] * len(ranges)
+        def range_progress(i, percent):
+            parsed[i] = (ranges[i][1] - ranges[i][0]) * percent // 100
+            self.report(document_pages, sum(parsed) * 90 // document_pages)
+        with tempfile.TemporaryDirectory(prefix="fileconverter-pdf2docx-") as scratch:
+            data_paths = [os.path.join(scratch, f"pages-{i}.json") for i in range(len(ranges))]
+            with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                futures = [pool.submit(bind_job(run_task), parse_pdf_pages, (self.input_path, data_paths[i], first, last),
+                                       partial(range_progress, i), self.attach_future) for i, (first, last) in enumerate(ranges)]
+                for future in futures: future.result()
+            run_task(assemble_docx, (self.input_path, data_paths, output_path), None, self.attach_future)
+        self.report(document_pages, 100)
+
+    def report(self, document_pages, percent):
+        """`percent` of the document currently being written, mapped onto the whole PDF."""
+        total = (self.pages_done * 100 + document_pages * percent) // max(1, self.pages)
+        if total != self.reported: self.reported = total; self.progress_updated.emit(self.row, total)
+
+class PdfToTextWorker(ProcessHostedWorker):
+    """Extracts text from a PDF using PyMuPDF, streaming each page to the output file.
+
+    Long documents are split into page ranges that run side by side in the process pool,
+    each opening the PDF on its own; the parts are then joined in page order.
+    """
+    engine = "pdf"
+    error_prefix = "PDF to TXT conversion failed: "
+    PARALLEL_MIN_PAGES = 200
+    MIN_PAGES_PER_RANGE = 50
+
+    def __init__(self, row, input_path, output_path, parent=None):
+        super().__init__(row, parent)
+        self.input_path, self.output_path = input_path, output_path
+
+    def task(self):
+        return convert_pdf_to_text, (self.input_path, self.output_path)
+
+    def execute(self):
+        workers = pool_size()
+        if workers < 2: return super().execute()
+        pages = run_task(count_pdf_pages, (self.input_path,), None, self.attach_future)
+        ranges = min(workers, pages // self.MIN_PAGES_PER_RANGE)
+        if pages < self.PARALLEL_MIN_PAGES or ranges < 2: return super().execute()
+
+        bounds = [pages * i // ranges for i in range(ranges + 1)]
+        parts = [f"{self.output_path}.part{i}" for i in range(ranges)]
+        done, reported = [0] * ranges, [-1]
+        def report(i, percent):
+            done[i] = (bounds[i + 1] - bounds[i]) * percent // 100
+            if (total := sum(done) * 100 // pages) != reported[0]:
+                reported[0] = total; self.progress_updated.emit(self.row, total)
+        try:
+            with ThreadPoolExecutor(max_workers=ranges) as pool:
+                futures = [pool.submit(bind_job(run_task), convert_pdf_to_text, (self.input_path, parts[i], bounds[i], bounds[i + 1]),
+                                       partial(report, i), self.attach_future) for i in range(ranges)]
+                for future in futures: future.result()
+            with phase("write"), open(self.output_path, 'wb') as out:
+                for part in parts:
+                    with open(part, 'rb') as f: shutil.copyfileobj(f, out)
+        finally:
+            for part in parts:
+                if os.path.exists(part): os.remove(part)
+        self.progress_updated.emit(self.row, 100)
+        return self.output_path
+
+class RawImageWorker(ProcessHostedWorker):
+    """Develops a camera RAW file. The development mode is resolved first so the row can show it."""
+    engine = "image"
+    output_version = 2  # 2: honors resize and quality and picks a development mode
+    plan_chosen = pyqtSignal(int, str)
+    def __init__(self,r,i,o,s,p=None,extra_outputs=()):super().__init__(r,p);self.i,self.o,self.s,self.extra_outputs=i,o,s,list(extra_outputs)
+    def task(self):return convert_raw_image, (self.i, self.o, self.s, None, self.extra_outputs)
+
+    def execute(self):
+        mode = run_task(plan_raw_development, (self.i, self.s), None, self.attach_future)
+        self.plan_chosen.emit(self.row, mode.lower())
+        return run_task(convert_raw_image, (self.i, self.o, self.s, mode, self.extra_outputs),
+                        lambda v: self.progress_updated.emit(self.row, v), self.attach_future)
+
+
+class LibreOfficeWorker(QObject):
+    engine = "libreoffice"
+    finished=pyqtSignal(int,str)
+    error=pyqtSignal(int,str)
+    
+    def __init__(self,r,i,o,o_dir,p=None):
+        super().__init__(p)
+        self.row, self.input_path, self.output_path, self.output_dir = r, i, o, o_dir
+        self.service, self.request, self.cancelled = None, None, False
+
+    def run(self):
+        try:
+            self.service = get_libreoffice_service()
+            self.request = self.service.submit(self.input_path, self.output_path, self.output_dir)
+            if self.cancelled: self.service.cancel(self.request)
+            self.service.wait(self.request)
+            if not self.cancelled: self.finished.emit(self.row, self.output_path)
+        except LibreOfficeError as e:
+            if not self.cancelled: self.error.emit(self.row, str(e))
+        except Exception as e:
+            self.error.emit(self.row, f"An unexpected error occurred while running LibreOffice: {str(e)}")
+
+    def stop(self):
+        # A document soffice is already converting is stopped by killing its batch; the rest of the batch is queued again.
+        self.cancelled = True
+        if self.request: self.service.cancel(self.request)
+class ArchiveWorker(QObject):
+    """Re-packs an archive entry by entry through core.archives, without extracting it to disk first."""
+    engine = "archive"
+    progress_updated=pyqtSignal(int,int);finished=pyqtSignal(int,str);error=pyqtSignal(int,str)
+    def __init__(self,r,i,o,p=None):super().__init__(p);self.row,self.i,self.o,self.cancelled=r,i,o,False
+    def run(self):
+        try:
+            convert_archive(self.i, self.o, lambda v: self.progress_updated.emit(self.row, v), lambda: self.cancelled)
+            self.finished.emit(self.row,self.o)
+        except Exception as e:
+            if not self.cancelled: self.error.emit(self.row,str(e))
+    def stop(self):self.cancelled=True
+class FolderScanWorker(QObject):
+    """Scans dropped files and folders off the GUI thread (core.scan) and hands the files over in batches."""
+    BATCH_SIZE, BATCH_SECONDS = 500, 0.25
+    files_found = pyqtSignal(list); finished = pyqtSignal(int)
+    def __init__(self, paths, p=None): super().__init__(p); self.paths, self.cancelled = paths, False
+    def run(self):
+        batch, found, flushed = [], 0, time.monotonic()
+        for path in scan_paths(self.paths, should_stop=lambda: self.cancelled):
+            if self.cancelled: break
+            batch.append(path)
+            if len(batch) >= self.BATCH_SIZE or time.monotonic() - flushed >= self.BATCH_SECONDS:
+                found += len(batch); self.files_found.emit(batch); batch, flushed = [], time.monotonic()
+        if batch and not self.cancelled: found += len(batch); self.files_found.emit(batch)
+        self.finished.emit(found)
+    def stop(self): self.cancelled = True
+class PlaceholderWorker(QObject):
+    engine = None
+    finished=pyqtSignal(int,str);error=pyqtSignal(int,str)
+    def __init__(self,r,c,p=None):super().__init__(p);self.row,self.category=r,c
+    def run(self):self.error.emit(self.row,f"Conversion for '{self.category}' is not implemented.")
+    def stop(self):pass
+GIF_DEFAULTS = {'gif_fps': 15, 'gif_width': 480, 'gif_dither': "sierra2_4a", 'gif_start': 0.0, 'gif_duration': 0.0, 'gif_two_pass': False}
+GIF_DITHERS = ["sierra2_4a", "floyd_steinberg", "bayer", "none"]
+# The single-pass graph holds every frame in memory until the palette is ready; longer clips use two passes.
+GIF_SINGLE_PASS_MAX_FRAMES = 1800
+
+class FFmpegGifWorker(QObject):
+    """GIF conversion with a generated palette.
+
+    By default one ffmpeg run decodes the clip once and splits it into palettegen and
+    paletteuse. The two-pass method (palette PNG first, then the GIF) is used when asked for
+    in the settings or for long clips; its palette lives in a per-job scratch directory.
+    """
+    engine = "ffmpeg"
+    progress_updated = pyqtSignal(int, int)
+    stats_updated = pyqtSignal(int, float, float)
+    finished = pyqtSignal(int, str)
+    error = pyqtSignal(int, str)
+
+    def __init__(self, row, input_path, output_path, settings, parent=None):
+        super().__init__(parent)
+        self.row, self.input_path, self.output_path, self.settings = row, input_path, output_path, settings
+        self.process = None
+        self.stopped = False
+
+    def run(self):
+        opts = {**GIF_DEFAULTS, **{k: v for k, v in (self.settings or {}).items() if k in GIF_DEFAULTS}}
+        try:
+            start, length = float(opts['gif_start']), float(opts['gif_duration'])
+            trim = (['-ss', f"{start:g}"] if start else []) + (['-t', f"{length:g}"] if length else [])
+            filters = f"fps={opts['gif_fps']}" + (f",scale={opts['gif_width']}:-1:flags=lanczos" if opts['gif_width'] else "")
+            paletteuse = f"paletteuse=dither={opts['gif_dither']}"
+            duration = get_duration(self.input_path)
+            clip = min(length, duration - start) if duration and length else (duration - start if duration else length)
+            clip = clip if clip and clip > 0 else None
+            if opts['gif_two_pass'] or (clip and clip * opts['gif_fps'] > GIF_SINGLE_PASS_MAX_FRAMES):
+                self.run_two_pass(trim, filters, paletteuse, clip)
+                return
+            cmd = ['ffmpeg', *trim, '-i', self.input_path,
+                   '-filter_complex', f"[0:v]{filters},split[a][b];[a]palettegen[p];[b][p]{paletteuse}",
+                   '-y', self.output_path]
+            self.process = FFmpegProcess(cmd)
+            if self.process.run(lambda stats: self.report_progress(stats, clip, 0, 100)) == 0:
+                self.progress_updated.emit(self.row, 100)
+                self.finished.emit(self.row, self.output_path)
+            elif not self.stopped:
+                self.error.emit(self.row, self.process.error_message("FFmpeg GIF creation error"))
+        except Exception as e:
+            self.error.emit(self.row, str(e))
+
+    def run_two_pass(self, trim, filters, paletteuse, clip):
+        with tempfile.TemporaryDirectory(prefix="fileconverter-gif-") as scratch:
+            palette_path = os.path.join(scratch, "palette.png")
+
+            # --- PASS 1: Generate Palette (0-50%) ---
+            self.process = FFmpegProcess(['ffmpeg', *trim, '-i', self.input_path, '-vf', f'{filters},palettegen', '-y', palette_path])
+            if self.process.run(lambda stats: self.report_progress(stats, clip, 0, 50)) != 0:
+                if not self.stopped: self.error.emit(self.row, self.process.error_message("FFmpeg palette generation error"))
+                return
+
+            # --- PASS 2: Create GIF using Palette (50-100%) ---
+            self.progress_updated.emit(self.row, 50) # Halfway point
+            self.process = FFmpegProcess(['ffmpeg', *trim, '-i', self.input_path, '-i', palette_path,
+                                          '-lavfi', f'{filters}[x];[x][1:v]{paletteuse}', '-y', self.output_path])
+            if self.process.run(lambda stats: self.report_progress(stats, clip, 50, 50)) == 0:
+                self.progress_updated.emit(self.row, 100)
+                self.finished.emit(self.row, self.output_path)
+            elif not self.stopped:
+                self.error.emit(self.row, self.process.error_message("FFmpeg GIF creation error"))
+
+    def report_progress(self, stats, duration, start, span):
+        self.stats_updated.emit(self.row, stats['fps'], stats['speed'])
+        if duration: self.progress_updated.emit(self.row, min(start + span, start + int(stats['out_time'] / duration * span)))
+
+    def stop(self):
+        self.stopped = True
+        if self.process: self.process.stop()
+
+class CachedWorker(QObject):
+    """Wraps a single-output worker with the ConversionCache.
+
+    On a hit the cached output is linked into place and `cache_hit` is emitted just before
+    `finished`; on a miss the wrapped worker runs on this same thread and its output is
+    stored once it finishes.
+    """
+    progress_updated = pyqtSignal(int, int)
+    stats_updated = pyqtSignal(int, float, float)
+    plan_chosen = pyqtSignal(int, str)
+    finished = pyqtSignal(int, str)
+    error = pyqtSignal(int, str)
+    cache_hit = pyqtSignal(int)
+
+    def __init__(self, worker, cache, input_path, output_path, settings, parent=None):
+        super().__init__(parent)
+        self.worker, self.cache = worker, cache
+        self.row, self.engine = worker.row, worker.engine
+        self.input_path, self.output_path, self.settings = input_path, output_path, settings
+        self.target = os.path.splitext(output_path)[1][1:].lower()
+        # Workers set `output_version` (and bump it) once they write different output for the same settings.
+        version = getattr(worker, 'output_version', None)
+        self.variant = f"{type(worker).__name__}:{getattr(worker, 'mode', '')}" + (f":v{version}" if version else "")
+        self.key = None
+        # The wrapped worker follows this object to its thread; the forwarding must not depend on an event loop.
+        worker.setParent(self)
+        direct = Qt.ConnectionType.DirectConnection
+        if hasattr(worker, 'progress_updated'): worker.progress_updated.connect(self.progress_updated, direct)
+        if hasattr(worker, 'stats_updated'): worker.stats_updated.connect(self.stats_updated, direct)
+        if hasattr(worker, 'plan_chosen'): worker.plan_chosen.connect(self.plan_chosen, direct)
+        worker.finished.connect(self.on_worker_finished, direct)
+        worker.error.connect(self.error, direct)
+
+    def run(self):
+        try:
+            with phase("probe"): self.key = self.cache.make_key(self.input_path, self.target, self.settings, self.engine, self.variant)
+            with phase("write"): hit = self.cache.fetch(self.key, self.target, self.output_path)
+            if hit:
+                self.cache_hit.emit(self.row)
+                self.progress_updated.emit(self.row, 100)
+                self.finished.emit(self.row, self.output_path)
+                return
+        except OSError:
+            self.key = None # A broken cache must never stop the conversion itself.
+        self.worker.run()
+
+    def on_worker_finished(self, row, output_path):
+        # A job that ended up writing a different file (e.g. split into parts) is not cacheable.
+        if self.key and output_path == self.output_path:
+            try:
+                with phase("write"): self.cache.store(self.key, self.target, output_path)
+            except OSError: pass
+        self.finished.emit(row, output_path)
+
+    def stop(self):
+        self.worker.stop()
+
+class StagedWorker(QObject):
+    """Wraps a worker so that its outputs only appear under their real names once the job succeeded.
+
+    The wrapped worker writes into `staging_dir`, a hidden folder inside `output_dir`; when it
+    finishes, every file it produced is renamed into `output_dir` (a rename on the same volume,
+    so readers never see a half-written file) and the folder is removed whatever the outcome.
+    """
+    progress_updated = pyqtSignal(int, int)
+    stats_updated = pyqtSignal(int, float, float)
+    plan_chosen = pyqtSignal(int, str)
+    finished = pyqtSignal(int, str)
+    error = pyqtSignal(int, str)
+    cache_hit = pyqtSignal(int)
+
+    def __init__(self, worker, staging_dir, output_dir, parent=None):
+        super().__init__(parent)
+        self.worker, self.staging_dir, self.output_dir = worker, staging_dir, output_dir
+        self.row, self.engine = worker.row, worker.engine
+        self.extra_outputs = [self.final_path(path) for path in getattr(worker, 'extra_outputs', ())]
+        if hasattr(worker, 'inputs'): self.inputs = worker.inputs
+        worker.setParent(self)
+        direct = Qt.ConnectionType.DirectConnection
+        for name in ('progress_updated', 'stats_updated', 'plan_chosen', 'cache_hit'):
+            if hasattr(worker, name): getattr(worker, name).connect(getattr(self, name), direct)
+        worker.finished.connect(self.on_worker_finished, direct)
+        worker.error.connect(self.error, direct)
+
+    def final_path(self, path):
+        return os.path.join(self.output_dir, os.path.basename(path))
+
+    def run(self):
+        try:
+            os.mkdir(self.staging_dir)
+        except OSError as e:
+            self.error.emit(self.row, f"Cannot write to the output folder: {e}"); return
+        try:
+            self.worker.run()
+        finally:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def on_worker_finished(self, row, output_path):
+        try:
+            with phase("write"):
+                for entry in os.scandir(self.staging_dir):
+                    if entry.is_file(): os.replace(entry.path, self.final_path(entry.path))
+        except OSError as e:
+            self.error.emit(row, f"Could not move the output into place: {e}"); return
+        self.finished.emit(row, self.final_path(output_path))
+
+    def stop(self):
+        self.worker.stop()
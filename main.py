@@ -2,35 +2,44 @@
 
 import sys
 import os
-import re
 import subprocess
 import shutil
-import tempfile
 import json
-from functools import partial
 import shutil
+import sqlite3
+from contextlib import nullcontext
+from functools import partial
 from ui.dependency_checker_ui import Ui_DependencyCheckerDialog 
 
-import rawpy
-import pillow_heif
-import pillow_avif
-from pypdf import PdfWriter
-from pdf2docx import Converter as PdfConverter
-import fitz
 from PyQt6.QtWidgets import (
-    QApplication, QDialog, QMainWindow, QFileDialog, QTableWidgetItem,
-    QComboBox, QProgressBar, QMessageBox, QPushButton, QWidget, QFormLayout,
-    QSpinBox, QSlider, QLabel, QCheckBox, QGroupBox, QInputDialog, QAbstractItemView 
+    QApplication, QDialog, QMainWindow, QFileDialog,
+    QComboBox, QMessageBox, QPushButton, QWidget, QFormLayout,
+    QSpinBox, QDoubleSpinBox, QSlider, QLabel, QCheckBox, QGroupBox, QInputDialog, QAbstractItemView, QMenu,
+    QTableWidgetItem, QHeaderView
 )
-from PyQt6.QtCore import Qt, QThread, QObject, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QPixmap
-import qt_material
 from ui.main_window_ui import Ui_MainWindow
 from ui.preferences_dialog_ui import Ui_PreferencesDialog
 from ui.guide_dialog_ui import Ui_SetupGuideDialog 
-from PIL import Image
-
-pillow_heif.register_heif_opener()
+from ui.watch_folders_dialog_ui import Ui_WatchFoldersDialog
+from ui.batch_summary_dialog_ui import Ui_BatchSummaryDialog
+from ui.file_table import COL_ACTION, COL_FORMAT, COL_OUTPUT, COL_PROGRESS, ButtonDelegate, FileTableModel, FormatDelegate, ProgressDelegate
+from core.backends import require
+from core.formats import FLEXIBLE_CONVERSION_MAP, VIDEO_EXTENSIONS, get_file_category
+from core.scheduler import ENGINE_LABELS, JobScheduler, default_engine_limits, default_max_workers
+from core.workers import GIF_DEFAULTS, GIF_DITHERS, FolderScanWorker
+from core.dispatch import create_fan_out_worker, create_merge_worker, create_worker, default_job_settings, remove_stale_staging
+from core.cache import DEFAULT_MAX_MB as DEFAULT_CACHE_MAX_MB, ConversionCache
+from core.process_host import DEFAULT_RECYCLE_AFTER, configure_process_host, shutdown_process_host
+from core.segmented import DEFAULT_SEGMENTS, configure_segmented_encoding
+from core.progress import REFRESH_MS, ProgressBus
+from core.watch import SOURCE_ACTIONS, HotFolderWatcher, finish_source, normalize_rule
+from core.pdf_docx import DEFAULT_PAGE_CAP as DEFAULT_PDF_PAGE_CAP, DEFAULT_PARALLEL as DEFAULT_PDF_PARALLEL, configure_pdf_to_docx
+from core.libreoffice import DEFAULT_INSTANCES as DEFAULT_LIBREOFFICE_INSTANCES, configure_libreoffice_service, shutdown_libreoffice_service
+from core.tasks import RAW_MODES
+from core.metrics import JobMetrics, configure_metrics, export_records, log_path, summarize
+from core.job_store import JobStore
 
 
 class SetupGuideDialog(QDialog, Ui_SetupGuideDialog):
@@ -128,8 +137,34 @@ class PreferencesDialog(QDialog, Ui_PreferencesDialog):
         self.themeComboBox.addItems(["System Default", "Light", "Dark"])
         self.themeComboBox.setCurrentText(self.settings.get('theme', 'System Default'))
 
+        self.maxJobsSpinBox.setValue(self.settings.get('max_concurrent_jobs') or default_max_workers())
+        self.processPoolCheckBox.setChecked(self.settings.get('out_of_process_workers', True))
+        self.recycleAfterSpinBox.setValue(self.settings.get('worker_recycle_after', DEFAULT_RECYCLE_AFTER))
+        self.processPoolCheckBox.toggled.connect(self.recycleAfterSpinBox.setEnabled)
+        self.recycleAfterSpinBox.setEnabled(self.processPoolCheckBox.isChecked())
+        self.libreOfficeInstancesSpinBox.setValue(self.settings.get('libreoffice_instances', DEFAULT_LIBREOFFICE_INSTANCES))
+        self.videoSegmentsSpinBox.setValue(self.settings.get('video_segments', DEFAULT_SEGMENTS))
+        self.pdfParallelCheckBox.setChecked(self.settings.get('pdf_docx_parallel', DEFAULT_PDF_PARALLEL))
+        self.pdfPageCapSpinBox.setValue(self.settings.get('pdf_docx_page_cap', DEFAULT_PDF_PAGE_CAP))
+        self.cacheEnabledCheckBox.setChecked(self.settings.get('cache_enabled', False))
+        self.cacheSizeSpinBox.setValue(self.settings.get('cache_max_mb', DEFAULT_CACHE_MAX_MB))
+        self.recordMetricsCheckBox.setChecked(self.settings.get('record_metrics', True))
+        self.batchSummaryCheckBox.setChecked(self.settings.get('show_batch_summary', False))
+        self.profileJobsCheckBox.setChecked(self.settings.get('profile_jobs', False))
+        self.clearCacheButton.clicked.connect(self.clear_cache)
+        engine_limits = default_engine_limits(); engine_limits.update(self.settings.get('engine_limits', {}))
+        self.engine_limit_spinboxes = {}
+        for engine, label in ENGINE_LABELS.items():
+            spinbox = QSpinBox(); spinbox.setRange(1, 256); spinbox.setValue(engine_limits[engine])
+            self.concurrencyFormLayout.addRow(f"{label}:", spinbox)
+            self.engine_limit_spinboxes[engine] = spinbox
+
         self.browseButton.clicked.connect(self.browse_for_directory)
 
+    def clear_cache(self):
+        ConversionCache().clear()
+        QMessageBox.information(self, "Cache Cleared", "All cached conversion results have been deleted.")
+
     def browse_for_directory(self):
         dir_path = QFileDialog.getExistingDirectory(self, "Select Default Output Directory")
         if dir_path: self.defaultOutputDirLineEdit.setText(dir_path)
@@ -139,9 +174,137 @@ class PreferencesDialog(QDialog, Ui_PreferencesDialog):
             'default_output_dir': self.defaultOutputDirLineEdit.text(),
             'clear_list_on_complete': self.clearListCheckBox.isChecked(),
             'save_to_source_dir': self.saveToSourceCheckBox.isChecked(),
-            'theme': self.themeComboBox.currentText() # New: Get theme setting
+            'theme': self.themeComboBox.currentText(), # New: Get theme setting
+            'max_concurrent_jobs': self.maxJobsSpinBox.value(),
+            'out_of_process_workers': self.processPoolCheckBox.isChecked(),
+            'worker_recycle_after': self.recycleAfterSpinBox.value(),
+            'libreoffice_instances': self.libreOfficeInstancesSpinBox.value(),
+            'video_segments': self.videoSegmentsSpinBox.value(),
+            'pdf_docx_parallel': self.pdfParallelCheckBox.isChecked(),
+            'pdf_docx_page_cap': self.pdfPageCapSpinBox.value(),
+            'cache_enabled': self.cacheEnabledCheckBox.isChecked(),
+            'cache_max_mb': self.cacheSizeSpinBox.value(),
+            'record_metrics': self.recordMetricsCheckBox.isChecked(),
+            'show_batch_summary': self.batchSummaryCheckBox.isChecked(),
+            'profile_jobs': self.profileJobsCheckBox.isChecked(),
+            'engine_limits': {engine: sb.value() for engine, sb in self.engine_limit_spinboxes.items()}
         }
 # =============================================================================
+# WATCH FOLDERS DIALOG LOGIC
+# =============================================================================
+
+class WatchFoldersDialog(QDialog, Ui_WatchFoldersDialog):
+    SOURCE_ACTION_LABELS = {"keep": "Keep the source file", "move": "Move the source to <folder>/processed", "delete": "Delete the source file"}
+
+    def __init__(self, current_settings, presets, parent=None):
+        super().__init__(parent)
+        self.setupUi(self)
+        self.rules = [dict(rule) for rule in current_settings.get('watch_rules', [])]
+        self.loading = False
+
+        self.targetComboBox.addItems(sorted({f for by_cat in FLEXIBLE_CONVERSION_MAP.values() for fmts in by_cat.values() for f in fmts}))
+        self.presetComboBox.addItem("(none)", "")
+        for name in sorted({name for category in presets.values() for name in category}): self.presetComboBox.addItem(name, name)
+        for action in SOURCE_ACTIONS: self.sourceActionComboBox.addItem(self.SOURCE_ACTION_LABELS[action], action)
+        self.watchEnabledCheckBox.setChecked(current_settings.get('watch_enabled', False))
+        for rule in self.rules: self.rulesListWidget.addItem(self.describe(rule))
+
+        self.rulesListWidget.currentRowChanged.connect(self.load_rule)
+        self.addRuleButton.clicked.connect(self.add_rule)
+        self.removeRuleButton.clicked.connect(self.remove_rule)
+        self.browseOutputButton.clicked.connect(self.browse_for_output)
+        self.folderLineEdit.textEdited.connect(self.store_rule); self.outputDirLineEdit.textEdited.connect(self.store_rule)
+        for combo in (self.targetComboBox, self.presetComboBox, self.sourceActionComboBox): combo.currentIndexChanged.connect(self.store_rule)
+        self.rulesListWidget.setCurrentRow(0 if self.rules else -1)
+        self.load_rule(self.rulesListWidget.currentRow())
+
+    def describe(self, rule):
+        preset = f" with '{rule['preset']}'" if rule.get('preset') else ""
+        return f"{rule['folder']}  \u2192  .{rule['target']}{preset}, {rule.get('source_action', 'keep')} sources"
+
+    def load_rule(self, row):
+        self.ruleGroupBox.setEnabled(row >= 0); self.removeRuleButton.setEnabled(row >= 0)
+        if row < 0: return
+        rule, self.loading = self.rules[row], True
+        self.folderLineEdit.setText(rule['folder'])
+        self.targetComboBox.setCurrentText(rule['target'])
+        self.presetComboBox.setCurrentIndex(max(0, self.presetComboBox.findData(rule.get('preset', ""))))
+        self.outputDirLineEdit.setText(rule.get('output_dir', ""))
+        self.sourceActionComboBox.setCurrentIndex(max(0, self.sourceActionComboBox.findData(rule.get('source_action', "keep"))))
+        self.loading = False
+
+    def store_rule(self, *_):
+        row = self.rulesListWidget.currentRow()
+        if self.loading or row < 0: return
+        self.rules[row].update(folder=self.folderLineEdit.text(), target=self.targetComboBox.currentText(), preset=self.presetComboBox.currentData(),
+                               output_dir=self.outputDirLineEdit.text(), source_action=self.sourceActionComboBox.currentData())
+        self.rulesListWidget.item(row).setText(self.describe(self.rules[row]))
+
+    def add_rule(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder to Watch")
+        if not folder: return
+        self.rules.append({'folder': folder, 'target': self.targetComboBox.currentText(), 'preset': "", 'output_dir': "", 'source_action': "move"})
+        self.rulesListWidget.addItem(self.describe(self.rules[-1]))
+        self.rulesListWidget.setCurrentRow(len(self.rules) - 1)
+
+    def remove_rule(self):
+        row = self.rulesListWidget.currentRow()
+        if row < 0: return
+        del self.rules[row]; self.rulesListWidget.takeItem(row)
+
+    def browse_for_output(self):
+        dir_path = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+        if dir_path: self.outputDirLineEdit.setText(dir_path); self.store_rule()
+
+    def get_settings(self):
+        return {'watch_rules': [rule for rule in self.rules if rule['folder']], 'watch_enabled': self.watchEnabledCheckBox.isChecked()}
+
+# =============================================================================
+# BATCH SUMMARY DIALOG LOGIC
+# =============================================================================
+
+class BatchSummaryDialog(QDialog, Ui_BatchSummaryDialog):
+    """Aggregate throughput and the slowest jobs of a finished batch, from its core.metrics records."""
+    COLUMNS = ["File", "Engine", "Status", "Run", "Queue", "Probe", "Encode", "Write", "CPU", "Peak RSS", "In", "Out"]
+
+    def __init__(self, records, elapsed, parent=None):
+        super().__init__(parent)
+        self.setupUi(self)
+        self.records = records
+        summary = summarize(records, elapsed)
+        failed = f", {summary['failed']} failed" if summary['failed'] else ""
+        engines = ", ".join(f"{engine or 'other'} {count} job{'s' if count != 1 else ''} in {run:.1f}s ({cpu:.1f}s CPU)"
+                            for engine, (count, run, cpu) in sorted(summary['engines'].items(), key=lambda e: -e[1][1]))
+        self.summaryLabel.setText(
+            f"{summary['jobs']} jobs ({summary['completed']} completed{failed}) in {summary['elapsed_s']:.1f}s: "
+            f"{summary['files_per_min']:.1f} files/min, {summary['input_mb_s']:.1f} MB/s read, {summary['output_mb_s']:.1f} MB/s written, "
+            f"{summary['cpu_s']:.1f}s of CPU time.\nBy engine: {engines}.")
+
+        self.slowestTableWidget.setColumnCount(len(self.COLUMNS)); self.slowestTableWidget.setHorizontalHeaderLabels(self.COLUMNS)
+        self.slowestTableWidget.setRowCount(len(summary['slowest']))
+        for row, record in enumerate(summary['slowest']):
+            name = os.path.basename(record['inputs'][0]) if len(record['inputs']) == 1 else f"{len(record['inputs'])} files (merge)"
+            values = [name, record['engine'] or "", record['status']] + [f"{record[key]:.2f}s" for key in ('run_s', 'queue_s', 'probe_s', 'encode_s', 'write_s', 'cpu_s')]
+            values += [f"{record['peak_rss_mb']:.0f} MB", f"{record['input_bytes'] / 1e6:.1f} MB", f"{record['output_bytes'] / 1e6:.1f} MB"]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column >= 3: item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if column == 0: item.setToolTip("\n".join(record['inputs']) + (f"\n{record['plan']}" if record.get('plan') else ""))
+                self.slowestTableWidget.setItem(row, column, item)
+        self.slowestTableWidget.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column in range(1, len(self.COLUMNS)): self.slowestTableWidget.resizeColumnToContents(column)
+
+        self.exportButton.clicked.connect(self.export)
+        self.openLogButton.setEnabled(bool(log_path()) and os.path.exists(log_path()))
+        self.openLogButton.clicked.connect(lambda: parent.open_file_location(log_path()))
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Batch Metrics", "batch-metrics.csv", "CSV Files (*.csv);;JSON Lines (*.jsonl)")
+        if not path: return
+        try: export_records(self.records, path)
+        except OSError as e: QMessageBox.warning(self, "Error", f"Could not export the metrics:\n{e}")
+
+# =============================================================================
 # SETTINGS PANELS
 # =============================================================================
 
@@ -168,14 +331,20 @@ class ImageSettingsPanel(BaseSettingsPanel):
         self.quality_label = QLabel()
         self.resize_combo = QComboBox()
         self.resize_combo.addItems(["None", "25%", "50%", "75%", "1920px (Full HD)", "1280px (HD)"])
+        self.raw_mode_combo = QComboBox()
+        self.raw_mode_combo.addItems(RAW_MODES)
+        self.raw_mode_combo.setToolTip("How camera RAW files are developed. Auto uses the embedded preview or a half-size\n"
+                                       "development when the resized output is small enough, and the full demosaic otherwise.")
 
         self.layout().addRow("JPEG/WEBP Quality:", self.quality_slider)
         self.layout().addRow("", self.quality_label)
         self.layout().addRow("Resize:", self.resize_combo)
+        self.layout().addRow("RAW Development:", self.raw_mode_combo)
 
         self.quality_slider.valueChanged.connect(lambda v: self.quality_label.setText(str(v)))
         self.quality_slider.valueChanged.connect(self.on_change)
         self.resize_combo.currentIndexChanged.connect(self.on_change)
+        self.raw_mode_combo.currentIndexChanged.connect(self.on_change)
 
     def on_change(self, _):
         self.settings_changed.emit(self.get_settings())
@@ -183,9 +352,10 @@ class ImageSettingsPanel(BaseSettingsPanel):
     def load_settings(self, settings):
         self.quality_slider.setValue(settings.get('quality', 95))
         self.resize_combo.setCurrentText(settings.get('resize', "None"))
+        self.raw_mode_combo.setCurrentText(settings.get('raw_mode', "Auto"))
 
     def get_settings(self):
-        return {'quality': self.quality_slider.value(), 'resize': self.resize_combo.currentText()}
+        return {'quality': self.quality_slider.value(), 'resize': self.resize_combo.currentText(), 'raw_mode': self.raw_mode_combo.currentText()}
 
 class VideoSettingsPanel(BaseSettingsPanel):
     def __init__(self, parent=None):
@@ -200,9 +370,30 @@ class VideoSettingsPanel(BaseSettingsPanel):
         self.layout().addRow("Resize:", self.resize_combo)
         self.layout().addRow(self.remove_audio_checkbox)
 
+        # --- GIF output ---
+        self.gif_fps_spin = QSpinBox(); self.gif_fps_spin.setRange(1, 50); self.gif_fps_spin.setSuffix(" fps")
+        self.gif_width_spin = QSpinBox(); self.gif_width_spin.setRange(0, 3840); self.gif_width_spin.setSingleStep(40)
+        self.gif_width_spin.setSpecialValueText("Original"); self.gif_width_spin.setSuffix(" px")
+        self.gif_dither_combo = QComboBox(); self.gif_dither_combo.addItems(GIF_DITHERS)
+        self.gif_start_spin = QDoubleSpinBox(); self.gif_start_spin.setRange(0, 86400); self.gif_start_spin.setSuffix(" s")
+        self.gif_duration_spin = QDoubleSpinBox(); self.gif_duration_spin.setRange(0, 86400); self.gif_duration_spin.setSuffix(" s")
+        self.gif_duration_spin.setSpecialValueText("Whole clip")
+        self.gif_two_pass_checkbox = QCheckBox("Two-pass palette (slower, lower memory)")
+
+        self.layout().addRow(QLabel("<b>GIF</b>"))
+        self.layout().addRow("Frame Rate:", self.gif_fps_spin)
+        self.layout().addRow("Width:", self.gif_width_spin)
+        self.layout().addRow("Dither:", self.gif_dither_combo)
+        self.layout().addRow("Start At:", self.gif_start_spin)
+        self.layout().addRow("Duration:", self.gif_duration_spin)
+        self.layout().addRow(self.gif_two_pass_checkbox)
+
         self.bitrate_combo.currentIndexChanged.connect(self.on_change)
         self.resize_combo.currentIndexChanged.connect(self.on_change)
         self.remove_audio_checkbox.stateChanged.connect(self.on_change)
+        for spin in (self.gif_fps_spin, self.gif_width_spin, self.gif_start_spin, self.gif_duration_spin): spin.valueChanged.connect(self.on_change)
+        self.gif_dither_combo.currentIndexChanged.connect(self.on_change)
+        self.gif_two_pass_checkbox.stateChanged.connect(self.on_change)
 
     def on_change(self, _):
         self.settings_changed.emit(self.get_settings())
@@ -211,12 +402,23 @@ class VideoSettingsPanel(BaseSettingsPanel):
         self.bitrate_combo.setCurrentText(settings.get('video_bitrate', "Default"))
         self.resize_combo.setCurrentText(settings.get('resize', "None"))
         self.remove_audio_checkbox.setChecked(settings.get('remove_audio', False))
+        gif = {**GIF_DEFAULTS, **settings}
+        self.gif_fps_spin.setValue(gif['gif_fps']); self.gif_width_spin.setValue(gif['gif_width'])
+        self.gif_dither_combo.setCurrentText(gif['gif_dither'])
+        self.gif_start_spin.setValue(gif['gif_start']); self.gif_duration_spin.setValue(gif['gif_duration'])
+        self.gif_two_pass_checkbox.setChecked(gif['gif_two_pass'])
 
     def get_settings(self):
         return {
             'video_bitrate': self.bitrate_combo.currentText(),
             'resize': self.resize_combo.currentText(),
-            'remove_audio': self.remove_audio_checkbox.isChecked()
+            'remove_audio': self.remove_audio_checkbox.isChecked(),
+            'gif_fps': self.gif_fps_spin.value(),
+            'gif_width': self.gif_width_spin.value(),
+            'gif_dither': self.gif_dither_combo.currentText(),
+            'gif_start': self.gif_start_spin.value(),
+            'gif_duration': self.gif_duration_spin.value(),
+            'gif_two_pass': self.gif_two_pass_checkbox.isChecked()
         }
         
 class AudioSettingsPanel(BaseSettingsPanel):
@@ -237,347 +439,6 @@ class AudioSettingsPanel(BaseSettingsPanel):
         return {'audio_bitrate': self.bitrate_combo.currentText()}
 
 # =============================================================================
-# CONFIGURATION AND WORKER CLASSES
-# =============================================================================
-
-
-RAW_EXTENSIONS = {".3fr",".arw",".cr2",".cr3",".crw",".dcr",".dng",".erf",".mos",".mrw",".orf",".pef",".raf",".raw",".rw2",".x3f"}
-VIDEO_EXTENSIONS = {".mp4", ".mov", ".avi", ".mkv", ".webm", ".flv", ".wmv"}
-AUDIO_EXTENSIONS = {".mp3", ".wav", ".ogg", ".flac", ".aac", ".wma", ".m4a"}
-VIDEO_TARGETS = ["mp4", "avi", "mkv", "mov"]
-FLEXIBLE_CONVERSION_MAP = {
-    ".7z": {"archive": ["zip", "tar"]}, ".zip": {"archive": ["7z", "tar"]}, ".rar": {"archive": ["7z", "zip", "tar"]}, ".iso": {"archive": ["7z", "zip", "tar"]}, ".dmg": {"archive": ["7z", "zip", "tar"]}, ".cab": {"archive": ["7z", "zip", "tar"]}, ".gz": {"archive": ["7z", "zip", "tar"]}, ".bz2": {"archive": ["7z", "zip", "tar"]}, ".tar": {"archive": ["7z", "zip"]}, ".jar": {"archive": ["7z", "zip", "tar"]}, ".deb": {"archive": ["7z", "zip", "tar"]}, ".ace": {"archive": ["7z", "zip", "tar"]}, ".alz": {"archive": ["7z", "zip", "tar"]}, ".arc": {"archive": ["7z", "zip", "tar"]}, ".arj": {"archive": ["7z", "zip", "tar"]}, ".cpio": {"archive": ["7z", "zip", "tar"]}, ".img": {"archive": ["7z", "zip", "tar"]}, ".lha": {"archive": ["7z", "zip", "tar"]}, ".lz": {"archive": ["7z", "zip", "tar"]}, ".lzma": {"archive": ["7z", "zip", "tar"]},
-    
-    
-    **{ext: {"video": [target for target in VIDEO_TARGETS if f".{target}" != ext], "audio": ["mp3", "wav"], "image": ["png", "jpg", "gif"]} for ext in VIDEO_EXTENSIONS},
-    
-    **{ext: {"audio": ["wav", "ogg", "flac"] if ext!=".wav" else ["mp3","ogg","flac"]} for ext in AUDIO_EXTENSIONS},
-    ".png": {"image": ["jpg", "webp", "bmp", "tiff"]}, ".jpg": {"image": ["png", "webp", "bmp", "tiff"]}, ".jpeg": {"image": ["png", "webp", "bmp", "tiff"]}, ".webp": {"image": ["png", "jpg", "bmp", "tiff"]}, ".bmp": {"image": ["png", "jpg", "webp", "tiff"]}, ".tiff": {"image": ["png", "jpg", "webp", "bmp"]}, ".tif": {"image": ["png", "jpg", "webp", "bmp"]}, ".heic": {"image": ["png", "jpg", "webp", "tiff"]}, ".heif": {"image": ["png", "jpg", "webp", "tiff"]}, ".avif": {"image": ["png", "jpg", "webp", "tiff"]}, ".gif": {"image": ["png", "webp"]}, ".ico": {"image": ["png"]}, ".icns": {"image": ["png", "ico"]}, ".psd": {"image": ["png", "jpg", "tiff"]}, ".xcf": {"image": ["png", "jpg", "tiff"]}, ".eps": {"image": ["png", "jpg"]}, ".ps": {"image": ["png", "jpg"]}, ".ppm": {"image": ["png", "jpg"]}, ".jfif": {"image": ["png", "jpg"]},
-    ".docx": {"document": ["pdf", "odt", "txt"]}, ".doc": {"document": ["pdf", "odt", "txt"]},
-    ".pdf": {"document": ["docx", "txt"]},
-    ".odt": {"document": ["pdf", "docx"]}, ".rtf": {"document": ["pdf", "docx"]}, ".txt": {"document": ["pdf", "docx"]}, ".pub": {"document": ["pdf", "docx"]}, ".xps": {"document": ["pdf", "docx"]},
-    ".pptx": {"presentation": ["pdf", "odp"]}, ".ppt": {"presentation": ["pdf", "odp"]}, ".odp": {"presentation": ["pdf", "pptx"]},
-    ".xlsx": {"spreadsheet": ["pdf", "ods", "csv", "xml", "fods"]}, ".xls": {"spreadsheet": ["pdf", "ods", "csv", "xml", "fods"]}, ".ods": {"spreadsheet": ["pdf", "xlsx", "csv", "xml", "fods"]},
-}
-for ext in RAW_EXTENSIONS: FLEXIBLE_CONVERSION_MAP[ext] = {"image": ["png", "jpg", "tiff"]}
-def get_file_category(file_ext):
-    if file_ext in FLEXIBLE_CONVERSION_MAP: return next(iter(FLEXIBLE_CONVERSION_MAP[file_ext]))
-    return "unknown"
-
-
-
-class FFmpegWorker(QObject):
-    progress_updated=pyqtSignal(int,int); finished=pyqtSignal(int,str); error=pyqtSignal(int,str)
-    def __init__(self,r,i,o,m,s,p=None): super().__init__(p); self.row,self.i,self.o,self.mode,self.settings,self.process=r,i,o,m,s,None
-    def run(self):
-        is_vid = get_file_category(os.path.splitext(self.i)[1].lower()) == "video"
-        
-      
-        if self.mode == "video_to_audio":
-            cmd = ['ffmpeg', '-i', self.i, '-vn', '-y', self.o]
-        elif self.mode == "video_to_image":
-            cmd = ['ffmpeg', '-i', self.i, '-ss', '00:00:05', '-vframes', '1', '-y', self.o]
-        elif self.mode == "default":
-            output_ext = os.path.splitext(self.o)[1].lower()
-            
-          
-            if is_vid and output_ext == ".mp4":
-                cmd = [
-                    'ffmpeg', '-i', self.i,
-                    '-c:v', 'libx264',   # Re-encode video to H.264 (universal)
-                    '-c:a', 'aac',       # Re-encode audio to AAC (universal)
-                    '-pix_fmt', 'yuv420p',# Set a standard pixel format for compatibility
-                    '-y', self.o
-                ]
-            else:
-              
-                cmd = ['ffmpeg', '-i', self.i, '-y', self.o]
-        else:
-             self.error.emit(self.row, "Invalid conversion mode specified.")
-             return
-
-        
-        if self.settings and ('-c:v' in cmd or self.mode == 'default'):
-            if (br:=self.settings.get('video_bitrate',"Default"))!="Default": cmd.extend(['-b:v',br])
-            if (abr:=self.settings.get('audio_bitrate',"Default"))!="Default": cmd.extend(['-b:a',abr])
-            if self.settings.get('remove_audio',False): cmd.extend(['-an'])
-            if (rs:=self.settings.get('resize',"None"))!="None":
-                h={'1080p':1080,'720p':720,'480p':480}.get(rs.split()[0],None)
-                if h: cmd.extend(['-vf',f'scale=-2:{h}'])
-
-        try:
-            self.process=subprocess.Popen(cmd,stdout=subprocess.PIPE,stderr=subprocess.STDOUT,universal_newlines=True,encoding='utf-8',creationflags=subprocess.CREATE_NO_WINDOW if sys.platform=='win32' else 0)
-            dur=self.get_video_duration() if is_vid else 0
-            for line in self.process.stdout:
-                if is_vid and dur>0 and (m:=re.search(r"time=(\d{2}):(\d{2}):(\d{2})\.\d{2}",line)):
-                    h,m,s=map(int,m.groups()); cur=h*3600+m*60+s; self.progress_updated.emit(self.row,min(100,int((cur/dur)*100)))
-            self.process.wait()
-            if self.process.returncode==0:self.progress_updated.emit(self.row,100);self.finished.emit(self.row,self.o)
-            else:self.error.emit(self.row,f"FFmpeg error (code {self.process.returncode})")
-        except Exception as e: self.error.emit(self.row,str(e))
-        
-    def get_video_duration(self):
-        try:
-            return float(subprocess.run(['ffprobe','-v','error','-show_entries','format=duration','-of','default=noprint_wrappers=1:nokey=1',self.i],capture_output=True,text=True,check=True).stdout.strip())
-        except: 
-            return None
-            
-    def stop(self):
-        if self.process and self.process.poll()is None: self.process.terminate();self.process.wait()
-
-class ImageWorker(QObject):
-    finished=pyqtSignal(int,str); error=pyqtSignal(int,str)
-    def __init__(self,r,i,o,s,p=None): super().__init__(p); self.row,self.i,self.o,self.settings=r,i,o,s
-    def run(self):
-        try:
-            with Image.open(self.i) as img:
-                if self.o.lower().endswith(('.jpg','.jpeg','.bmp')) and img.mode in ('RGBA','LA','P'): img=img.convert('RGB')
-                if self.settings and (rs:=self.settings.get('resize',"None"))!="None":
-                    w,h=img.size
-                    if '%' in rs: s=int(rs.strip('%'))/100; nw,nh=int(w*s),int(h*s)
-                    else: p=int(rs.split('px')[0]); nw,nh=(p,int(h*p/w)) if w>h else (int(w*p/h),p)
-                    img=img.resize((nw,nh),Image.Resampling.LANCZOS)
-                save_opts={'quality':self.settings.get('quality',95)} if self.settings else {}
-                img.save(self.o,**save_opts)
-            self.finished.emit(self.row,self.o)
-        except Exception as e: self.error.emit(self.row,str(e))
-    def stop(self): pass
-
-class MergeWorker(QObject):
-    progress_updated = pyqtSignal(int, int); finished = pyqtSignal(int, str); error = pyqtSignal(int, str)
-    def __init__(self, row, inputs, output, cat, p=None):
-        super().__init__(p); self.row, self.inputs, self.output, self.category, self.process = row, inputs, output, cat, None
-    def run(self):
-        try:
-            if self.category == "document": # PDF
-                merger = PdfWriter()
-                for i, pdf_path in enumerate(self.inputs):
-                    merger.append(pdf_path)
-                    self.progress_updated.emit(self.row, int((i + 1) / len(self.inputs) * 100))
-                merger.write(self.output); merger.close()
-                self.finished.emit(self.row, self.output)
-            elif self.category == "video":
-                with tempfile.NamedTemporaryFile('w', delete=False, suffix='.txt', encoding='utf-8') as f:
-                    for path in self.inputs: f.write(f"file '{os.path.normpath(path)}'\n")
-                    list_file = f.name
-                cmd = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', list_file, '-c', 'copy', '-y', self.output]
-                self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, encoding='utf-8', creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0)
-                self.process.wait()
-                os.remove(list_file)
-                if self.process.returncode == 0:
-                    self.progress_updated.emit(self.row, 100); self.finished.emit(self.row, self.output)
-                else:
-                    self.error.emit(self.row, f"FFmpeg merge error (code {self.process.returncode})")
-        except Exception as e: self.error.emit(self.row, f"Merge failed: {str(e)}")
-    def stop(self):
-        if self.process and self.process.poll() is None:
-            self.process.terminate(); self.process.wait()
-class PdfToDocxWorker(QObject):
-    """A specialized worker to convert PDF to DOCX using the pdf2docx library."""
-    finished = pyqtSignal(int, str)
-    error = pyqtSignal(int, str)
-
-    def __init__(self, row, input_path, output_path, parent=None):
-        super().__init__(parent)
-        self.row, self.input_path, self.output_path = row, input_path, output_path
-
-    def run(self):
-        try:
-            cv = PdfConverter(self.input_path)
-            cv.convert(self.output_path, start=0, end=None)
-            cv.close()
-            self.finished.emit(self.row, self.output_path)
-        except Exception as e:
-            self.error.emit(self.row, f"PDF to DOCX conversion failed: {str(e)}")
-
-    def stop(self):
-        pass
-
-class PdfToTextWorker(QObject):
-    """A specialized worker to extract text from a PDF using PyMuPDF."""
-    finished = pyqtSignal(int, str)
-    error = pyqtSignal(int, str)
-
-    def __init__(self, row, input_path, output_path, parent=None):
-        super().__init__(parent)
-        self.row, self.input_path, self.output_path = row, input_path, output_path
-
-    def run(self):
-        try:
-            full_text = ""
-            with fitz.open(self.input_path) as doc:
-                for page in doc:
-                    full_text += page.get_text()
-            
-            with open(self.output_path, 'w', encoding='utf-8') as f:
-                f.write(full_text)
-                
-            self.finished.emit(self.row, self.output_path)
-        except Exception as e:
-            self.error.emit(self.row, f"PDF to TXT conversion failed: {str(e)}")
-
-    def stop(self):
-        pass
-
-class RawImageWorker(QObject):
-    finished=pyqtSignal(int,str);error=pyqtSignal(int,str)
-    def __init__(self,r,i,o,s,p=None):super().__init__(p);self.row,self.i,self.o,self.s=r,i,o,s
-    def run(self):
-        try:
-            with rawpy.imread(self.i) as raw:rgb=raw.postprocess()
-            with Image.fromarray(rgb) as img:img.save(self.o)
-            self.finished.emit(self.row,self.o)
-        except Exception as e:self.error.emit(self.row,str(e))
-    def stop(self):pass
-
-
-class LibreOfficeWorker(QObject):
-    finished=pyqtSignal(int,str)
-    error=pyqtSignal(int,str)
-    
-    def __init__(self,r,i,o,o_dir,p=None):
-        super().__init__(p)
-        self.row, self.input_path, self.output_path, self.output_dir = r, i, o, o_dir
-
-    def run(self):
-        # The wrapper script solution with a crucial encoding fix.
-        batch_file_path = os.path.join(tempfile.gettempdir(), 'run_soffice.bat')
-
-        try:
-            soffice_path = shutil.which('soffice')
-            if not soffice_path:
-                raise FileNotFoundError("soffice.exe not found in system PATH.")
-
-            command_args = [
-                f'"{soffice_path}"',
-                '--headless',
-                '--convert-to', os.path.splitext(self.output_path)[1][1:],
-                '--outdir', f'"{self.output_dir}"',
-                f'"{self.input_path}"'
-            ]
-            
-       
-            with open(batch_file_path, 'w', encoding='utf-8') as f:
-                f.write('@echo off\n')
-                f.write('chcp 65001 > nul\n') 
-                f.write(' '.join(command_args))
-
-
-            proc = subprocess.run(
-                [batch_file_path],
-                capture_output=True,
-                text=True,
-                timeout=60,
-                creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
-            )
-
-            # Check the results
-            if proc.returncode == 0 and any(f.lower() == os.path.basename(self.output_path).lower() for f in os.listdir(self.output_dir)):
-                self.finished.emit(self.row, self.output_path)
-            else:
-                stderr_log = f"--- STDERR ---\n{proc.stderr}\n" if proc.stderr else "No error output."
-                stdout_log = f"--- STDOUT ---\n{proc.stdout}\n" if proc.stdout else ""
-                error_message = f"LibreOffice process failed via wrapper (Code: {proc.returncode}).\n{stderr_log}{stdout_log}"
-                self.error.emit(self.row, error_message)
-
-        except FileNotFoundError:
-            self.error.emit(self.row, "LibreOffice (soffice.exe) not found. Please use Help > Dependency Checker to verify it is in the system's PATH.")
-        except subprocess.TimeoutExpired:
-            self.error.emit(self.row, "LibreOffice took too long to respond and was terminated.")
-        except Exception as e:
-            self.error.emit(self.row, f"An unexpected error occurred while running the wrapper script: {str(e)}")
-        finally:
-            if os.path.exists(batch_file_path):
-                os.remove(batch_file_path)
-
-    def stop(self):
-        pass
-class SevenZipWorker(QObject):
-    finished=pyqtSignal(int,str);error=pyqtSignal(int,str)
-    def __init__(self,r,i,o,p=None):super().__init__(p);self.row,self.i,self.o=r,i,o
-    def run(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            try:
-                subprocess.run(['7z','x',self.i,f'-o{temp_dir}','-y'],capture_output=True,text=True,check=True,creationflags=subprocess.CREATE_NO_WINDOW if sys.platform=='win32' else 0)
-                proc=subprocess.run(['7z','a',self.o,os.path.join(temp_dir,'*'),'-y'],capture_output=True,text=True,check=True,creationflags=subprocess.CREATE_NO_WINDOW if sys.platform=='win32' else 0)
-                self.finished.emit(self.row,self.o)
-            except Exception as e:self.error.emit(self.row,str(e))
-    def stop(self):pass
-class PlaceholderWorker(QObject):
-    error=pyqtSignal(int,str)
-    def __init__(self,r,c,p=None):super().__init__(p);self.row,self.category=r,c
-    def run(self):self.error.emit(self.row,f"Conversion for '{self.category}' is not implemented.")
-class FFmpegGifWorker(QObject):
-    """A specialized worker for high-quality GIF conversion using a two-pass method."""
-    progress_updated = pyqtSignal(int, int)
-    finished = pyqtSignal(int, str)
-    error = pyqtSignal(int, str)
-
-    def __init__(self, row, input_path, output_path, settings, parent=None):
-        super().__init__(parent)
-        self.row, self.input_path, self.output_path, self.settings = row, input_path, output_path, settings
-        self.process = None
-
-    def run(self):
-      
-        fps = 15
-        scale_width = 480
-        palette_path = os.path.join(tempfile.gettempdir(), f"palette_{os.path.basename(self.input_path)}.png")
-
-        try:
-            # --- PASS 1: Generate Palette ---
-            self.progress_updated.emit(self.row, 5) # Small initial progress
-            palette_cmd = [
-                'ffmpeg', '-i', self.input_path,
-                '-vf', f'fps={fps},scale={scale_width}:-1:flags=lanczos,palettegen',
-                '-y', palette_path
-            ]
-            # Use subprocess.run for this short, blocking operation
-            subprocess.run(palette_cmd, capture_output=True, text=True, check=True, creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0)
-
-            # --- PASS 2: Create GIF using Palette ---
-            self.progress_updated.emit(self.row, 50) # Halfway point
-            gif_cmd = [
-                'ffmpeg', '-i', self.input_path, '-i', palette_path,
-                '-lavfi', f'fps={fps},scale={scale_width}:-1:flags=lanczos[x];[x][1:v]paletteuse',
-                '-y', self.output_path
-            ]
-            
-            self.process = subprocess.Popen(gif_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, encoding='utf-8', creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0)
-            
-            duration = self.get_video_duration()
-            for line in self.process.stdout:
-                if duration and (match := re.search(r"time=(\d{2}):(\d{2}):(\d{2})\.\d{2}", line)):
-                    h, m, s = map(int, match.groups())
-                    current_time = h * 3600 + m * 60 + s
-                    # Scale progress from 50 to 100 for the second pass
-                    percentage = 50 + int((current_time / duration) * 50)
-                    self.progress_updated.emit(self.row, min(100, percentage))
-
-            self.process.wait()
-            if self.process.returncode == 0:
-                self.progress_updated.emit(self.row, 100)
-                self.finished.emit(self.row, self.output_path)
-            else:
-                self.error.emit(self.row, f"FFmpeg GIF creation error (code {self.process.returncode})")
-
-        except Exception as e:
-            self.error.emit(self.row, str(e))
-        finally:
-            if os.path.exists(palette_path):
-                os.remove(palette_path)
-
-    def get_video_duration(self):
-        try:
-            return float(subprocess.run(['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', self.input_path], capture_output=True, text=True, check=True).stdout.strip())
-        except:
-            return None
-
-    def stop(self):
-        if self.process and self.process.poll() is None:
-            self.process.terminate()
-            self.process.wait()
-# =============================================================================
 # MAIN APPLICATION WINDOW
 # =============================================================================
 
@@ -589,12 +450,31 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         self.setup_table()
         
         self.running_threads = {}
+        self.cached_rows = set()
+        self.scanners = {}  # FolderScanWorker -> QThread
+        self.scan_added = 0
+        # Workers report into the bus from their own threads; the timer repaints changed rows at 10 Hz
+        self.progress_bus = ProgressBus()
+        self.progress_timer = QTimer(self); self.progress_timer.setInterval(REFRESH_MS)
+        self.progress_timer.timeout.connect(self.refresh_progress)
+        self.hot_folders = HotFolderWatcher(self)
+        self.hot_folders.file_ready.connect(self.on_watched_file)
+        self.watch_jobs = {}  # row -> (source path, rule) of jobs started by a watched folder
+        self.job_metrics = {}  # row -> JobMetrics of queued and running jobs
+        self.batch_records, self.batch_from_user = [], False
+        self.last_batch = None  # (records, elapsed seconds) for File > Batch Summary
+        # Jobs the user queued are kept in a SQLite store so a batch cut short by a crash can be resumed.
+        try: self.job_store = JobStore()
+        except (sqlite3.Error, OSError): self.job_store = None
+        self.store_ids = {}  # row -> job store id
         
         self.settings_file = 'settings.json'
         self.settings = {}
         self.presets = {}
         self.load_settings()
         self.output_directory = self.settings.get('default_output_dir', None)
+        self.scheduler = JobScheduler(self.launch_worker, self.settings.get('max_concurrent_jobs'), self.settings.get('engine_limits'))
+        self.apply_engine_settings()
         
         
         self.apply_theme(self.settings.get('theme', 'System Default'))
@@ -603,9 +483,11 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         self.connect_signals()
         self.setAcceptDrops(True)
         self.update_settings_panel()
+        self.apply_watch_settings()
         
         if self.settings.get('show_setup_guide_on_launch', True):
             self.show_setup_guide(is_launch=True)
+        QTimer.singleShot(0, self.offer_resume)
 
 
     def show_setup_guide(self, is_launch=False):
@@ -673,30 +555,92 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
             self.settings.update(new_settings)
             self.save_settings()
             self.output_directory = self.settings.get('default_output_dir', None)
+            self.scheduler.set_limits(self.settings.get('max_concurrent_jobs'), self.settings.get('engine_limits'))
+            self.scheduler.dispatch()
+            self.apply_engine_settings()
 
             #
             new_theme = self.settings.get('theme')
             if new_theme != old_theme:
                 self.apply_theme(new_theme)
 
+    def apply_engine_settings(self):
+        configure_process_host(self.settings.get('out_of_process_workers', True), self.settings.get('worker_recycle_after', DEFAULT_RECYCLE_AFTER))
+        configure_libreoffice_service(self.settings.get('libreoffice_instances', DEFAULT_LIBREOFFICE_INSTANCES))
+        configure_segmented_encoding(self.settings.get('video_segments', DEFAULT_SEGMENTS))
+        configure_pdf_to_docx(self.settings.get('pdf_docx_parallel', DEFAULT_PDF_PARALLEL), self.settings.get('pdf_docx_page_cap', DEFAULT_PDF_PAGE_CAP))
+        self.cache = ConversionCache(max_mb=self.settings.get('cache_max_mb', DEFAULT_CACHE_MAX_MB)) if self.settings.get('cache_enabled', False) else None
+        configure_metrics(self.settings.get('record_metrics', True), self.settings.get('profile_jobs', False))
+
+    def open_watch_folders_dialog(self):
+        dialog = WatchFoldersDialog(self.settings, self.presets, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.settings.update(dialog.get_settings())
+            self.save_settings()
+            self.apply_watch_settings()
+
+    def apply_watch_settings(self):
+        rules = [normalize_rule(rule) for rule in self.settings.get('watch_rules', [])]
+        if not (self.settings.get('watch_enabled', False) and rules):
+            self.hot_folders.stop(); self.watchLabel.clear(); return
+        missing = self.hot_folders.start(rules)
+        if missing: QMessageBox.warning(self, "Watch Folders", "These folders could not be watched:\n" + "\n".join(missing))
+        watched = len(self.hot_folders.rules)
+        self.watchLabel.setText(f"Watching {watched} folder{'s' if watched != 1 else ''}" if watched else "")
+
+    def on_watched_file(self, path, rule):
+        """Queues a settled file from a watched folder like any other row, with the rule's target, preset and output folder."""
+        category = get_file_category(os.path.splitext(path)[1].lower())
+        settings = default_job_settings(); settings.update(self.presets.get(category, {}).get(rule['preset'], {}))
+        if not self.file_model.add_files([path], settings): return # already in the list
+        row = self.file_model.rowCount() - 1
+        if not self.file_model.set_target(row, rule['target']): return
+        try: os.makedirs(rule['output_dir'], exist_ok=True)
+        except OSError as e:
+            self.update_status(row, "Failed", "red"); self.statusBar().showMessage(f"Watch folder: {e}", 10000); return
+        self.watch_jobs[row] = (path, rule)
+        o_cat, t_fmt = self.file_model.job(row).target_data
+        self.queue_worker(row, create_worker(row, path, o_cat, t_fmt, rule['output_dir'], settings, self.cache))
+
     def apply_theme(self, theme_name):
         """Applies the selected UI theme."""
         if theme_name == "Dark":
-            qt_material.apply_stylesheet(self.app, theme='dark_teal.xml')
+            require("qt_material").apply_stylesheet(self.app, theme='dark_teal.xml')
         elif theme_name == "Light":
-            qt_material.apply_stylesheet(self.app, theme='light_blue.xml')
+            require("qt_material").apply_stylesheet(self.app, theme='light_blue.xml')
         else: 
             self.app.setStyleSheet("")
 
 
     def setup_table(self):
-        header = self.fileListTableWidget.horizontalHeader()
+        self.file_model = FileTableModel(self)
+        self.fileListTableView.setModel(self.file_model)
+        header = self.fileListTableView.horizontalHeader()
         header.setSectionResizeMode(0, header.ResizeMode.Stretch)
-        for i,w in enumerate([150,100,120,100,100]): self.fileListTableWidget.setColumnWidth(i+1, w)
+        for i,w in enumerate([150,100,120,100,100]): self.fileListTableView.setColumnWidth(i+1, w)
+        self.fileListTableView.verticalHeader().setDefaultSectionSize(30); self.fileListTableView.setWordWrap(False)
+
+        # Delegates paint the format, progress and button columns; no widgets live in the cells
+        self.action_delegate, self.output_delegate = ButtonDelegate(self), ButtonDelegate(self)
+        self.action_delegate.clicked.connect(self.convert_single_file)
+        self.output_delegate.clicked.connect(lambda row: self.open_file_location(self.file_model.job(row).output_path))
+        self.fileListTableView.setItemDelegateForColumn(COL_FORMAT, FormatDelegate(self))
+        self.fileListTableView.setItemDelegateForColumn(COL_PROGRESS, ProgressDelegate(self))
+        self.fileListTableView.setItemDelegateForColumn(COL_ACTION, self.action_delegate)
+        self.fileListTableView.setItemDelegateForColumn(COL_OUTPUT, self.output_delegate)
+        self.fileListTableView.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.fileListTableView.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.fileListTableView.customContextMenuRequested.connect(self.show_table_context_menu)
         
         # New lines for enabling row reordering
-        self.fileListTableWidget.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
-        self.fileListTableWidget.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.fileListTableView.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        self.fileListTableView.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+
+        self.cancelScanButton = QPushButton("Cancel Scan"); self.cancelScanButton.hide()
+        self.cancelScanButton.clicked.connect(self.cancel_scans)
+        self.statusBar().addPermanentWidget(self.cancelScanButton)
+        self.batchLabel = QLabel(); self.statusBar().addPermanentWidget(self.batchLabel)
+        self.watchLabel = QLabel(); self.statusBar().addPermanentWidget(self.watchLabel)
 
 # In main.py, inside the FileConverterApp class
 
@@ -710,43 +654,36 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         self.actionAbout.triggered.connect(lambda: QMessageBox.about(self, "About", "File Converter v1.5"))
         self.actionSetup_Guide.triggered.connect(self.show_setup_guide)
         self.actionDependency_Checker.triggered.connect(self.show_dependency_checker) # New connection
+        self.actionWatch_Folders.triggered.connect(self.open_watch_folders_dialog)
+        self.actionBatch_Summary.triggered.connect(self.show_batch_summary)
         self.actionExit.triggered.connect(self.close)
-        self.fileListTableWidget.itemSelectionChanged.connect(self.update_settings_panel)
+        self.fileListTableView.selectionModel().selectionChanged.connect(self.update_settings_panel)
         
         self.savePresetButton.clicked.connect(self.save_current_preset)
         self.deletePresetButton.clicked.connect(self.delete_selected_preset)
         self.presetComboBox.activated.connect(self.apply_selected_preset)
         
     def update_settings_panel(self):
-        selected_rows = self.get_selected_rows()
+        first_row = self.fileListTableView.first_selected_row()
         
         # Block signals to prevent infinite loops while we update the UI
         self.presetComboBox.blockSignals(True)
         self.presetComboBox.clear()
         
-        if not selected_rows:
-            self.settingsStack.setCurrentWidget(self.placeholderSettingsPage)
-            self.presetGroupBox.setEnabled(False)
-            self.presetComboBox.blockSignals(False)
-            return
-        
-        first_row = selected_rows[0]
-        item = self.fileListTableWidget.item(first_row, 0)
-        
-        if not item or "MERGE JOB" in item.text():
+        job = self.file_model.job(first_row) if first_row is not None else None
+        if not job or job.is_merge:
             self.settingsStack.setCurrentWidget(self.placeholderSettingsPage)
             self.presetGroupBox.setEnabled(False)
             self.presetComboBox.blockSignals(False)
             return
 
-        file_path = item.text()
+        file_path = job.path
         file_ext = os.path.splitext(file_path)[1].lower()
         category = get_file_category(file_ext)
 
         if category in self.settings_panels:
             panel = self.settings_panels[category]
-            settings = item.data(Qt.ItemDataRole.UserRole) or {}
-            panel.load_settings(settings)
+            panel.load_settings(job.settings or {})
             self.settingsStack.setCurrentWidget(panel)
             self.presetGroupBox.setEnabled(True) # Enable preset box for valid types
             
@@ -764,10 +701,10 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         selected_rows = self.get_selected_rows()
         if not selected_rows: return
         
-        item = self.fileListTableWidget.item(selected_rows[0], 0)
-        if not item: return
+        job = self.file_model.job(selected_rows[0])
+        if not job or job.is_merge: return
 
-        category = get_file_category(os.path.splitext(item.text())[1].lower())
+        category = get_file_category(os.path.splitext(job.path)[1].lower())
         if category not in self.settings_panels:
             QMessageBox.warning(self, "Cannot Save Preset", "Presets are not available for this file type.")
             return
@@ -784,13 +721,7 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
             self.update_settings_panel() # Refresh the UI to show the new preset
             QMessageBox.information(self, "Success", f"Preset '{preset_name}' saved.")
     def on_settings_changed(self, new_settings):
-        selected_rows = self.get_selected_rows()
-        for row in selected_rows:
-            item = self.fileListTableWidget.item(row, 0)
-            if item:
-                settings = item.data(Qt.ItemDataRole.UserRole) or {}
-                settings.update(new_settings)
-                item.setData(Qt.ItemDataRole.UserRole, settings)
+        self.file_model.update_settings(self.get_selected_rows(), new_settings)
     def delete_selected_preset(self):
         current_preset = self.presetComboBox.currentText()
         if not current_preset or current_preset == "Apply a Preset...":
@@ -798,7 +729,7 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
 
         selected_rows = self.get_selected_rows()
         if not selected_rows: return
-        category = get_file_category(os.path.splitext(self.fileListTableWidget.item(selected_rows[0], 0).text())[1].lower())
+        category = get_file_category(os.path.splitext(self.file_model.job(selected_rows[0]).path)[1].lower())
 
         reply = QMessageBox.question(self, "Delete Preset", f"Are you sure you want to delete the preset '{current_preset}'?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -818,19 +749,14 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         selected_rows = self.get_selected_rows()
         if not selected_rows: return
         
-        category = get_file_category(os.path.splitext(self.fileListTableWidget.item(selected_rows[0], 0).text())[1].lower())
+        category = get_file_category(os.path.splitext(self.file_model.job(selected_rows[0]).path)[1].lower())
         
         if category in self.presets and preset_name in self.presets[category]:
-            preset_settings = self.presets[category][preset_name]
+            preset_settings = dict(self.presets[category][preset_name])
             
-            # Apply settings to all selected rows of the same category
-            for row in selected_rows:
-                item = self.fileListTableWidget.item(row, 0)
-                if not item: continue
-                item_category = get_file_category(os.path.splitext(item.text())[1].lower())
-                
-                if item_category == category:
-                    item.setData(Qt.ItemDataRole.UserRole, preset_settings)
+            # Apply settings to all selected rows of the same category; they all share one copy of the preset
+            rows = [row for row in selected_rows if get_file_category(os.path.splitext(self.file_model.job(row).path)[1].lower()) == category]
+            self.file_model.set_settings(rows, preset_settings)
             
             # Refresh the settings panel to show the applied settings
             self.update_settings_panel()
@@ -839,7 +765,24 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         # Reset combo box to placeholder
         self.presetComboBox.setCurrentIndex(0)
     def get_selected_rows(self):
-        return sorted(list(set(index.row() for index in self.fileListTableWidget.selectedIndexes())))
+        return self.fileListTableView.selected_rows()
+
+    def show_table_context_menu(self, pos):
+        """Right-click menu of the file list. "Also Convert To" adds targets that the row's job writes from the same decode."""
+        index, rows = self.fileListTableView.indexAt(pos), self.get_selected_rows()
+        if not index.isValid() or not rows: return
+        job = self.file_model.job(index.row())
+        menu = QMenu(self)
+        also = menu.addMenu("Also Convert To")
+        extras = {job.targets[i][1][1] for i in job.extra_targets}
+        for fmt in (choices := job.fan_out_choices()):
+            action = also.addAction(f".{fmt}"); action.setCheckable(True); action.setChecked(fmt in extras)
+            action.toggled.connect(lambda checked, f=fmt: self.file_model.set_extra_target(rows, f, checked))
+        also.setEnabled(bool(choices))
+        clear = menu.addAction("Clear Extra Targets", lambda: self.file_model.clear_extra_targets(rows))
+        clear.setEnabled(any(self.file_model.job(r).extra_targets for r in rows))
+        menu.addSeparator(); menu.addAction(self.actionRemove_Selected)
+        menu.exec(self.fileListTableView.viewport().mapToGlobal(pos))
 
     def dragEnterEvent(self, e):
         if e.mimeData().hasUrls(): e.acceptProposedAction()
@@ -852,32 +795,158 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         else: e.ignore()
 
     def add_files_from_paths(self, paths):
-        for path in paths:
-            if os.path.isdir(path):
-                for root, _, files in os.walk(path): [self.add_file_to_table(os.path.join(root,f)) for f in files]
-            elif os.path.isfile(path): self.add_file_to_table(path)
+        """Adds files straight away; folders are scanned on a background thread that adds rows as it goes."""
+        if not any(os.path.isdir(path) for path in paths):
+            return self.add_scanned_files([path for path in paths if os.path.isfile(path)])
+        if not self.scanners: self.scan_added = 0
+        thread, scanner = QThread(), FolderScanWorker(paths)
+        scanner.moveToThread(thread)
+        thread.started.connect(scanner.run)
+        scanner.files_found.connect(self.add_scanned_files)
+        scanner.finished.connect(thread.quit)
+        thread.finished.connect(scanner.deleteLater); thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda s=scanner: self.on_scan_finished(s))
+        self.scanners[scanner] = thread; thread.start()
+        self.cancelScanButton.show()
+        self.statusBar().showMessage("Scanning folders...")
+
+    def add_scanned_files(self, files):
+        added = self.file_model.add_files(files, default_job_settings())
+        if self.scanners:
+            self.scan_added += added
+            self.statusBar().showMessage(f"Scanning folders... {self.scan_added:,} files added")
+
+    def on_scan_finished(self, scanner):
+        cancelled = self.scanners.pop(scanner, None) is not None and scanner.cancelled
+        if self.scanners: return
+        self.cancelScanButton.hide()
+        self.statusBar().showMessage(f"{'Scan cancelled' if cancelled else 'Scan complete'}: {self.scan_added:,} files added.", 5000)
+
+    def cancel_scans(self):
+        for scanner in self.scanners: scanner.stop()
     
+    def on_plan_chosen(self, row, label):
+        if (metrics := self.job_metrics.get(row)): metrics.plan = label
+        merging = self.file_model.job(row).is_merge
+        self.update_status(row, f"{'Merging...' if merging else 'In Progress'} ({label})", "blue")
+
+    def on_cache_hit(self, row):
+        self.cached_rows.add(row)
+
     def on_conversion_finished(self, row, output_path):
-        self.update_status(row, "Completed", "green")
-        if (btn := self.fileListTableWidget.cellWidget(row, 4)): btn.setEnabled(True)
-        open_btn = QPushButton("Open Folder"); open_btn.clicked.connect(partial(self.open_file_location, output_path))
-        self.fileListTableWidget.setCellWidget(row, 5, open_btn)
+        self.refresh_progress()
+        job = self.file_model.job(row)
+        try: input_bytes = os.path.getsize(job.path) if job and not job.is_merge else 0
+        except OSError: input_bytes = 0
+        self.progress_bus.job_done(row, input_bytes)
+        worker = self.running_threads[row][1] if row in self.running_threads else None
+        output_paths = [output_path, *getattr(worker, 'extra_outputs', ())]
+        self.finish_job_metrics(row, "completed", output_paths, cached=row in self.cached_rows)
+        self.update_job_store(row, "completed", output_paths)
+        if (watched := self.watch_jobs.pop(row, None)):
+            try: finish_source(*watched)
+            except OSError as e: self.statusBar().showMessage(f"Watch folder: could not {watched[1]['source_action']} {watched[0]}: {e}", 10000)
+        if row in self.cached_rows: self.cached_rows.discard(row); self.update_status(row, "Completed (cached)", "darkGreen")
+        else: self.update_status(row, "Completed", "green")
+        self.file_model.set_progress_format(row, "%p%")
+        self.file_model.set_action_enabled(row, True)
+        self.file_model.set_output(row, output_path)
 
     def on_conversion_error(self, row, msg):
+        self.refresh_progress(); self.progress_bus.job_done(row, completed=False)
+        self.finish_job_metrics(row, "failed", error=msg)
+        self.update_job_store(row, "failed", error=msg)
         self.update_status(row, "Failed", "red")
-        if (btn := self.fileListTableWidget.cellWidget(row, 4)): btn.setEnabled(True)
+        self.file_model.set_action_enabled(row, True)
         if row in self.running_threads: self.running_threads[row][0].quit()
-        QMessageBox.critical(self, "Error", f"Row {row + 1}: {msg}")
+        # Nobody may be at the screen for watched folders; their failures stay in the row and the status bar
+        if self.watch_jobs.pop(row, None): self.statusBar().showMessage(f"Watch folder, row {row + 1}: {msg}", 10000)
+        else: QMessageBox.critical(self, "Error", f"Row {row + 1}: {msg}")
+
+    def finish_job_metrics(self, row, status, output_paths=(), cached=False, error=None):
+        """Closes the row's JobMetrics (which logs it) and keeps the record for the batch summary."""
+        if (metrics := self.job_metrics.pop(row, None)) is None: return
+        self.batch_records.append(metrics.finish(status, output_paths, cached, error))
+        self.batch_from_user |= row not in self.watch_jobs
+
+    def call_job_store(self, method, *args):
+        """Calls a JobStore method. A store that stops working is closed; the conversions themselves carry on."""
+        if self.job_store is None: return None
+        try: return getattr(self.job_store, method)(*args)
+        except sqlite3.Error as e:
+            self.statusBar().showMessage(f"The job queue can no longer be saved ({e}); an interrupted batch cannot be resumed.", 10000)
+            try: self.job_store.close()
+            except sqlite3.Error: pass
+            self.job_store = None; self.store_ids.clear()
+
+    def update_job_store(self, row, status, output_paths=(), error=None):
+        job_id = self.store_ids.get(row) if status == "running" else self.store_ids.pop(row, None)
+        if job_id is not None: self.call_job_store('set_status', job_id, status, output_paths, error)
+
+    def offer_resume(self):
+        """Offers to finish a batch that was cut short, skipping the jobs whose outputs are already in place."""
+        if self.job_store is None: return
+        pending, done = self.call_job_store('interrupted') or ([], 0)
+        if not pending: return self.call_job_store('clear')
+        for output_dir in {os.path.dirname(job.spec['output']) if 'merge' in job.spec else job.spec['output_dir'] for job in pending}:
+            remove_stale_staging(output_dir)
+        reply = QMessageBox.question(self, "Resume Batch",
+            f"The last batch was interrupted with {len(pending):,} job{'s' if len(pending) != 1 else ''} unfinished"
+            f"{f' ({done:,} finished jobs will be skipped)' if done else ''}.\n\nResume it now?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes)
+        if reply != QMessageBox.StandardButton.Yes: return self.call_job_store('clear')
+
+        # The old entries and the re-queued jobs are committed together, so a crash now still leaves a resumable batch.
+        with self.job_store.batch():
+            self.call_job_store('clear')
+            resumed = sum(self.requeue_stored_job(job.spec) for job in pending)
+        if resumed: self.actionConvert_All.setEnabled(False); self.actionAdd_Files.setEnabled(False)
+        skipped = len(pending) - resumed
+        self.statusBar().showMessage(f"Resumed {resumed:,} jobs" + (f"; {done:,} finished jobs skipped" if done else "")
+                                     + (f"; {skipped:,} could not be resumed (input missing or no longer supported)" if skipped else "") + ".", 10000)
+
+    def requeue_stored_job(self, spec):
+        """Adds a row for a job read back from the store and queues it; returns whether that worked."""
+        if 'merge' in spec:
+            if not all(os.path.isfile(path) for path in spec['merge']): return False
+            row = self.file_model.add_merge_job(spec['output'])
+            self.queue_worker(row, create_merge_worker(row, spec['merge'], spec['output'], spec['category']), spec)
+            return True
+        if not os.path.isfile(spec['input']) or not self.file_model.add_files([spec['input']], spec['settings']): return False
+        row = self.file_model.rowCount() - 1
+        (_, target), *extras = spec['targets']
+        if not self.file_model.set_target(row, target):
+            self.file_model.remove_rows([row]); return False
+        for _, extra in extras: self.file_model.set_extra_target([row], extra, True)
+        self.queue_conversion(row, spec['output_dir'])
+        return True
 
     def remove_thread_reference(self, row):
         if row in self.running_threads: del self.running_threads[row]
-        if not self.running_threads:
-            self.statusBar().showMessage("All tasks completed.", 5000)
+        self.scheduler.job_done(row)
+        if not self.running_threads and not self.scheduler.has_work():
+            self.refresh_progress(); self.progress_timer.stop(); self.batchLabel.clear()
+            elapsed = None
+            if (summary := self.progress_bus.batch_summary()):
+                done, _, _, files_per_min, mb_per_s, elapsed = summary
+                self.statusBar().showMessage(f"All tasks completed: {done} jobs in {elapsed:.0f}s ({files_per_min:.1f} files/min, {mb_per_s:.1f} MB/s).", 10000)
+            else: self.statusBar().showMessage("All tasks completed.", 5000)
+            self.progress_bus.reset_batch()
+            self.call_job_store('clear'); self.store_ids.clear()
+            if self.batch_records:
+                self.last_batch = (self.batch_records, elapsed); self.actionBatch_Summary.setEnabled(True)
+                # Batches made only of watched files come and go unattended; those are never announced with a dialog.
+                if self.settings.get('show_batch_summary', False) and self.batch_from_user: QTimer.singleShot(0, self.show_batch_summary)
+                self.batch_records, self.batch_from_user = [], False
             self.actionConvert_All.setEnabled(True); self.actionAdd_Files.setEnabled(True)
-            # Re-enable row reordering now that all jobs are done
-            self.fileListTableWidget.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+            # Re-enable row reordering and removal now that all jobs are done
+            self.fileListTableView.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+            self.actionRemove_Selected.setEnabled(True)
             
-            if self.settings.get('clear_list_on_complete', False): self.fileListTableWidget.setRowCount(0)
+            if self.settings.get('clear_list_on_complete', False): self.file_model.clear()
+
+    def show_batch_summary(self):
+        if self.last_batch: BatchSummaryDialog(*self.last_batch, self).exec()
 
     def open_file_location(self, path):
         try:
@@ -887,14 +956,25 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         except: QMessageBox.warning(self,"Error",f"Could not open path:\n{path}")
     
     def update_status(self, row, text, color="black"):
-        if (item := self.fileListTableWidget.item(row, 2)):
-            item.setText(text); item.setForeground(getattr(Qt.GlobalColor,color,Qt.GlobalColor.black))
+        self.file_model.set_status(row, text, color)
     
     def update_progress(self, row, val):
-        if (pb := self.fileListTableWidget.cellWidget(row, 3)): pb.setValue(val)
+        self.file_model.set_progress(row, val)
+
+    def update_stats(self, row, fps, speed):
+        self.file_model.set_progress_format(row, f"%p%  {fps:.0f} fps  {speed:.2f}x" if speed else "%p%")
+
+    def refresh_progress(self):
+        """Applies what the workers reported since the last tick and updates the batch summary."""
+        progress, stats = self.progress_bus.take_changes()
+        for row, value in progress.items(): self.update_progress(row, value)
+        for row, (fps, speed) in stats.items(): self.update_stats(row, fps, speed)
+        if (summary := self.progress_bus.batch_summary()):
+            done, total, percent, files_per_min, mb_per_s, _ = summary
+            self.batchLabel.setText(f"{done}/{total} done  {percent:.0f}%  |  {files_per_min:.1f} files/min  {mb_per_s:.1f} MB/s")
 
     def closeEvent(self, e):
-        if self.running_threads:
+        if self.scheduler.has_work():
             reply = QMessageBox.question(self,'Exit',"Jobs are running. Exit anyway?",
                 QMessageBox.StandardButton.Yes|QMessageBox.StandardButton.No,QMessageBox.StandardButton.No)
             if reply==QMessageBox.StandardButton.Yes:
@@ -904,47 +984,20 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
                 e.ignore()
         else:
             e.accept()
+        if e.isAccepted():
+            for scanner, thread in list(self.scanners.items()): scanner.stop(); thread.quit(); thread.wait()
         
     def add_files(self):
         files,_=QFileDialog.getOpenFileNames(self,"Select Files","",f"All Supported Files ({' '.join(f'*{e}' for e in FLEXIBLE_CONVERSION_MAP.keys())})")
         if files: self.add_files_from_paths(files)
 
-    def add_file_to_table(self, file_path, is_merge_job=False, out_path=""):
-        row = self.fileListTableWidget.rowCount(); self.fileListTableWidget.insertRow(row)
-        source_text = "MERGE JOB" if is_merge_job else file_path
-        path_item = QTableWidgetItem(source_text); path_item.setFlags(path_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        if not is_merge_job:
-            settings={'quality':95,'resize':"None",'video_bitrate':"Default",'remove_audio':False,'audio_bitrate':"Default"}
-            path_item.setData(Qt.ItemDataRole.UserRole, settings)
-        self.fileListTableWidget.setItem(row, 0, path_item)
-        
-        combo = QComboBox()
-        if is_merge_job:
-            combo.addItem(os.path.basename(out_path)); combo.setEnabled(False)
-        elif (file_ext := os.path.splitext(file_path)[1].lower()) in FLEXIBLE_CONVERSION_MAP:
-            for cat, fmts in FLEXIBLE_CONVERSION_MAP[file_ext].items():
-                for f in fmts: combo.addItem(f".{f} ({cat})", userData=(cat,f))
-        else: combo.addItem("Unsupported"); combo.setEnabled(False)
-        self.fileListTableWidget.setCellWidget(row, 1, combo)
-
-        status_item = QTableWidgetItem("Pending"); status_item.setFlags(status_item.flags()&~Qt.ItemFlag.ItemIsEditable)
-        self.fileListTableWidget.setItem(row, 2, status_item)
-        
-        pb=QProgressBar();pb.setValue(0);pb.setTextVisible(True);self.fileListTableWidget.setCellWidget(row,3,pb)
-        
-        btn = QPushButton("Convert" if not is_merge_job else "Start"); btn.setEnabled(combo.isEnabled())
-        if not is_merge_job: btn.clicked.connect(partial(self.convert_single_file,row))
-        self.fileListTableWidget.setCellWidget(row, 4, btn)
-        self.fileListTableWidget.setCellWidget(row, 5, QWidget())
-      
     def remove_selected_files(self):
+        # Queued and running jobs are tracked by row index, so rows stay put until the queue is empty (see queue_worker).
+        if self.running_threads or self.scheduler.has_work(): return
         rows = self.get_selected_rows()
         if not rows: return
-        for row in reversed(rows):
-            if row in self.running_threads:
-                thread, worker = self.running_threads[row]; worker.stop(); thread.quit(); thread.wait()
-            self.fileListTableWidget.removeRow(row)
-        if self.fileListTableWidget.rowCount() == 0: self.update_settings_panel()
+        self.file_model.remove_rows(rows)
+        if self.file_model.rowCount() == 0: self.update_settings_panel()
 
     def convert_single_file(self, row):
         out_dir = self.get_output_directory_for_conversion()
@@ -952,7 +1005,7 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
 
     def convert_all_files(self):
         """Starts conversion for all pending files, getting one output directory for the batch."""
-        rows=[r for r in range(self.fileListTableWidget.rowCount()) if self.fileListTableWidget.item(r,2).text()=="Pending"]
+        rows=self.file_model.pending_rows()
         if not rows: return QMessageBox.information(self,"No Files","No pending files to convert.")
         
         
@@ -963,67 +1016,71 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
 
        
         self.actionConvert_All.setEnabled(False); self.actionAdd_Files.setEnabled(False)
-        self.fileListTableWidget.setDragDropMode(QAbstractItemView.DragDropMode.NoDragDrop)
+        self.fileListTableView.setDragDropMode(QAbstractItemView.DragDropMode.NoDragDrop)
 
-        for row in rows:
-            self.start_conversion_for_row(row, output_dir) 
+        with self.job_store.batch() if self.job_store else nullcontext():
+            for row in rows:
+                self.start_conversion_for_row(row, output_dir) 
 
     def start_conversion_for_row(self, row, batch_output_dir):
-        path_item = self.fileListTableWidget.item(row,0); i_path=path_item.text()
+        job = self.file_model.job(row); i_path = job.path
 
         if self.settings.get('save_to_source_dir', False):
             final_output_dir = os.path.dirname(i_path)
         else:
             final_output_dir = batch_output_dir
+        self.queue_conversion(row, final_output_dir)
 
-        combo = self.fileListTableWidget.cellWidget(row, 1); o_cat, t_fmt = combo.currentData()
-        i_ext = os.path.splitext(i_path)[1].lower(); i_cat = get_file_category(i_ext)
-        base = os.path.splitext(os.path.basename(i_path))[0]
-        o_path = os.path.join(final_output_dir, f"{base}.{t_fmt}")
-        settings = path_item.data(Qt.ItemDataRole.UserRole)
-        
-        thread = QThread(); worker = None
+    def queue_conversion(self, row, output_dir):
+        """Queues the row's conversion into `output_dir` and records it in the job store."""
+        job = self.file_model.job(row); i_path = job.path
+        targets = job.all_target_data
+        if len(targets) > 1: worker = create_fan_out_worker(row, i_path, targets, output_dir, job.settings)
+        else: worker = create_worker(row, i_path, *targets[0], output_dir, job.settings, self.cache)
+        spec = {'input': i_path, 'targets': [list(target) for target in targets], 'output_dir': output_dir, 'settings': job.settings}
+        self.queue_worker(row, worker, spec)
 
-        
-        if i_ext == ".pdf" and t_fmt == "docx":
-            worker = PdfToDocxWorker(row, i_path, o_path)
-        elif i_ext == ".pdf" and t_fmt == "txt":
-            worker = PdfToTextWorker(row, i_path, o_path)
-        elif i_cat == "video" and t_fmt == "gif":
-            worker = FFmpegGifWorker(row, i_path, o_path, settings)
-        elif i_cat=="video" and o_cat=="audio": 
-            worker=FFmpegWorker(row,i_path,o_path,"video_to_audio",settings)
-        elif i_cat=="video" and o_cat=="image": 
-            worker=FFmpegWorker(row,i_path,o_path,"video_to_image",settings)
-        elif i_cat==o_cat:
-            if i_cat in ["video","audio"]: 
-                worker=FFmpegWorker(row,i_path,o_path,"default",settings)
-            elif i_cat=="image": 
-                worker = RawImageWorker(row, i_path, o_path, settings) if i_ext in RAW_EXTENSIONS else ImageWorker(row, i_path, o_path, settings)
-            elif i_cat in ["document","presentation","spreadsheet"]: 
-                worker=LibreOfficeWorker(row,i_path,o_path,final_output_dir)
-            elif i_cat=="archive": 
-                worker=SevenZipWorker(row,i_path,o_path)
-        else: 
-            worker = PlaceholderWorker(row, f"{i_cat} to {o_cat}")
-        
-        
-        if worker:
-            self.fileListTableWidget.setDragDropMode(QAbstractItemView.DragDropMode.NoDragDrop)
-            
-            worker.moveToThread(thread)
-            thread.started.connect(worker.run)
-            if hasattr(worker, 'progress_updated'): worker.progress_updated.connect(self.update_progress)
-            worker.finished.connect(self.on_conversion_finished); worker.error.connect(self.on_conversion_error)
-            worker.finished.connect(thread.quit); worker.error.connect(thread.quit)
-            thread.finished.connect(worker.deleteLater); thread.finished.connect(thread.deleteLater)
-            thread.finished.connect(lambda r=row: self.remove_thread_reference(r))
-            self.running_threads[row]=(thread,worker); thread.start()
-            self.update_status(row, "In Progress", "blue")
-            if (btn := self.fileListTableWidget.cellWidget(row, 4)): btn.setEnabled(False)
+    def queue_worker(self, row, worker, spec=None):
+        """Parks a worker in the scheduler; the row stays "Queued" until its engine has a free slot.
+
+        Jobs given a `spec` (what the job store needs to queue them again) are recorded for resuming.
+        """
+        # Jobs are keyed by their row; rows may neither move nor be removed until every queued job is done.
+        self.fileListTableView.setDragDropMode(QAbstractItemView.DragDropMode.NoDragDrop)
+        self.actionRemove_Selected.setEnabled(False)
+        self.update_status(row, "Queued", "gray")
+        self.file_model.set_action_enabled(row, False)
+        self.progress_bus.job_queued(row)
+        self.job_metrics[row] = JobMetrics(worker.engine, worker.inputs if self.file_model.job(row).is_merge else [self.file_model.job(row).path])
+        if spec is not None and (job_id := self.call_job_store('add', spec)) is not None: self.store_ids[row] = job_id
+        if not self.progress_timer.isActive(): self.progress_timer.start()
+        self.scheduler.submit(row, worker.engine, worker)
+
+    def launch_worker(self, row, worker):
+        thread = QThread()
+        worker.moveToThread(thread)
+        direct = Qt.ConnectionType.DirectConnection
+        if (metrics := self.job_metrics.get(row)):
+            # The job's clock and "current job" live on its thread; stopping it is connected first, so the
+            # record is complete before the queued finished/error slots below run on the GUI thread.
+            thread.started.connect(partial(metrics.run, worker.run), direct)
+            worker.finished.connect(metrics.stop, direct); worker.error.connect(metrics.stop, direct)
+        else: thread.started.connect(worker.run)
+        if hasattr(worker, 'progress_updated'): worker.progress_updated.connect(self.progress_bus.report, direct)
+        if hasattr(worker, 'stats_updated'): worker.stats_updated.connect(self.progress_bus.report_stats, direct)
+        if hasattr(worker, 'plan_chosen'): worker.plan_chosen.connect(self.on_plan_chosen)
+        if hasattr(worker, 'cache_hit'): worker.cache_hit.connect(self.on_cache_hit)
+        worker.finished.connect(self.on_conversion_finished); worker.error.connect(self.on_conversion_error)
+        worker.finished.connect(thread.quit); worker.error.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater); thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda r=row: self.remove_thread_reference(r))
+        self.running_threads[row]=(thread,worker); thread.start()
+        self.update_job_store(row, "running")
+        if self.file_model.job(row).is_merge: self.update_status(row, "Merging...", "blue")
+        else: self.update_status(row, "In Progress", "blue")
     def merge_selected_files(self):
-        rows = self.get_selected_rows(); paths = [self.fileListTableWidget.item(r, 0).text() for r in rows]
-        if len(rows) < 2: return QMessageBox.warning(self, "Selection Error", "Please select at least two files to merge.")
+        rows = self.get_selected_rows(); paths = [self.file_model.job(r).path for r in rows if not self.file_model.job(r).is_merge]
+        if len(paths) < 2: return QMessageBox.warning(self, "Selection Error", "Please select at least two files to merge.")
         
         exts = {os.path.splitext(p)[1].lower() for p in paths}; cats = {get_file_category(e) for e in exts}
         if len(cats) > 1: return QMessageBox.warning(self, "Type Error", "All selected files must be of the same category (e.g., all videos).")
@@ -1036,21 +1093,20 @@ class FileConverterApp(QMainWindow, Ui_MainWindow):
         out_path, _ = QFileDialog.getSaveFileName(self, "Save Merged File As", "", filters.get(category))
         if not out_path: return
 
-        job_row = self.fileListTableWidget.rowCount(); self.add_file_to_table(file_path="", is_merge_job=True, out_path=out_path)
-        self.update_status(job_row, "Merging...", "blue")
-        
-        thread=QThread(); worker=MergeWorker(job_row, paths, out_path, category)
-        worker.moveToThread(thread); thread.started.connect(worker.run)
-        worker.progress_updated.connect(self.update_progress); worker.finished.connect(self.on_conversion_finished)
-        worker.error.connect(self.on_conversion_error); worker.finished.connect(thread.quit)
-        thread.finished.connect(worker.deleteLater); thread.finished.connect(thread.deleteLater)
-        thread.finished.connect(lambda r=job_row: self.remove_thread_reference(r))
-        self.running_threads[job_row] = (thread, worker); thread.start()
+        job_row = self.file_model.add_merge_job(out_path)
+        self.queue_worker(job_row, create_merge_worker(job_row, paths, out_path, category), {'merge': paths, 'output': out_path, 'category': category})
         
     def cancel_all_files(self):
+        self.cancel_scans()
+        for row in self.scheduler.clear():
+            self.job_metrics.pop(row, None)
+            self.update_status(row, "Cancelled", "orange")
+            self.file_model.set_action_enabled(row, True); self.progress_bus.job_done(row, completed=False)
         for row, (thread, worker) in list(self.running_threads.items()):
             worker.stop(); thread.quit(); thread.wait(); self.update_status(row, "Cancelled", "orange")
-            if (btn := self.fileListTableWidget.cellWidget(row, 4)): btn.setEnabled(True)
+            self.finish_job_metrics(row, "cancelled")
+            self.file_model.set_action_enabled(row, True); self.progress_bus.job_done(row, completed=False)
+            self.scheduler.job_done(row)
         self.running_threads.clear(); self.remove_thread_reference(-1)
 
     def get_output_directory_for_conversion(self):
@@ -1071,7 +1127,9 @@ def main():
     app = QApplication(sys.argv)
     window = FileConverterApp(app_instance=app) 
     window.show()
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    shutdown_process_host(); shutdown_libreoffice_service()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,45 @@
+from PyQt6 import QtCore, QtWidgets
+
+class Ui_BatchSummaryDialog(object):
+    def setupUi(self, BatchSummaryDialog):
+        BatchSummaryDialog.setObjectName("BatchSummaryDialog")
+        BatchSummaryDialog.resize(900, 460)
+        BatchSummaryDialog.setWindowTitle("Batch Summary")
+
+        self.verticalLayout = QtWidgets.QVBoxLayout(BatchSummaryDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+
+        self.summaryLabel = QtWidgets.QLabel(parent=BatchSummaryDialog)
+        self.summaryLabel.setWordWrap(True)
+        self.summaryLabel.setTextInteractionFlags(QtCore.Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.summaryLabel.setObjectName("summaryLabel")
+        self.verticalLayout.addWidget(self.summaryLabel)
+
+        # --- Slowest jobs ---
+        self.slowestLabel = QtWidgets.QLabel(parent=BatchSummaryDialog)
+        self.slowestLabel.setText("Slowest jobs:")
+        self.slowestLabel.setObjectName("slowestLabel")
+        self.verticalLayout.addWidget(self.slowestLabel)
+        self.slowestTableWidget = QtWidgets.QTableWidget(parent=BatchSummaryDialog)
+        self.slowestTableWidget.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.slowestTableWidget.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.slowestTableWidget.verticalHeader().setVisible(False)
+        self.slowestTableWidget.setObjectName("slowestTableWidget")
+        self.verticalLayout.addWidget(self.slowestTableWidget)
+
+        self.buttonsLayout = QtWidgets.QHBoxLayout()
+        self.exportButton = QtWidgets.QPushButton("Export...", parent=BatchSummaryDialog)
+        self.exportButton.setObjectName("exportButton")
+        self.buttonsLayout.addWidget(self.exportButton)
+        self.openLogButton = QtWidgets.QPushButton("Open Metrics Log", parent=BatchSummaryDialog)
+        self.openLogButton.setObjectName("openLogButton")
+        self.buttonsLayout.addWidget(self.openLogButton)
+        self.buttonsLayout.addStretch()
+        self.buttonBox = QtWidgets.QDialogButtonBox(parent=BatchSummaryDialog)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.StandardButton.Close)
+        self.buttonBox.setObjectName("buttonBox")
+        self.buttonsLayout.addWidget(self.buttonBox)
+        self.verticalLayout.addLayout(self.buttonsLayout)
+
+        self.buttonBox.rejected.connect(BatchSummaryDialog.reject)
+        QtCore.QMetaObject.connectSlotsByName(BatchSummaryDialog)
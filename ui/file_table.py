@@ -0,0 +1,345 @@
+# ui/file_table.py
+"""Model/view file list of the main window.
+
+Each row is one FileJob. The format, progress and button columns are painted by item
+delegates instead of being QComboBox/QProgressBar/QPushButton cell widgets, so a row costs
+one small object and the view only ever paints the rows on screen. Rows that were added
+together or edited together share one settings dict; settings are replaced, never mutated
+in place, so sharing is safe.
+"""
+
+import os
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+from PyQt6.QtCore import Qt
+
+from core.formats import FLEXIBLE_CONVERSION_MAP, can_fan_out
+
+HEADERS = ["Source Path", "Target Format", "Status", "Progress", "Action", "Output"]
+COL_SOURCE, COL_FORMAT, COL_STATUS, COL_PROGRESS, COL_ACTION, COL_OUTPUT = range(len(HEADERS))
+
+JOB_ROLE = Qt.ItemDataRole.UserRole             # the row's FileJob
+ENABLED_ROLE = Qt.ItemDataRole.UserRole + 1     # whether a button cell can be clicked
+
+
+class FileJob:
+    __slots__ = ('path', 'targets', 'target', 'extra_targets', 'settings', 'is_merge', 'status', 'color',
+                 'progress', 'progress_format', 'output_path', 'action_enabled')
+
+    def __init__(self, path, targets, settings, is_merge=False):
+        self.path, self.targets, self.settings, self.is_merge = path, targets, settings, is_merge
+        self.target, self.extra_targets = 0, ()   # indices into `targets`; the extras are written by the same job
+        self.status, self.color = "Pending", "black"
+        self.progress, self.progress_format = 0, "%p%"
+        self.output_path = None
+        self.action_enabled = bool(targets) and not is_merge
+
+    @property
+    def target_data(self):
+        """(output category, target format) of the chosen target, None for merge jobs and unsupported files."""
+        return self.targets[self.target][1] if self.targets else None
+
+    @property
+    def all_target_data(self):
+        """target_data followed by the extra targets'."""
+        return [self.targets[i][1] for i in (self.target, *self.extra_targets)] if self.targets else []
+
+    def fan_out_choices(self):
+        """The formats that can be added as extra targets, none if the chosen target cannot be combined with others."""
+        if self.is_merge or not self.targets: return []
+        ext = os.path.splitext(self.path)[1].lower()
+        if not can_fan_out(ext, self.targets[self.target][1][1]): return []
+        return [fmt for i, (_, (_, fmt)) in enumerate(self.targets) if i != self.target and can_fan_out(ext, fmt)]
+
+
+class FileTableModel(QtCore.QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = []
+        self._targets = {}  # extension -> shared tuple of (label, (category, format))
+        self._queued = set() # path keys of the file rows, so that no file is added twice
+
+    def targets_for(self, path):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in self._targets:
+            self._targets[ext] = tuple((f".{f} ({cat})", (cat, f)) for cat, fmts in FLEXIBLE_CONVERSION_MAP.get(ext, {}).items() for f in fmts)
+        return self._targets[ext]
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.jobs)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole: return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        job, col = self.jobs[index.row()], index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == COL_SOURCE: return "MERGE JOB" if job.is_merge else job.path
+            if col == COL_FORMAT:
+                if not job.targets: return "Unsupported"
+                label = job.targets[job.target][0]
+                return f"{label} + " + ", ".join(f".{job.targets[i][1][1]}" for i in job.extra_targets) if job.extra_targets else label
+            if col == COL_STATUS: return job.status
+            if col == COL_PROGRESS: return job.progress
+            if col == COL_ACTION: return "Start" if job.is_merge else "Convert"
+            if col == COL_OUTPUT: return "Open Folder" if job.output_path else None
+        elif role == Qt.ItemDataRole.ForegroundRole and col == COL_STATUS:
+            return QtGui.QBrush(getattr(Qt.GlobalColor, job.color, Qt.GlobalColor.black))
+        elif role == Qt.ItemDataRole.ToolTipRole and col == COL_SOURCE and not job.is_merge:
+            return job.path
+        elif role == ENABLED_ROLE:
+            return job.action_enabled if col == COL_ACTION else bool(job.output_path)
+        elif role == JOB_ROLE:
+            return job
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if not index.isValid(): return flags | Qt.ItemFlag.ItemIsDropEnabled
+        job = self.jobs[index.row()]
+        if index.column() == COL_FORMAT and job.targets and not job.is_merge: flags |= Qt.ItemFlag.ItemIsEditable
+        return flags | Qt.ItemFlag.ItemIsDragEnabled
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or index.column() != COL_FORMAT or role != Qt.ItemDataRole.EditRole: return False
+        self._select_target(self.jobs[index.row()], value)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def mimeData(self, indexes):
+        # Internal moves only; FileTableView reads the rows from the selection.
+        mime = QtCore.QMimeData()
+        mime.setData(self.mimeTypes()[0], QtCore.QByteArray())
+        return mime
+
+    # --- Rows ---
+    def job(self, row):
+        return self.jobs[row] if 0 <= row < len(self.jobs) else None
+
+    @staticmethod
+    def path_key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def add_files(self, paths, settings):
+        """Appends a row for each path not already in the table, in a single insert; every row gets
+        the same `settings` object. Returns the number of rows added."""
+        jobs = []
+        for path in paths:
+            if (key := self.path_key(path)) in self._queued: continue
+            self._queued.add(key); jobs.append(FileJob(path, self.targets_for(path), settings))
+        if not jobs: return 0
+        first = len(self.jobs)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(jobs) - 1)
+        self.jobs.extend(jobs)
+        self.endInsertRows()
+        return len(jobs)
+
+    def add_merge_job(self, output_path):
+        row = len(self.jobs)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.jobs.append(FileJob("", ((os.path.basename(output_path), None),), None, is_merge=True))
+        self.endInsertRows()
+        return row
+
+    def remove_rows(self, rows):
+        """Removes the given rows, one contiguous block at a time from the bottom up."""
+        rows = sorted(rows)
+        while rows:
+            last = first = rows.pop()
+            while rows and rows[-1] == first - 1: first = rows.pop()
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            self._queued.difference_update(self.path_key(job.path) for job in self.jobs[first:last + 1] if not job.is_merge)
+            del self.jobs[first:last + 1]
+            self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel(); self.jobs, self._queued = [], set(); self.endResetModel()
+
+    def move_rows(self, rows, target):
+        """Moves `rows` (sorted) in front of row `target`. Returns the range the moved rows now occupy."""
+        moving, skip = [self.jobs[r] for r in rows], set(rows)
+        rest = [job for r, job in enumerate(self.jobs) if r not in skip]
+        at = target - sum(r < target for r in rows)
+        self.beginResetModel()
+        self.jobs = rest[:at] + moving + rest[at:]
+        self.endResetModel()
+        return range(at, at + len(moving))
+
+    def pending_rows(self):
+        return [row for row, job in enumerate(self.jobs) if job.status == "Pending"]
+
+    # --- Per-row updates ---
+    @staticmethod
+    def _select_target(job, index):
+        # Extra targets that cannot go with the new choice (or are the new choice) are dropped.
+        job.target = index
+        choices = job.fan_out_choices()
+        job.extra_targets = tuple(i for i in job.extra_targets if job.targets[i][1][1] in choices)
+
+    def _changed(self, row, first_col, last_col=None):
+        self.dataChanged.emit(self.index(row, first_col), self.index(row, first_col if last_col is None else last_col))
+
+    def set_status(self, row, text, color="black"):
+        if (job := self.job(row)): job.status, job.color = text, color; self._changed(row, COL_STATUS)
+
+    def set_progress(self, row, value):
+        if (job := self.job(row)) and job.progress != value: job.progress = value; self._changed(row, COL_PROGRESS)
+
+    def set_progress_format(self, row, text):
+        if (job := self.job(row)) and job.progress_format != text: job.progress_format = text; self._changed(row, COL_PROGRESS)
+
+    def set_target(self, row, target_format):
+        """Selects the row's target by format; returns False if the file cannot be converted to it."""
+        job = self.job(row)
+        index = next((i for i, (_, data) in enumerate(job.targets) if data[1] == target_format), None) if job else None
+        if index is None: return False
+        self._select_target(job, index); self._changed(row, COL_FORMAT)
+        return True
+
+    def set_extra_target(self, rows, target_format, enabled):
+        """Adds `target_format` to, or removes it from, the extra targets of those `rows` that can write it."""
+        for row in rows:
+            job = self.jobs[row]
+            if enabled and target_format not in job.fan_out_choices(): continue
+            index = next((i for i, (_, data) in enumerate(job.targets) if data[1] == target_format), None)
+            if index is None: continue
+            extras = set(job.extra_targets) | {index} if enabled else set(job.extra_targets) - {index}
+            job.extra_targets = tuple(sorted(extras)); self._changed(row, COL_FORMAT)
+
+    def clear_extra_targets(self, rows):
+        for row in rows:
+            if self.jobs[row].extra_targets: self.jobs[row].extra_targets = (); self._changed(row, COL_FORMAT)
+
+    def set_action_enabled(self, row, enabled):
+        if (job := self.job(row)): job.action_enabled = enabled and bool(job.targets) and not job.is_merge; self._changed(row, COL_ACTION)
+
+    def set_output(self, row, output_path):
+        if (job := self.job(row)): job.output_path = output_path; self._changed(row, COL_OUTPUT)
+
+    def update_settings(self, rows, new_settings):
+        """Merges `new_settings` into the settings of `rows`; rows that shared a dict keep sharing the updated one."""
+        updated = {}
+        for row in rows:
+            job = self.jobs[row]
+            if job.is_merge: continue
+            key = id(job.settings)
+            if key not in updated: updated[key] = {**job.settings, **new_settings}
+            job.settings = updated[key]
+
+    def set_settings(self, rows, settings):
+        for row in rows:
+            if not self.jobs[row].is_merge: self.jobs[row].settings = settings
+
+
+class FileTableView(QtWidgets.QTableView):
+    """QTableView that reads the selection as row ranges and reorders rows on internal drops."""
+    def setModel(self, model):
+        super().setModel(model)
+        # The column header asks isColumnSelected() for every section it paints, which checks
+        # the flags of every row; rows are selected whole, so it gets a selection of its own.
+        self.horizontalHeader().setSelectionModel(QtCore.QItemSelectionModel(model, self))
+
+    def selected_rows(self):
+        return sorted({row for rng in self.selectionModel().selection() for row in range(rng.top(), rng.bottom() + 1)})
+
+    def first_selected_row(self):
+        return min((rng.top() for rng in self.selectionModel().selection()), default=None)
+
+    def dragMoveEvent(self, e):
+        super().dragMoveEvent(e)
+        if e.source() is self: e.setDropAction(Qt.DropAction.MoveAction); e.accept()
+
+    def dropEvent(self, e):
+        if e.source() is not self or self.dragDropMode() != QtWidgets.QAbstractItemView.DragDropMode.InternalMove:
+            return e.ignore()
+        rows, model = self.selected_rows(), self.model()
+        index = self.indexAt(e.position().toPoint())
+        if not index.isValid(): target = model.rowCount()
+        else: target = index.row() + (e.position().toPoint().y() > self.visualRect(index).center().y())
+        moved = model.move_rows(rows, target)
+        selection = QtCore.QItemSelection(model.index(moved.start, 0), model.index(moved.stop - 1, model.columnCount() - 1))
+        self.selectionModel().select(selection, QtCore.QItemSelectionModel.SelectionFlag.ClearAndSelect)
+        e.setDropAction(Qt.DropAction.MoveAction); e.accept()
+
+
+def _panel_background(option, painter):
+    style = option.widget.style() if option.widget else QtWidgets.QApplication.style()
+    style.drawPrimitive(QtWidgets.QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+    return style
+
+
+class FormatDelegate(QtWidgets.QStyledItemDelegate):
+    """Draws the target format as a combo box and opens a real one for the row being edited."""
+    def paint(self, painter, option, index):
+        style = _panel_background(option, painter)
+        combo = QtWidgets.QStyleOptionComboBox()
+        combo.rect = option.rect.adjusted(1, 1, -1, -1)
+        combo.currentText = index.data()
+        combo.state = option.state & ~QtWidgets.QStyle.StateFlag.State_HasFocus
+        if not index.flags() & Qt.ItemFlag.ItemIsEditable: combo.state &= ~QtWidgets.QStyle.StateFlag.State_Enabled
+        style.drawComplexControl(QtWidgets.QStyle.ComplexControl.CC_ComboBox, combo, painter, option.widget)
+        style.drawControl(QtWidgets.QStyle.ControlElement.CE_ComboBoxLabel, combo, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        # One click opens the list, like the combo box widgets this column used to hold.
+        if (event.type() == QtCore.QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton
+                and index.flags() & Qt.ItemFlag.ItemIsEditable and option.widget):
+            option.widget.edit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def createEditor(self, parent, option, index):
+        combo = QtWidgets.QComboBox(parent)
+        for label, _ in index.data(JOB_ROLE).targets: combo.addItem(label)
+        combo.activated.connect(lambda _: (self.commitData.emit(combo), self.closeEditor.emit(combo)))
+        QtCore.QTimer.singleShot(0, combo.showPopup)
+        return combo
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentIndex(index.data(JOB_ROLE).target)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentIndex())
+
+
+class ProgressDelegate(QtWidgets.QStyledItemDelegate):
+    def paint(self, painter, option, index):
+        style = _panel_background(option, painter)
+        bar = QtWidgets.QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 3, -2, -3)
+        bar.minimum, bar.maximum, bar.progress = 0, 100, index.data()
+        bar.text = index.data(JOB_ROLE).progress_format.replace("%p", str(bar.progress))
+        bar.textVisible = True
+        bar.state = QtWidgets.QStyle.StateFlag.State_Enabled | QtWidgets.QStyle.StateFlag.State_Horizontal
+        style.drawControl(QtWidgets.QStyle.ControlElement.CE_ProgressBar, bar, painter, option.widget)
+
+
+class ButtonDelegate(QtWidgets.QStyledItemDelegate):
+    """Draws the cell's text as a push button and emits `clicked(row)` when an enabled one is clicked."""
+    clicked = QtCore.pyqtSignal(int)
+
+    def paint(self, painter, option, index):
+        style = _panel_background(option, painter)
+        if not (text := index.data()): return
+        button = QtWidgets.QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = text
+        button.state = QtWidgets.QStyle.StateFlag.State_Raised
+        if index.data(ENABLED_ROLE): button.state |= QtWidgets.QStyle.StateFlag.State_Enabled
+        style.drawControl(QtWidgets.QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QtCore.QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton
+                and index.data() and index.data(ENABLED_ROLE) and option.rect.contains(event.position().toPoint())):
+            self.clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
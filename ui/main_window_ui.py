@@ -22,20 +22,11 @@ class Ui_MainWindow(object):
         self.leftPaneLayout.setContentsMargins(0, 0, 0, 0)
         self.leftPaneLayout.setObjectName("leftPaneLayout")
         
-        self.fileListTableWidget = QtWidgets.QTableWidget(parent=self.leftPaneWidget)
-        self.fileListTableWidget.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
-        self.fileListTableWidget.setObjectName("fileListTableWidget")
-        
-        self.fileListTableWidget.setColumnCount(6)
-        self.fileListTableWidget.setRowCount(0)
-        
-        headers = ["Source Path", "Target Format", "Status", "Progress", "Action", "Output"]
-        for i, header in enumerate(headers):
-            item = QtWidgets.QTableWidgetItem()
-            item.setText(header)
-            self.fileListTableWidget.setHorizontalHeaderItem(i, item)
+        self.fileListTableView = FileTableView(parent=self.leftPaneWidget)
+        self.fileListTableView.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.fileListTableView.setObjectName("fileListTableView")
             
-        self.leftPaneLayout.addWidget(self.fileListTableWidget)
+        self.leftPaneLayout.addWidget(self.fileListTableView)
 
         # --- RIGHT PANE (UPDATED with Preset controls) ---
         self.rightPaneWidget = QtWidgets.QWidget(parent=self.splitter)
@@ -95,8 +86,12 @@ class Ui_MainWindow(object):
         self.actionAbout = QtGui.QAction(parent=MainWindow)
         self.actionSetup_Guide = QtGui.QAction(parent=MainWindow)
         self.actionDependency_Checker = QtGui.QAction(parent=MainWindow)
+        self.actionWatch_Folders = QtGui.QAction(parent=MainWindow)
+        self.actionBatch_Summary = QtGui.QAction(parent=MainWindow)
+        self.actionBatch_Summary.setEnabled(False)
 
-        self.menuFile.addAction(self.actionAdd_Files); self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionAdd_Files); self.menuFile.addAction(self.actionWatch_Folders); self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionBatch_Summary); self.menuFile.addSeparator()
         self.menuFile.addAction(self.actionPreferences); self.menuFile.addSeparator()
         self.menuFile.addAction(self.actionExit)
         
@@ -112,6 +107,7 @@ class Ui_MainWindow(object):
         self.toolBar.addSeparator(); self.toolBar.addAction(self.actionMerge_Selected)
         self.toolBar.addSeparator(); self.toolBar.addAction(self.actionConvert_All)
         self.toolBar.addAction(self.actionCancel_All)
+        self.toolBar.addSeparator(); self.toolBar.addAction(self.actionWatch_Folders)
 
         self.retranslateUi(MainWindow)
         self.splitter.setSizes([700, 400])
@@ -131,4 +127,7 @@ class Ui_MainWindow(object):
         self.actionExit.setText(_translate("MainWindow", "Exit"))
         self.actionAbout.setText(_translate("MainWindow", "About..."))
         self.actionSetup_Guide.setText(_translate("MainWindow", "Setup Guide..."))
-        self.actionDependency_Checker.setText(_translate("MainWindow", "Dependency Checker..."))
\ No newline at end of file
+        self.actionDependency_Checker.setText(_translate("MainWindow", "Dependency Checker..."))
+        self.actionWatch_Folders.setText(_translate("MainWindow", "Watch Folders..."))
+        self.actionBatch_Summary.setText(_translate("MainWindow", "Batch Summary..."))
+from ui.file_table import FileTableView
@@ -3,7 +3,7 @@ from PyQt6 import QtCore, QtWidgets
 class Ui_PreferencesDialog(object):
     def setupUi(self, PreferencesDialog):
         PreferencesDialog.setObjectName("PreferencesDialog")
-        PreferencesDialog.resize(450, 220) # Made taller for the new option
+        PreferencesDialog.resize(450, 700) # Made taller for the concurrency limits and metrics
         PreferencesDialog.setWindowTitle("Preferences")
         
         self.verticalLayout = QtWidgets.QVBoxLayout(PreferencesDialog)
@@ -47,6 +47,89 @@ class Ui_PreferencesDialog(object):
         self.verticalLayout.addLayout(self.themeLayout)
         # --- END NEW ---
 
+        # --- Concurrency Limits (per-engine rows are added by PreferencesDialog) ---
+        self.concurrencyGroupBox = QtWidgets.QGroupBox("Concurrency", parent=PreferencesDialog)
+        self.concurrencyGroupBox.setObjectName("concurrencyGroupBox")
+        self.concurrencyFormLayout = QtWidgets.QFormLayout(self.concurrencyGroupBox)
+        self.concurrencyFormLayout.setObjectName("concurrencyFormLayout")
+        self.maxJobsSpinBox = QtWidgets.QSpinBox(parent=self.concurrencyGroupBox)
+        self.maxJobsSpinBox.setRange(1, 256)
+        self.maxJobsSpinBox.setObjectName("maxJobsSpinBox")
+        self.concurrencyFormLayout.addRow("Max concurrent jobs:", self.maxJobsSpinBox)
+        self.processPoolCheckBox = QtWidgets.QCheckBox(parent=self.concurrencyGroupBox)
+        self.processPoolCheckBox.setText("Run image and PDF conversions in separate processes")
+        self.processPoolCheckBox.setObjectName("processPoolCheckBox")
+        self.concurrencyFormLayout.addRow(self.processPoolCheckBox)
+        self.recycleAfterSpinBox = QtWidgets.QSpinBox(parent=self.concurrencyGroupBox)
+        self.recycleAfterSpinBox.setRange(1, 10000)
+        self.recycleAfterSpinBox.setSuffix(" jobs")
+        self.recycleAfterSpinBox.setObjectName("recycleAfterSpinBox")
+        self.concurrencyFormLayout.addRow("Restart each process after:", self.recycleAfterSpinBox)
+        self.libreOfficeInstancesSpinBox = QtWidgets.QSpinBox(parent=self.concurrencyGroupBox)
+        self.libreOfficeInstancesSpinBox.setRange(1, 16)
+        self.libreOfficeInstancesSpinBox.setObjectName("libreOfficeInstancesSpinBox")
+        self.concurrencyFormLayout.addRow("LibreOffice instances:", self.libreOfficeInstancesSpinBox)
+        self.videoSegmentsSpinBox = QtWidgets.QSpinBox(parent=self.concurrencyGroupBox)
+        self.videoSegmentsSpinBox.setRange(1, 64)
+        self.videoSegmentsSpinBox.setSpecialValueText("Off")
+        self.videoSegmentsSpinBox.setSuffix(" segments")
+        self.videoSegmentsSpinBox.setObjectName("videoSegmentsSpinBox")
+        self.concurrencyFormLayout.addRow("Encode long videos in:", self.videoSegmentsSpinBox)
+        self.pdfParallelCheckBox = QtWidgets.QCheckBox(parent=self.concurrencyGroupBox)
+        self.pdfParallelCheckBox.setText("Use all worker processes for each PDF to DOCX conversion")
+        self.pdfParallelCheckBox.setObjectName("pdfParallelCheckBox")
+        self.concurrencyFormLayout.addRow(self.pdfParallelCheckBox)
+        self.pdfPageCapSpinBox = QtWidgets.QSpinBox(parent=self.concurrencyGroupBox)
+        self.pdfPageCapSpinBox.setRange(0, 100000)
+        self.pdfPageCapSpinBox.setSingleStep(100)
+        self.pdfPageCapSpinBox.setSpecialValueText("Off")
+        self.pdfPageCapSpinBox.setSuffix(" pages")
+        self.pdfPageCapSpinBox.setObjectName("pdfPageCapSpinBox")
+        self.concurrencyFormLayout.addRow("Split DOCX output every:", self.pdfPageCapSpinBox)
+        self.verticalLayout.addWidget(self.concurrencyGroupBox)
+
+        # --- Conversion Cache ---
+        self.cacheGroupBox = QtWidgets.QGroupBox("Conversion Cache", parent=PreferencesDialog)
+        self.cacheGroupBox.setObjectName("cacheGroupBox")
+        self.cacheFormLayout = QtWidgets.QFormLayout(self.cacheGroupBox)
+        self.cacheEnabledCheckBox = QtWidgets.QCheckBox(parent=self.cacheGroupBox)
+        self.cacheEnabledCheckBox.setText("Reuse earlier results when the same file is converted again")
+        self.cacheEnabledCheckBox.setObjectName("cacheEnabledCheckBox")
+        self.cacheFormLayout.addRow(self.cacheEnabledCheckBox)
+        self.cacheSizeLayout = QtWidgets.QHBoxLayout()
+        self.cacheSizeSpinBox = QtWidgets.QSpinBox(parent=self.cacheGroupBox)
+        self.cacheSizeSpinBox.setRange(64, 1024 * 1024)
+        self.cacheSizeSpinBox.setSingleStep(256)
+        self.cacheSizeSpinBox.setSuffix(" MB")
+        self.cacheSizeSpinBox.setObjectName("cacheSizeSpinBox")
+        self.cacheSizeLayout.addWidget(self.cacheSizeSpinBox)
+        self.clearCacheButton = QtWidgets.QPushButton(parent=self.cacheGroupBox)
+        self.clearCacheButton.setText("Clear Cache")
+        self.clearCacheButton.setObjectName("clearCacheButton")
+        self.cacheSizeLayout.addWidget(self.clearCacheButton)
+        self.cacheFormLayout.addRow("Maximum size:", self.cacheSizeLayout)
+        self.verticalLayout.addWidget(self.cacheGroupBox)
+
+        # --- Performance Metrics ---
+        self.metricsGroupBox = QtWidgets.QGroupBox("Performance Metrics", parent=PreferencesDialog)
+        self.metricsGroupBox.setObjectName("metricsGroupBox")
+        self.metricsFormLayout = QtWidgets.QFormLayout(self.metricsGroupBox)
+        self.recordMetricsCheckBox = QtWidgets.QCheckBox(parent=self.metricsGroupBox)
+        self.recordMetricsCheckBox.setText("Log the timings and resource use of every job")
+        self.recordMetricsCheckBox.setObjectName("recordMetricsCheckBox")
+        self.metricsFormLayout.addRow(self.recordMetricsCheckBox)
+        self.batchSummaryCheckBox = QtWidgets.QCheckBox(parent=self.metricsGroupBox)
+        self.batchSummaryCheckBox.setText("Show a summary when a batch is complete")
+        self.batchSummaryCheckBox.setObjectName("batchSummaryCheckBox")
+        self.metricsFormLayout.addRow(self.batchSummaryCheckBox)
+        self.profileJobsCheckBox = QtWidgets.QCheckBox(parent=self.metricsGroupBox)
+        self.profileJobsCheckBox.setText("Profile jobs that run in this process (cProfile)")
+        self.profileJobsCheckBox.setToolTip("Saves a .prof file per job next to the metrics log. Only sees Python code running in the\n"
+                                            "application itself, so turn off separate processes to profile image and PDF conversions.")
+        self.profileJobsCheckBox.setObjectName("profileJobsCheckBox")
+        self.metricsFormLayout.addRow(self.profileJobsCheckBox)
+        self.verticalLayout.addWidget(self.metricsGroupBox)
+
         # --- Spacer to push buttons to the bottom ---
         spacerItem = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Expanding)
         self.verticalLayout.addItem(spacerItem)
@@ -0,0 +1,78 @@
+from PyQt6 import QtCore, QtWidgets
+
+class Ui_WatchFoldersDialog(object):
+    def setupUi(self, WatchFoldersDialog):
+        WatchFoldersDialog.setObjectName("WatchFoldersDialog")
+        WatchFoldersDialog.resize(560, 480)
+        WatchFoldersDialog.setWindowTitle("Watch Folders")
+
+        self.verticalLayout = QtWidgets.QVBoxLayout(WatchFoldersDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+
+        self.infoLabel = QtWidgets.QLabel(parent=WatchFoldersDialog)
+        self.infoLabel.setText("Files that arrive in these folders are converted automatically once they have finished copying.")
+        self.infoLabel.setWordWrap(True)
+        self.verticalLayout.addWidget(self.infoLabel)
+
+        # --- Rule list ---
+        self.rulesListWidget = QtWidgets.QListWidget(parent=WatchFoldersDialog)
+        self.rulesListWidget.setObjectName("rulesListWidget")
+        self.verticalLayout.addWidget(self.rulesListWidget)
+
+        self.ruleButtonsLayout = QtWidgets.QHBoxLayout()
+        self.addRuleButton = QtWidgets.QPushButton("Add Folder...", parent=WatchFoldersDialog)
+        self.addRuleButton.setObjectName("addRuleButton")
+        self.ruleButtonsLayout.addWidget(self.addRuleButton)
+        self.removeRuleButton = QtWidgets.QPushButton("Remove", parent=WatchFoldersDialog)
+        self.removeRuleButton.setObjectName("removeRuleButton")
+        self.ruleButtonsLayout.addWidget(self.removeRuleButton)
+        self.ruleButtonsLayout.addStretch()
+        self.verticalLayout.addLayout(self.ruleButtonsLayout)
+
+        # --- Selected rule ---
+        self.ruleGroupBox = QtWidgets.QGroupBox("Rule", parent=WatchFoldersDialog)
+        self.ruleGroupBox.setObjectName("ruleGroupBox")
+        self.ruleFormLayout = QtWidgets.QFormLayout(self.ruleGroupBox)
+        self.ruleFormLayout.setObjectName("ruleFormLayout")
+
+        self.folderLineEdit = QtWidgets.QLineEdit(parent=self.ruleGroupBox)
+        self.folderLineEdit.setObjectName("folderLineEdit")
+        self.ruleFormLayout.addRow("Watched folder:", self.folderLineEdit)
+
+        self.targetComboBox = QtWidgets.QComboBox(parent=self.ruleGroupBox)
+        self.targetComboBox.setObjectName("targetComboBox")
+        self.ruleFormLayout.addRow("Convert to:", self.targetComboBox)
+
+        self.presetComboBox = QtWidgets.QComboBox(parent=self.ruleGroupBox)
+        self.presetComboBox.setObjectName("presetComboBox")
+        self.ruleFormLayout.addRow("Preset:", self.presetComboBox)
+
+        self.outputDirLayout = QtWidgets.QHBoxLayout()
+        self.outputDirLineEdit = QtWidgets.QLineEdit(parent=self.ruleGroupBox)
+        self.outputDirLineEdit.setPlaceholderText("<watched folder>/converted")
+        self.outputDirLineEdit.setObjectName("outputDirLineEdit")
+        self.outputDirLayout.addWidget(self.outputDirLineEdit)
+        self.browseOutputButton = QtWidgets.QPushButton("Browse...", parent=self.ruleGroupBox)
+        self.browseOutputButton.setObjectName("browseOutputButton")
+        self.outputDirLayout.addWidget(self.browseOutputButton)
+        self.ruleFormLayout.addRow("Output folder:", self.outputDirLayout)
+
+        self.sourceActionComboBox = QtWidgets.QComboBox(parent=self.ruleGroupBox)
+        self.sourceActionComboBox.setObjectName("sourceActionComboBox")
+        self.ruleFormLayout.addRow("After converting:", self.sourceActionComboBox)
+        self.verticalLayout.addWidget(self.ruleGroupBox)
+
+        self.watchEnabledCheckBox = QtWidgets.QCheckBox(parent=WatchFoldersDialog)
+        self.watchEnabledCheckBox.setText("Watch these folders now")
+        self.watchEnabledCheckBox.setObjectName("watchEnabledCheckBox")
+        self.verticalLayout.addWidget(self.watchEnabledCheckBox)
+
+        self.buttonBox = QtWidgets.QDialogButtonBox(parent=WatchFoldersDialog)
+        self.buttonBox.setOrientation(QtCore.Qt.Orientation.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.StandardButton.Cancel|QtWidgets.QDialogButtonBox.StandardButton.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.verticalLayout.addWidget(self.buttonBox)
+
+        self.buttonBox.accepted.connect(WatchFoldersDialog.accept)
+        self.buttonBox.rejected.connect(WatchFoldersDialog.reject)
+        QtCore.QMetaObject.connectSlotsByName(WatchFoldersDialog)